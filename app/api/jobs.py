@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from app.config import settings
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+@dataclass
+class Job:
+    job_id: str
+    filename: str
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+    future: Future | None = field(default=None, repr=False)
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        payload = {
+            "job_id": self.job_id,
+            "filename": self.filename,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+        if include_result and self.status == "succeeded":
+            payload["result"] = self.result
+        return payload
+
+
+class JobQueue(ABC):
+    @abstractmethod
+    def submit(self, fn: Callable[..., Any], *args: Any, filename: str = "") -> Job: ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job | None: ...
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+    def shutdown(self) -> None:
+        pass
+
+
+class InProcessJobQueue(JobQueue):
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, retention: int = 1000) -> None:
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.retention = max(1, retention)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analyze-job")
+        # Running plus waiting jobs; beyond this, submit() refuses instead of queueing unboundedly.
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any, filename: str = "") -> Job:
+        if not self._slots.acquire(blocking=False):
+            raise QueueFullError("Analysis queue is full; retry later.")
+        job = Job(job_id=uuid.uuid4().hex, filename=filename)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune_locked()
+        try:
+            job.future = self._pool.submit(self._execute, job, fn, args)
+        except Exception:
+            self._slots.release()
+            raise
+        return job
+
+    def _execute(self, job: Job, fn: Callable[..., Any], args: tuple) -> Any:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args)
+            job.status = "succeeded"
+            return job.result
+        except Exception as exc:
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.status = "failed"
+            raise
+        finally:
+            job.finished_at = time.time()
+            self._slots.release()
+
+    def _prune_locked(self) -> None:
+        finished = [jid for jid, j in self._jobs.items() if j.status in {"succeeded", "failed"}]
+        for jid in finished[: max(0, len(finished) - self.retention)]:
+            del self._jobs[jid]
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts: dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "backend": "inprocess",
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "jobs": counts,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_queue: JobQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            backend = settings.job_backend.strip().lower()
+            if backend != "inprocess":
+                raise ValueError(f"Unsupported JOB_BACKEND: {settings.job_backend!r}")
+            _queue = InProcessJobQueue(
+                max_workers=settings.job_workers,
+                max_queue=settings.job_queue_depth,
+                retention=settings.job_retention,
+            )
+        return _queue
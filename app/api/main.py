@@ -1,18 +1,45 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
 from app.api.routes.analyze import router as analyze_router
+from app.api.routes.jobs import router as jobs_router
 from app.api.routes.reports import router as reports_router
+from app.utils.metrics import CONTENT_TYPE, render_metrics
+
+
+def _warm_retriever() -> None:
+    from app.pipeline.rag_match import get_retriever
+
+    try:
+        get_retriever().warm()
+    except Exception:
+        pass
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # The index and embedding backend open in the background so /health answers immediately;
+    # /ready stays 503 until the retriever can serve.
+    warming = asyncio.ensure_future(run_in_threadpool(_warm_retriever))
+    yield
+    await warming
 
 
 app = FastAPI(
     title="ComplyAI API",
     version="0.1.0",
     description="API wrapper for ComplyAI GDPR analysis pipeline.",
+    lifespan=lifespan,
 )
 
 app.include_router(analyze_router)
+app.include_router(jobs_router)
 app.include_router(reports_router)
 
 
@@ -20,3 +47,17 @@ app.include_router(reports_router)
 def health() -> dict:
     return {"status": "ok"}
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> Response:
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
+
+
+@app.get("/ready")
+def ready(response: Response) -> dict:
+    from app.pipeline.rag_match import retriever_status
+
+    status = retriever_status()
+    if not status["ready"]:
+        response.status_code = 503
+    return status
@@ -1,45 +1,266 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-from pathlib import Path
-from tempfile import NamedTemporaryFile
+import queue
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import Callable
 
-from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
 
-from app.pipeline.run_pipeline import run
+from app.api.jobs import Job, QueueFullError, get_job_queue
+from app.config import settings
+from app.pipeline.report import report_file, save_report_bytes_async, serialize_report
+from app.pipeline.run_pipeline import EventSink, analyze_document
 
 
 router = APIRouter(tags=["analyze"])
 
 
-@router.post("/analyze")
-async def analyze(file: UploadFile = File(...)) -> dict:
-    filename = file.filename or ""
-    if not filename.lower().endswith(".pdf"):
-        raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+# Room for the multipart boundaries and part headers around the file itself.
+_FORM_OVERHEAD_BYTES = 64 * 1024
+_PREVIOUS = Query(None, pattern="^[0-9a-f]{16}$", description="Report id of the earlier version to diff against")
+_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
 
-    tmp_path: Path | None = None
+
+@dataclass
+class SpooledUpload:
+    file: SpooledTemporaryFile
+    filename: str
+    sha256: str
+    size: int
+
+
+def _analyze_upload(
+    upload: SpooledUpload,
+    force: bool,
+    emit: EventSink | None = None,
+    batch_size: int = 0,
+    previous: str | None = None,
+) -> bytes:
     try:
-        payload = await file.read()
-        if not payload:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+        upload.file.seek(0)
+        report = analyze_document(
+            upload.file,
+            source_name=upload.filename,
+            force=force,
+            emit=emit,
+            batch_size=batch_size,
+            previous=previous,
+        )
+    finally:
+        upload.file.close()
+    # Serialize once: the same bytes are returned to the client and persisted in the background.
+    payload = serialize_report(report)
+    save_report_bytes_async(payload, report, settings.report_path)
+    return payload
+
+
+def _stream_upload(upload: SpooledUpload, force: bool, events: queue.Queue, previous: str | None = None) -> bytes:
+    try:
+        return _analyze_upload(
+            upload, force, lambda event, data: events.put((event, data)), settings.stream_batch_size, previous
+        )
+    except Exception as exc:
+        events.put(("error", {"detail": f"Analysis failed: {exc}"}))
+        raise
+    finally:
+        events.put(None)
+
+
+def _check_previous(previous: str | None) -> None:
+    if previous is not None and not report_file(settings.report_path, previous).exists():
+        raise HTTPException(status_code=404, detail=f"Report not found: {previous}")
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {settings.upload_max_bytes} byte limit.")
+
+
+class _FilePart:
+    # python-multipart callbacks that keep the filename of the `file` part and hand its data over as it
+    # is parsed. Other form fields are skipped.
+    def __init__(self) -> None:
+        self.filename: str | None = None
+        self._headers: dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+        self._active = False
+        self._data: list[bytes] = []
+
+    def callbacks(self) -> dict[str, Callable]:
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field,
+            "on_header_value": self._header_value,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def take(self) -> list[bytes]:
+        data, self._data = self._data, []
+        return data
+
+    def _part_begin(self) -> None:
+        self._headers = {}
+
+    def _header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = self._value = b""
 
-        with NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-            tmp.write(payload)
-            tmp_path = Path(tmp.name)
+    def _headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._active = options.get(b"name") == b"file" and self.filename is None
+        if self._active:
+            self.filename = options.get(b"filename", b"").decode("utf-8", "replace")
 
-        report_path = Path(run(str(tmp_path)))
-        if not report_path.exists():
-            raise HTTPException(status_code=500, detail="Report file was not generated.")
+    def _part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._active:
+            self._data.append(data[start:end])
 
-        report_json = json.loads(report_path.read_text(encoding="utf-8"))
-        report_json["source_file"] = filename
-        report_path.write_text(json.dumps(report_json, indent=2), encoding="utf-8")
-        return report_json
-    except HTTPException:
+    def _part_end(self) -> None:
+        self._active = False
+
+
+async def _spool_upload(request: Request) -> SpooledUpload:
+    # The multipart body is parsed as it comes off the socket, read once: the `file` part goes into
+    # memory up to UPLOAD_SPOOL_BYTES (then an anonymous temp file), hashed on the way, and the request
+    # is refused with 413 as soon as it passes UPLOAD_MAX_BYTES, whether or not it declared a length.
+    content_type, options = parse_options_header(request.headers.get("content-type", ""))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=422, detail="Expected a multipart/form-data body with a `file` part.")
+    body_limit = settings.upload_max_bytes + _FORM_OVERHEAD_BYTES
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > body_limit:
+        raise _too_large()
+
+    part = _FilePart()
+    parser = MultipartParser(boundary, part.callbacks())
+    spool = SpooledTemporaryFile(max_size=settings.upload_spool_bytes)
+    digest = hashlib.sha256()
+    received = size = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > body_limit:
+                raise _too_large()
+            parser.write(chunk)
+            if part.filename is not None and not part.filename.lower().endswith(".pdf"):
+                raise HTTPException(status_code=400, detail="Only PDF files are supported.")
+            for data in part.take():
+                size += len(data)
+                if size > settings.upload_max_bytes:
+                    raise _too_large()
+                digest.update(data)
+                if size > settings.upload_spool_bytes:
+                    # This write rolls the spool over to disk, or follows it: keep file I/O off the loop.
+                    await run_in_threadpool(spool.write, data)
+                else:
+                    spool.write(data)
+        parser.finalize()
+        if part.filename is None:
+            raise HTTPException(status_code=422, detail="Missing `file` part in the multipart body.")
+        if not size:
+            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+    except MultipartParseError as exc:
+        spool.close()
+        raise HTTPException(status_code=400, detail=f"Malformed multipart body: {exc}") from exc
+    except BaseException:
+        spool.close()
         raise
+    spool.seek(0)
+    return SpooledUpload(spool, part.filename, digest.hexdigest(), size)
+
+
+def _submit(fn: Callable, upload: SpooledUpload, *args) -> Job:
+    try:
+        return get_job_queue().submit(fn, upload, *args, filename=upload.filename)
+    except QueueFullError as exc:
+        upload.file.close()
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "5"}) from exc
+
+
+def _upload_info(job: Job, upload: SpooledUpload) -> dict:
+    return {
+        "job_id": job.job_id,
+        "status_url": f"/jobs/{job.job_id}",
+        "upload_sha256": upload.sha256,
+        "upload_bytes": upload.size,
+    }
+
+
+@router.post("/analyze", status_code=202, openapi_extra=_UPLOAD_BODY)
+async def analyze(request: Request, force: bool = False, wait: bool = False, previous: str | None = _PREVIOUS):
+    _check_previous(previous)
+    upload = await _spool_upload(request)
+    job = _submit(_analyze_upload, upload, force, None, 0, previous)
+
+    if not wait:
+        return {"status": job.status, **_upload_info(job, upload)}
+
+    try:
+        payload = await asyncio.wrap_future(job.future)
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f"Analysis failed: {exc}") from exc
-    finally:
-        if tmp_path and tmp_path.exists():
-            tmp_path.unlink(missing_ok=True)
+    return Response(content=payload, media_type="application/json")
+
+
+def _encode_event(event: str, data: dict, sse: bool) -> bytes:
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    if sse:
+        return f"event: {event}\ndata: {body}\n\n".encode("utf-8")
+    return (json.dumps({"event": event, **data}, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+@router.post("/analyze/stream", openapi_extra=_UPLOAD_BODY)
+async def analyze_stream(request: Request, force: bool = False, previous: str | None = _PREVIOUS):
+    # Same analysis and persisted report as POST /analyze, reported as it happens: a `job` event,
+    # `document`, one `clause` event per clause (matched and scored STREAM_BATCH_SIZE at a time)
+    # and `summary`, or `error`. NDJSON by default; SSE when the client accepts text/event-stream.
+    sse = "text/event-stream" in request.headers.get("accept", "")
+    _check_previous(previous)
+    upload = await _spool_upload(request)
+    events: queue.Queue = queue.Queue()
+    job = _submit(_stream_upload, upload, force, events, previous)
+
+    async def body():
+        yield _encode_event("job", _upload_info(job, upload), sse)
+        while True:
+            item = await run_in_threadpool(events.get)
+            if item is None:
+                return
+            yield _encode_event(*item, sse)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
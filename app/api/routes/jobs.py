@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import json
+
+from fastapi import APIRouter, HTTPException, Response
+
+from app.api.jobs import get_job_queue
+
+
+router = APIRouter(tags=["jobs"])
+
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Response:
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    status = json.dumps(job.to_dict(include_result=False), separators=(",", ":")).encode("utf-8")
+    if job.status == "succeeded" and isinstance(job.result, bytes):
+        # Splice the already-serialized report in rather than parsing and re-encoding it.
+        status = status[:-1] + b',"result":' + job.result + b"}"
+    return Response(content=status, media_type="application/json")
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
+from datetime import datetime
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Response
 
 from app.config import settings
+from app.pipeline.report_catalog import SORT_COLUMNS, get_catalog
 
 
 router = APIRouter(tags=["reports"])
@@ -16,34 +17,49 @@ def _report_path(report_id: str) -> Path:
 
 
 @router.get("/reports/{report_id}")
-def get_report(report_id: str) -> dict:
+def get_report(report_id: str) -> Response:
     path = _report_path(report_id)
-    if not path.exists():
-        raise HTTPException(status_code=404, detail=f"Report not found: {report_id}")
-    return json.loads(path.read_text(encoding="utf-8"))
+    try:
+        payload = path.read_bytes()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Report not found: {report_id}") from None
+    return Response(content=payload, media_type="application/json")
+
+
+def _parse_time(value: str | None, name: str) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} must be an ISO 8601 date or epoch seconds.") from None
 
 
 @router.get("/reports")
-def list_reports() -> dict:
-    reports_dir = settings.report_path
-    reports_dir.mkdir(parents=True, exist_ok=True)
-
-    items = []
-    for path in sorted(reports_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
-        report_id = path.stem
-        try:
-            payload = json.loads(path.read_text(encoding="utf-8"))
-            source_file = payload.get("source_file", "")
-        except Exception:
-            source_file = ""
-
-        items.append(
-            {
-                "id": report_id,
-                "source_file": source_file,
-                "path": str(path),
-            }
+def list_reports(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    sort: str = Query("created_at", description=f"One of: {', '.join(SORT_COLUMNS)}"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    severity: str | None = Query(None, pattern="^(low|medium|high)$"),
+    since: str | None = None,
+    until: str | None = None,
+) -> dict:
+    try:
+        items, next_cursor = get_catalog(settings.report_path).query(
+            limit=limit,
+            cursor=cursor,
+            sort=sort,
+            order=order,
+            severity=severity,
+            since=_parse_time(since, "since"),
+            until=_parse_time(until, "until"),
         )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    return {"count": len(items), "reports": items}
-
+    return {"count": len(items), "reports": items, "next_cursor": next_cursor}
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.pipeline.rag_match import FallbackIndex
+from app.rag.index_store import normalize_rows
+from app.rag.ivf import default_list_count, train_ivf
+
+
+def clustered_vectors(rows: int, dim: int, clusters: int, spread: float, seed: int) -> np.ndarray:
+    # Regulation chunks embed as topical clusters rather than isotropic noise, which is what IVF exploits.
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, rows)
+    return centers[labels] + spread * rng.standard_normal((rows, dim)).astype(np.float32)
+
+
+def _timed_search(index: FallbackIndex, queries: np.ndarray, top_k: int, nprobe: int) -> tuple[np.ndarray, float]:
+    start = time.perf_counter()
+    ids, _ = index.search(queries, top_k, nprobe=nprobe)
+    return ids, time.perf_counter() - start
+
+
+def run_benchmark(
+    chunks: int, queries: int, dim: int, top_k: int, lists: int, nprobes: list[int], clusters: int, spread: float, seed: int
+) -> dict:
+    corpus = normalize_rows(clustered_vectors(chunks, dim, clusters, spread, seed))
+    sample = np.random.default_rng(seed + 1).choice(chunks, queries)
+    # Queries are perturbed corpus rows, like clauses that paraphrase a regulation.
+    query_rows = corpus[sample] + 0.5 * spread * np.random.default_rng(seed + 2).standard_normal((queries, dim)).astype(np.float32)
+
+    lists = lists or default_list_count(chunks)
+    start = time.perf_counter()
+    ivf = train_ivf(corpus, lists)
+    build_s = time.perf_counter() - start
+    index = FallbackIndex(
+        embeddings=corpus, documents=[""] * chunks, articles=[""] * chunks, topics=[""] * chunks, ivf=ivf
+    )
+
+    exact_ids, exact_s = _timed_search(index, query_rows, top_k, nprobe=0)
+    sizes = np.diff(ivf.offsets)
+    runs = []
+    for nprobe in sorted(set(nprobes)):
+        ids, elapsed = _timed_search(index, query_rows, top_k, nprobe=nprobe)
+        hits = sum(len(set(a) & set(b)) for a, b in zip(ids.tolist(), exact_ids.tolist()))
+        runs.append(
+            {
+                "nprobe": nprobe,
+                f"recall_at_{top_k}": round(hits / (queries * exact_ids.shape[1]), 4),
+                "qps": round(queries / max(elapsed, 1e-9), 1),
+                "speedup": round(exact_s / max(elapsed, 1e-9), 2),
+                "scanned_fraction": round(min(1.0, nprobe * float(sizes.mean()) / chunks), 4),
+            }
+        )
+    return {
+        "chunks": chunks,
+        "queries": queries,
+        "dim": dim,
+        "top_k": top_k,
+        "lists": ivf.nlist,
+        "largest_list": int(sizes.max()),
+        "ivf_build_s": round(build_s, 3),
+        "exact_qps": round(queries / max(exact_s, 1e-9), 1),
+        "runs": runs,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark IVF approximate retrieval against exact search")
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists (default: sqrt(chunks))")
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32", help="Comma-separated nprobe values to sweep")
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--spread", type=float, default=0.35)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    nprobes = [int(n) for n in args.nprobe.split(",") if n.strip()]
+    result = run_benchmark(
+        args.chunks, args.queries, args.dim, args.top_k, args.lists, nprobes, args.clusters, args.spread, args.seed
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from app.benchmarks.synthetic import HEADING_STYLES, write_regulation_corpus, write_synthetic_contract
+from app.config import override_settings
+
+
+BASELINE_PATH = Path(__file__).with_name("baselines") / "pipeline.json"
+DEFAULT_CONFIG = {
+    "pages": 20,
+    "clauses": 200,
+    "heading_style": "mixed",
+    "duplicate_rate": 0.2,
+    "chunks": 2000,
+    "seed": 7,
+}
+
+
+def _timed(fn: Callable):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def _run_stages(pdf: Path) -> dict[str, float]:
+    # The same stages run_pipeline times for a report, called one by one on already-read input.
+    from app.pipeline.dedupe import plan_clauses
+    from app.pipeline.extract_clauses import iter_clauses
+    from app.pipeline.fingerprint import pipeline_fingerprint
+    from app.pipeline.rag_match import match_clauses_to_gdpr
+    from app.pipeline.risk_score import score_risks
+    from app.pipeline.suggest_fixes import suggest_fixes
+    from app.utils.pdf_text import iter_pdf_text
+
+    out: dict[str, float] = {}
+    pieces, out["pdf_text"] = _timed(lambda: list(iter_pdf_text(pdf)))
+    clauses, out["segment"] = _timed(lambda: list(iter_clauses(pieces)))
+    plan, out["dedupe"] = _timed(lambda: plan_clauses(clauses, pipeline_fingerprint(), use_store=False))
+    matches, out["match"] = _timed(lambda: match_clauses_to_gdpr(plan.fresh))
+    all_matches, fan_out_s = _timed(lambda: plan.fan_out(matches))
+    out["dedupe"] += fan_out_s
+    risks, out["score"] = _timed(lambda: score_risks(clauses, all_matches))
+    _, out["fixes"] = _timed(lambda: suggest_fixes(clauses, all_matches, risks))
+    return out
+
+
+def _api_analyze(client, pdf: Path) -> None:
+    with pdf.open("rb") as fh:
+        response = client.post("/analyze?wait=true&force=true", files={"file": (pdf.name, fh, "application/pdf")})
+    if response.status_code != 200:
+        raise RuntimeError(f"/analyze returned {response.status_code}: {response.text[:200]}")
+
+
+def run_benchmark(config: dict, repeat: int = 5, api: bool = False) -> dict:
+    # Fully offline: hash embeddings, no LLM notes, and every store (index, caches, reports)
+    # inside a temporary directory, so results depend only on the config and the machine.
+    with tempfile.TemporaryDirectory() as tmp, override_settings(
+        openai_api_key="",
+        enable_llm_risk_explanations=False,
+        chroma_dir=f"{tmp}/chroma",
+        report_dir=f"{tmp}/reports",
+        embed_cache_path=f"{tmp}/embeddings.sqlite3",
+        llm_cache_path=f"{tmp}/llm.sqlite3",
+        clause_store_path=f"{tmp}/clauses.sqlite3",
+        chunk_workers=1,
+    ):
+        from app.pipeline.run_pipeline import analyze_document, run
+        from app.rag.build_index import update_index
+
+        manifest = write_regulation_corpus(f"{tmp}/corpus", config["chunks"], seed=config["seed"])
+        pdf = write_synthetic_contract(
+            f"{tmp}/contract.pdf",
+            config["pages"],
+            config["clauses"],
+            config["heading_style"],
+            config["duplicate_rate"],
+            seed=config["seed"],
+        )
+
+        def build():
+            return update_index(full=True, manifest=manifest, chunks_path=f"{tmp}/chunks.jsonl", workers=1)
+
+        built = build()
+        report = analyze_document(str(pdf), force=True)
+        client = None
+        if api:
+            from fastapi.testclient import TestClient
+
+            from app.api.main import app
+
+            client = TestClient(app)
+            _api_analyze(client, pdf)
+
+        samples: dict[str, list[float]] = {}
+        for _ in range(max(1, repeat)):
+            gc.collect()
+            timings = _run_stages(pdf)
+            _, timings["build_index"] = _timed(build)
+            _, timings["run"] = _timed(lambda: run(str(pdf), force=True))
+            if client is not None:
+                _, timings["api_analyze"] = _timed(lambda: _api_analyze(client, pdf))
+            for stage, seconds in timings.items():
+                samples.setdefault(stage, []).append(seconds)
+
+    return {
+        "benchmark": "pipeline",
+        "config": dict(config),
+        "repeat": max(1, repeat),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count() or 1,
+        },
+        "counts": {
+            "chunks": built.total,
+            "clauses": len(report.clauses),
+            "analysed_clauses": len(report.clauses) - sum(len(g.members) - 1 for g in report.duplicate_groups),
+        },
+        "stages": {
+            stage: {"median_s": round(statistics.median(values), 5), "min_s": round(min(values), 5)}
+            for stage, values in samples.items()
+        },
+    }
+
+
+def compare(result: dict, baseline: dict, threshold: float, per_stage: dict[str, float], min_delta_s: float) -> list[dict]:
+    # Best-of-N times are compared; they are far less noisy than medians on shared machines. A stage
+    # regresses when it is more than `threshold` (a fraction) slower than the baseline and by at least
+    # `min_delta_s`, which keeps millisecond-scale stages from flapping.
+    if result["config"] != baseline.get("config"):
+        raise ValueError(f"Baseline config {baseline.get('config')} does not match {result['config']}")
+    rows = []
+    for stage, current in result["stages"].items():
+        before = baseline.get("stages", {}).get(stage)
+        if before is None:
+            continue
+        limit = per_stage.get(stage, threshold)
+        ratio = current["min_s"] / max(before["min_s"], 1e-9)
+        regressed = ratio > 1 + limit and current["min_s"] - before["min_s"] >= min_delta_s
+        rows.append(
+            {
+                "stage": stage,
+                "baseline_s": before["min_s"],
+                "current_s": current["min_s"],
+                "ratio": round(ratio, 3),
+                "threshold": limit,
+                "regressed": regressed,
+            }
+        )
+    return rows
+
+
+def _stage_thresholds(values: list[str]) -> dict[str, float]:
+    out = {}
+    for value in values:
+        stage, _, limit = value.partition("=")
+        if not limit:
+            raise argparse.ArgumentTypeError(f"Expected STAGE=FRACTION, got {value!r}")
+        out[stage] = float(limit)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on a seeded synthetic contract and corpus")
+    parser.add_argument("--pages", type=int, default=DEFAULT_CONFIG["pages"])
+    parser.add_argument("--clauses", type=int, default=DEFAULT_CONFIG["clauses"])
+    parser.add_argument("--heading-style", choices=HEADING_STYLES, default=DEFAULT_CONFIG["heading_style"])
+    parser.add_argument("--duplicate-rate", type=float, default=DEFAULT_CONFIG["duplicate_rate"])
+    parser.add_argument("--chunks", type=int, default=DEFAULT_CONFIG["chunks"], help="Regulation corpus size")
+    parser.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions after one warm-up run")
+    parser.add_argument("--api", action="store_true", help="Also time POST /analyze?wait=true through the app")
+    parser.add_argument("--out", default=None, help="Write the results JSON here as well as to stdout")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline results to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--threshold", type=float, default=0.5, help="Allowed slowdown as a fraction (0.5 = 50%%)")
+    parser.add_argument(
+        "--stage-threshold", action="append", default=[], metavar="STAGE=FRACTION", help="Per-stage override"
+    )
+    parser.add_argument("--min-delta-ms", type=float, default=10.0, help="Ignore slowdowns smaller than this")
+    args = parser.parse_args()
+
+    config = {
+        "pages": args.pages,
+        "clauses": args.clauses,
+        "heading_style": args.heading_style,
+        "duplicate_rate": args.duplicate_rate,
+        "chunks": args.chunks,
+        "seed": args.seed,
+    }
+    result = run_benchmark(config, repeat=args.repeat, api=args.api)
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        try:
+            result["comparison"] = compare(
+                result, baseline, args.threshold, _stage_thresholds(args.stage_threshold), args.min_delta_ms / 1000
+            )
+        except (ValueError, argparse.ArgumentTypeError) as exc:
+            parser.error(str(exc))
+
+    text = json.dumps(result, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    regressions = [row["stage"] for row in result.get("comparison", []) if row["regressed"]]
+    if regressions:
+        print(f"Regressed against {baseline_path}: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.pipeline.rag_match import FALLBACK_INDEX, load_fallback_index
+from app.rag.index_store import index_files, write_binary_index
+
+
+def _legacy_cosine(a: list[float], b: list[float]) -> float:
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    dot = sum(x * y for x, y in zip(a, b))
+    na = sum(x * x for x in a) ** 0.5
+    nb = sum(y * y for y in b) ** 0.5
+    if na == 0 or nb == 0:
+        return 0.0
+    return max(0.0, min(1.0, dot / (na * nb)))
+
+
+def _legacy_search(rows: list[dict], queries: list[list[float]], top_k: int) -> list[list[float]]:
+    out = []
+    for emb in queries:
+        ranked = sorted(rows, key=lambda r: _legacy_cosine(emb, r["embedding"]), reverse=True)[:top_k]
+        out.append([_legacy_cosine(emb, r["embedding"]) for r in ranked])
+    return out
+
+
+def run_benchmark(chunks: int, clauses: int, dim: int, top_k: int, legacy_sample: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    corpus = np.random.default_rng(seed).standard_normal((chunks, dim)).astype(np.float32)
+    rows = [
+        {
+            "id": f"chunk_{i}",
+            "document": f"synthetic regulation chunk {i}",
+            "metadata": {"article": f"Article {rng.randint(1, 99)}", "topic": "synthetic", "source": "bench"},
+            "embedding": corpus[i].tolist(),
+        }
+        for i in range(chunks)
+    ]
+    queries = np.random.default_rng(seed + 1).standard_normal((clauses, dim)).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_dir = Path(tmp) / "json"
+        json_dir.mkdir()
+        json_path = json_dir / FALLBACK_INDEX
+        json_path.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+        start = time.perf_counter()
+        load_fallback_index(json_dir)
+        json_load_s = time.perf_counter() - start
+
+        bin_dir = Path(tmp) / "binary"
+        write_binary_index(
+            bin_dir,
+            [r["id"] for r in rows],
+            [r["document"] for r in rows],
+            [r["metadata"] for r in rows],
+            corpus,
+        )
+        start = time.perf_counter()
+        index = load_fallback_index(bin_dir)
+        load_s = time.perf_counter() - start
+        json_bytes = json_path.stat().st_size
+        bin_bytes = sum(p.stat().st_size for p in index_files(bin_dir))
+
+        start = time.perf_counter()
+        _, top_scores = index.search(queries, top_k)
+        search_s = time.perf_counter() - start
+
+    sample = max(1, min(legacy_sample, clauses))
+    start = time.perf_counter()
+    legacy_scores = _legacy_search(rows, queries[:sample].tolist(), top_k)
+    legacy_s = (time.perf_counter() - start) * clauses / sample
+
+    max_abs_diff = float(np.max(np.abs(np.asarray(legacy_scores) - top_scores[:sample])))
+    return {
+        "chunks": chunks,
+        "clauses": clauses,
+        "dim": dim,
+        "top_k": top_k,
+        "json_index_bytes": json_bytes,
+        "binary_index_bytes": bin_bytes,
+        "json_index_load_s": round(json_load_s, 4),
+        "binary_index_load_s": round(load_s, 4),
+        "vectorized_search_s": round(search_s, 4),
+        "legacy_search_s_estimated": round(legacy_s, 2),
+        "legacy_sampled_clauses": sample,
+        "speedup": round(legacy_s / max(search_s, 1e-9), 1),
+        "max_abs_score_diff": max_abs_diff,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark vectorized fallback retrieval against the legacy loop")
+    parser.add_argument("--chunks", type=int, default=10_000)
+    parser.add_argument("--clauses", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--legacy-sample", type=int, default=5, help="Clauses timed with the legacy loop, then scaled")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    result = run_benchmark(args.chunks, args.clauses, args.dim, args.top_k, args.legacy_sample, args.seed)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
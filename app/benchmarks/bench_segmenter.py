@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import time
+
+from app.benchmarks.synthetic import synthetic_contract_text
+from app.utils.text_clean import ClauseSegmenter
+
+
+def legacy_normalize_text(text: str) -> str:
+    text = text.replace("\u00a0", " ")
+    text = re.sub(r"\r\n?", "\n", text)
+    text = re.sub(r"[\t ]+", " ", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    cleaned_lines: list[str] = []
+    for line in text.split("\n"):
+        s = line.strip()
+        if not s:
+            cleaned_lines.append("")
+            continue
+        if re.match(r"^\d{1,2}/\d{1,2}/\d{2,4},\s+\d{1,2}:\d{2}\s+[AP]M\b", s):
+            continue
+        if re.match(r"^https?://\S+$", s):
+            continue
+        if re.match(r"^\d+/\d+\s*$", s):
+            continue
+        if s in {"TRY GROK", "TRY GROK ON", "Web", "iOS", "Android"}:
+            continue
+        cleaned_lines.append(line)
+    text = "\n".join(cleaned_lines)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def _legacy_is_heading_line(line: str) -> bool:
+    s = line.strip()
+    if not s:
+        return False
+    if re.match(r"^\d{1,2}(?:\.\d+)?[.)]\s+\S", s):
+        return True
+    if re.match(r"^[A-Z][A-Za-z0-9,&/'()\- ]{2,70}:?$", s):
+        words = s.replace(":", "").split()
+        if 1 <= len(words) <= 10 and all(w[:1].isupper() or w.isupper() for w in words if w):
+            return True
+    if re.match(r"^\d{1,2}/\d{1,2}/\d{2,4},\s+\d{1,2}:\d{2}\s+[AP]M\b", s):
+        return True
+    if re.match(r"^https?://\S+$", s):
+        return True
+    if s in {"TRY GROK", "PRODUCTS", "COMPANY", "RESOURCES"}:
+        return True
+    return False
+
+
+def _legacy_merge_small_blocks(blocks: list[str], min_chars: int) -> list[str]:
+    merged: list[str] = []
+    for block in blocks:
+        if merged and len(block) < min_chars:
+            merged[-1] = (merged[-1].rstrip() + "\n" + block.lstrip()).strip()
+        else:
+            merged.append(block)
+    return merged
+
+
+def legacy_split_blocks(text: str, min_chars: int = 60) -> list[str]:
+    lines = text.splitlines()
+    starts = []
+    pos = 0
+    for line in lines:
+        if _legacy_is_heading_line(line):
+            starts.append(pos)
+        pos += len(line) + 1
+    starts = sorted(set(starts))
+    if starts:
+        spans = starts + [len(text)]
+        blocks = []
+        for i in range(len(starts)):
+            chunk = text[spans[i] : spans[i + 1]].strip()
+            if len(chunk) >= min_chars:
+                blocks.append(chunk)
+        blocks = _legacy_merge_small_blocks(blocks, min_chars)
+        if blocks:
+            return blocks
+    para_split = [p.strip() for p in text.split("\n\n") if len(p.strip()) >= min_chars]
+    return _legacy_merge_small_blocks(para_split, min_chars)
+
+
+def legacy_clause_blocks(raw_text: str) -> list[str]:
+    # extract_clauses() before the streaming segmenter: three regex passes, a line loop,
+    # then a second pass over the normalized string.
+    text = legacy_normalize_text(raw_text)
+    return legacy_split_blocks(text) or [text]
+
+
+def streaming_clause_blocks(pieces) -> list[str]:
+    segmenter = ClauseSegmenter(whole_text_fallback=True)
+    blocks: list[str] = []
+    for piece in pieces:
+        blocks.extend(segmenter.feed(piece))
+    return blocks + segmenter.close()
+
+
+def run_benchmark(size_mb: float, piece_kb: int, seed: int) -> dict:
+    text = synthetic_contract_text(int(size_mb * 1_000_000), seed=seed)
+    mb = len(text.encode("utf-8")) / 1_000_000
+    step = max(1, piece_kb * 1000)
+
+    start = time.perf_counter()
+    legacy = legacy_clause_blocks(text)
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    streamed = streaming_clause_blocks(text[i : i + step] for i in range(0, len(text), step))
+    streaming_s = time.perf_counter() - start
+
+    return {
+        "document_mb": round(mb, 2),
+        "piece_kb": piece_kb,
+        "blocks": len(streamed),
+        "identical": streamed == legacy,
+        "legacy_s": round(legacy_s, 3),
+        "streaming_s": round(streaming_s, 3),
+        "legacy_mb_per_s": round(mb / legacy_s, 2),
+        "streaming_mb_per_s": round(mb / streaming_s, 2),
+        "speedup": round(legacy_s / max(streaming_s, 1e-9), 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the streaming clause segmenter against the multi-pass one")
+    parser.add_argument("--size-mb", type=float, default=50.0, help="Synthetic document size")
+    parser.add_argument("--piece-kb", type=int, default=4, help="Size of each fed piece (roughly one PDF page)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(json.dumps(run_benchmark(args.size_mb, args.piece_kb, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
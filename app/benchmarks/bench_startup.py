@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from app.benchmarks.synthetic import write_regulation_corpus
+
+
+BUDGETS_PATH = Path(__file__).with_name("baselines") / "startup.json"
+ROOT = Path(__file__).resolve().parents[2]
+MODULES = ("app.config", "app.pipeline.run_pipeline", "app.rag.build_index", "app.api.main")
+
+
+def _env(workspace: Path, manifest: Path | None = None) -> dict[str, str]:
+    # Commands run from an empty workspace (no .env, caches or reports) with the repo on PYTHONPATH.
+    env = dict(os.environ)
+    env.update(
+        PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH", "")])),
+        OPENAI_API_KEY="",
+        CHROMA_DIR=str(workspace / "chroma"),
+        CHUNK_WORKERS="1",
+    )
+    if manifest is not None:
+        env["CORPUS_MANIFEST"] = str(manifest)
+    return env
+
+
+def _command(args: list[str], env: dict[str, str], cwd: Path) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], env=env, cwd=cwd, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    # `-X importtime` lines: "import time: <self us> | <cumulative us> | <indented module>".
+    out: dict[str, tuple[int, int]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        out[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return out
+
+
+def import_profile(module: str, cwd: Path | None = None, env: dict[str, str] | None = None) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        cwd=cwd or ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    times = parse_importtime(proc.stderr)
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    return {
+        "cumulative_s": times.get(module, (0, 0))[1] / 1e6,
+        "modules": sorted(times),
+        "slowest": [{"module": name, "self_s": self_us / 1e6} for name, (self_us, _) in slowest],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _poll(url: str, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.01)
+    return False
+
+
+def _api_startup(env: dict[str, str], cwd: Path, timeout_s: float = 60.0) -> tuple[float, float]:
+    # Seconds from spawning the server to the first /health 200, and to /ready turning 200.
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+        cwd=cwd,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        if not _poll(f"{base}/health", started + timeout_s):
+            raise RuntimeError("API did not answer /health")
+        first = time.perf_counter() - started
+        if not _poll(f"{base}/ready", started + timeout_s):
+            raise RuntimeError("API did not become ready")
+        return first, time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def run_benchmark(repeat: int = 3, chunks: int = 500, api: bool = True) -> dict:
+    samples: dict[str, list[float]] = {}
+    imports: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workspace = Path(tmp)
+        manifest = write_regulation_corpus(workspace / "corpus", chunks, seed=7)
+        env = _env(workspace, manifest)
+        # Built once up front, so the timed build_index runs measure the "already up to date" path.
+        _command(["-m", "app.rag.build_index"], env, workspace)
+        for _ in range(max(1, repeat)):
+            timings = {
+                "run_pipeline_help": _command(["-m", "app.pipeline.run_pipeline", "--help"], env, workspace),
+                "build_index_help": _command(["-m", "app.rag.build_index", "--help"], env, workspace),
+                "build_index": _command(["-m", "app.rag.build_index"], env, workspace),
+            }
+            if api:
+                timings["api_first_response"], timings["api_ready"] = _api_startup(env, workspace)
+            for module in MODULES:
+                profile = import_profile(module, workspace, env)
+                timings[f"import:{module}"] = profile["cumulative_s"]
+                best = imports.get(module)
+                if best is None or profile["cumulative_s"] < best["cumulative_s"]:
+                    imports[module] = profile
+            for name, seconds in timings.items():
+                samples.setdefault(name, []).append(seconds)
+
+    return {
+        "benchmark": "startup",
+        "repeat": max(1, repeat),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count() or 1},
+        "timings": {name: round(min(values), 4) for name, values in samples.items()},
+        "imports": {module: {"modules": p["modules"], "slowest": p["slowest"]} for module, p in imports.items()},
+    }
+
+
+def check(result: dict, budgets: dict) -> list[str]:
+    # Best-of-N wall times against absolute budgets, plus modules that must stay out of an import.
+    problems = []
+    for name, limit in budgets.get("budgets_s", {}).items():
+        seconds = result["timings"].get(name)
+        if seconds is not None and seconds > limit:
+            problems.append(f"{name} took {seconds:.3f}s (budget {limit}s)")
+    for module, banned in budgets.get("forbidden_imports", {}).items():
+        loaded = set(result["imports"].get(module, {}).get("modules", []))
+        for name in banned:
+            if name in loaded:
+                problems.append(f"import {module} loads {name}")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time cold starts of the CLIs and the API in fresh interpreters")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per command; the fastest is reported")
+    parser.add_argument("--chunks", type=int, default=500, help="Regulation corpus size for build_index")
+    parser.add_argument("--no-api", action="store_true", help="Skip starting the API server")
+    parser.add_argument("--budgets", default=str(BUDGETS_PATH), help="Budgets to check against")
+    parser.add_argument("--out", default=None, help="Write the results JSON here as well as to stdout")
+    args = parser.parse_args()
+
+    result = run_benchmark(repeat=args.repeat, chunks=args.chunks, api=not args.no_api)
+    budgets_path = Path(args.budgets)
+    if budgets_path.exists():
+        result["problems"] = check(result, json.loads(budgets_path.read_text(encoding="utf-8")))
+
+    shown = dict(result)
+    shown["imports"] = {module: p["slowest"] for module, p in result["imports"].items()}
+    text = json.dumps(shown, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    print(text)
+    if result.get("problems"):
+        print("Over startup budget:\n  " + "\n  ".join(result["problems"]), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
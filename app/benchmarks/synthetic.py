@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_text_pdf(path: str | Path, pages: list[str]) -> Path:
+    objects: list[bytes] = []
+    page_ids = [4 + 2 * i for i in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{pid} 0 R" for pid in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode("ascii"))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for pid, text in zip(page_ids, pages):
+        lines = [f"({_pdf_escape(line)}) '" for line in text.splitlines()]
+        stream = ("BT /F1 9 Tf 11 TL 40 780 Td\n" + "\n".join(lines) + "\nET").encode("latin-1", errors="replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {pid + 1} 0 R >>".encode("ascii")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    target = Path(path)
+    target.write_bytes(bytes(out))
+    return target
+
+
+_WORDS = (
+    "controller processor personal data shall may security breach notify retention transfer consent "
+    "audit rights subject agreement party services customer vendor confidential obligations law "
+    "period days written notice terminate provide reasonable measures access request"
+).split()
+_NOISE = ["3/14/25, 10:02 AM", "https://example.com/terms", "2/9", "TRY GROK", "Web", "", "", "   \t  "]
+
+
+def synthetic_contract_text(target_chars: int, seed: int = 0) -> str:
+    # Contract-shaped text with numbered and title headings, wrapped paragraphs and
+    # web-export noise lines, so every normalization and segmentation branch is exercised.
+    rng = random.Random(seed)
+    lines: list[str] = []
+    size = 0
+    section = 0
+    while size < target_chars:
+        roll = rng.random()
+        if roll < 0.04:
+            section += 1
+            line = f"{section % 40}. {' '.join(rng.choice(_WORDS) for _ in range(rng.randint(1, 5))).title()}"
+        elif roll < 0.06:
+            line = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(1, 4))).title() + rng.choice(["", ":"])
+        elif roll < 0.12:
+            line = rng.choice(_NOISE)
+        else:
+            words = [rng.choice(_WORDS) for _ in range(rng.randint(4, 16))]
+            line = rng.choice(["", " ", "\t"]) + " ".join(words) + rng.choice([".", ",", "", "  "])
+        lines.append(line)
+        size += len(line) + 1
+    return rng.choice(["\n", "\r\n"]).join(lines)
+
+
+HEADING_STYLES = ("numbered", "decimal", "title", "mixed")
+
+# Per topic: a section title and sentence templates. Topics mirror the rule categories so that
+# matching and scoring do realistic work on generated contracts and corpora.
+_TOPICS = {
+    "security": (
+        "Data Security",
+        [
+            "Vendor shall implement appropriate technical and organizational measures to protect personal data.",
+            "Measures include encryption of personal data at rest and in transit and role based access controls.",
+            "Vendor will test and evaluate the effectiveness of its security measures every {n} months.",
+            "Access to customer data is limited to personnel who need it to provide the services.",
+        ],
+    ),
+    "breach_notification": (
+        "Breach Notification",
+        [
+            "Vendor shall notify customer of a personal data breach without undue delay and within {n} hours.",
+            "The notice will describe the nature of the breach, the categories of data and the likely consequences.",
+            "Vendor will cooperate with customer and provide reasonable assistance to contain the incident.",
+        ],
+    ),
+    "retention": (
+        "Data Retention",
+        [
+            "Personal data will be retained for {n} days after termination of the agreement.",
+            "On expiry of the retention period vendor shall delete or return all customer data.",
+            "Backups are overwritten on a rolling schedule of no more than {n} days.",
+        ],
+    ),
+    "transfer": (
+        "International Transfers",
+        [
+            "Vendor shall not transfer personal data outside the region without prior written consent.",
+            "Transfers to third countries rely on standard contractual clauses and supplementary measures.",
+            "Vendor will maintain a list of the countries where customer data is processed.",
+        ],
+    ),
+    "subprocessor": (
+        "Subprocessors",
+        [
+            "Vendor may engage subprocessors and shall give customer {n} days notice of any new subprocessor.",
+            "Each subprocessor is bound by written obligations no less protective than this agreement.",
+            "Vendor remains liable for the acts and omissions of its subprocessors.",
+        ],
+    ),
+    "audit": (
+        "Audit Rights",
+        [
+            "Customer may audit vendor compliance with this agreement once every {n} months.",
+            "Vendor shall make available all information necessary to demonstrate compliance.",
+            "Audits are conducted on reasonable notice during normal business hours.",
+        ],
+    ),
+    "confidentiality": (
+        "Confidentiality",
+        [
+            "Each party shall keep the confidential information of the other party secret.",
+            "Confidential information may be disclosed only to employees bound by confidentiality obligations.",
+            "These obligations survive termination for a period of {n} years.",
+        ],
+    ),
+    "lawful_basis": (
+        "Purpose Of Processing",
+        [
+            "Vendor shall process personal data only on documented instructions from customer.",
+            "Processing is limited to what is necessary to provide the services described in the order form.",
+            "Customer is responsible for the lawful basis of processing and any consent required.",
+        ],
+    ),
+}
+
+
+def _sentences(rng: random.Random, templates: list[str], count: int) -> list[str]:
+    picked = rng.sample(templates, min(count, len(templates)))
+    return [t.format(n=rng.choice([3, 7, 12, 24, 30, 48, 72, 90])) for t in picked]
+
+
+def _wrap(text: str, rng: random.Random) -> list[str]:
+    # Wrapped body lines always contain lowercase words, so none of them reads as a heading.
+    words = text.split()
+    lines: list[str] = []
+    width = rng.randint(60, 95)
+    current: list[str] = []
+    for word in words:
+        if current and len(" ".join(current + [word])) > width:
+            lines.append(" ".join(current))
+            current = []
+        current.append(word)
+    if lines and len(current) < 4:
+        lines[-1] += " " + " ".join(current)
+    elif current:
+        lines.append(" ".join(current))
+    return lines
+
+
+def _heading(style: str, index: int, title: str, rng: random.Random) -> str:
+    if style == "mixed":
+        style = rng.choice(HEADING_STYLES[:3])
+    if style == "numbered":
+        return f"{index % 99 + 1}. {title}"
+    if style == "decimal":
+        return f"{index // 9 % 99 + 1}.{index % 9 + 1}. {title}"
+    return f"{title}:"
+
+
+def synthetic_contract_clauses(
+    clauses: int, heading_style: str = "numbered", duplicate_rate: float = 0.0, seed: int = 0
+) -> list[list[str]]:
+    # One list of lines per clause: a heading followed by a wrapped body. With probability
+    # `duplicate_rate` a clause repeats the body of an earlier one, like boilerplate and annexes.
+    if heading_style not in HEADING_STYLES:
+        raise ValueError(f"heading_style must be one of {HEADING_STYLES}")
+    rng = random.Random(seed)
+    topics = list(_TOPICS)
+    bodies: list[tuple[str, str]] = []
+    out = []
+    for i in range(clauses):
+        if bodies and rng.random() < duplicate_rate:
+            title, body = rng.choice(bodies)
+        else:
+            title, templates = _TOPICS[topics[rng.randrange(len(topics))]]
+            body = " ".join(_sentences(rng, templates, rng.randint(2, 4)))
+            bodies.append((title, body))
+        out.append([_heading(heading_style, i, title, rng)] + _wrap(body, rng))
+    return out
+
+
+def write_synthetic_contract(
+    path: str | Path,
+    pages: int,
+    clauses: int,
+    heading_style: str = "numbered",
+    duplicate_rate: float = 0.0,
+    seed: int = 0,
+) -> Path:
+    lines = [line for clause in synthetic_contract_clauses(clauses, heading_style, duplicate_rate, seed) for line in clause]
+    pages = max(1, pages)
+    per_page = -(-len(lines) // pages)
+    return write_text_pdf(path, ["\n".join(lines[p * per_page : (p + 1) * per_page]) for p in range(pages)])
+
+
+def write_regulation_corpus(
+    directory: str | Path, chunks: int, seed: int = 0, chunk_size: int = 500, chunks_per_file: int = 50
+) -> Path:
+    # Every line is exactly one window (chunk_size chars with its newline, no overlap), so the
+    # manifest yields exactly `chunks` chunks. Returns the manifest path.
+    rng = random.Random(seed)
+    root = Path(directory)
+    source = root / "source"
+    source.mkdir(parents=True, exist_ok=True)
+    topics = list(_TOPICS.values())
+    remaining, article = chunks, 0
+    while remaining > 0:
+        article += 1
+        _, templates = topics[article % len(topics)]
+        lines = []
+        for _ in range(min(chunks_per_file, remaining)):
+            text = ""
+            while len(text) < chunk_size:
+                text += " ".join(_sentences(rng, templates, len(templates))) + " "
+            lines.append(text[: chunk_size - 1].rstrip().ljust(chunk_size - 1, "."))
+        (source / f"synth_article_{article}.txt").write_text("\n".join(lines), encoding="utf-8")
+        remaining -= len(lines)
+    manifest = root / "manifest.json"
+    manifest.write_text(
+        json.dumps(
+            {
+                "sources": [
+                    {
+                        "regulation": "SYNTH",
+                        "jurisdiction": "XX",
+                        "source_dir": "source",
+                        "chunk_size": chunk_size,
+                        "overlap": 0,
+                    }
+                ]
+            },
+            indent=2,
+        ),
+        encoding="utf-8",
+    )
+    return manifest
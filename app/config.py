@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
 from pathlib import Path
+from typing import Iterator, Mapping
 
 
 def _load_dotenv_if_present(path: str = ".env") -> None:
@@ -20,6 +22,25 @@ def _load_dotenv_if_present(path: str = ".env") -> None:
             os.environ[key] = value
 
 
+def _env_int(env: Mapping[str, str], name: str, default: int) -> int:
+    try:
+        return int(env.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_float(env: Mapping[str, str], name: str, default: float) -> float:
+    try:
+        return float(env.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _env_bool(env: Mapping[str, str], name: str, default: bool = False) -> bool:
+    raw = env.get(name, "1" if default else "0").strip().lower()
+    return raw in {"1", "true", "yes", "on"}
+
+
 @dataclass
 class Settings:
     openai_api_key: str
@@ -29,6 +50,47 @@ class Settings:
     report_dir: str
     clause_top_k: int
     enable_llm_risk_explanations: bool
+    report_max_age_s: int = 0
+    pdf_workers: int = 4
+    pdf_parallel_min_pages: int = 64
+    pdf_pages_per_task: int = 8
+    pdf_page_timeout_s: float = 30.0
+    job_backend: str = "inprocess"
+    job_workers: int = 2
+    job_queue_depth: int = 16
+    job_retention: int = 1000
+    stream_batch_size: int = 8
+    upload_max_bytes: int = 50 * 1024 * 1024
+    upload_spool_bytes: int = 4 * 1024 * 1024
+    openai_base_url: str = ""
+    hash_embed_dim: int = 128
+    hash_embed_ngrams: int = 1
+    hash_embed_cache_size: int = 100_000
+    embed_dimensions: int = 0
+    embed_max_concurrency: int = 4
+    embed_batch_tokens: int = 100_000
+    embed_batch_size: int = 256
+    embed_max_retries: int = 5
+    embed_timeout_s: float = 30.0
+    embed_cache_path: str = "storage/cache/embeddings.sqlite3"
+    embed_cache_max_entries: int = 200_000
+    embed_cache_memory_entries: int = 4096
+    rules_path: str = ""
+    llm_explain_min_score: int = 40
+    llm_explain_concurrency: int = 4
+    llm_explain_timeout_s: float = 20.0
+    llm_explain_wait_s: float = 30.0
+    llm_cache_path: str = "storage/cache/llm_explanations.sqlite3"
+    corpus_manifest: str = "data/regulations/manifest.json"
+    chunk_workers: int = 1
+    ann_min_rows: int = 50_000
+    ann_lists: int = 0
+    ann_nprobe: int = 8
+    dedupe_threshold: float = 0.9
+    clause_store_path: str = "storage/cache/clauses.sqlite3"
+    clause_store_max_entries: int = 200_000
+    version_min_overlap: float = 0.5
+    version_change_threshold: float = 0.5
 
     @property
     def chroma_path(self) -> Path:
@@ -39,23 +101,89 @@ class Settings:
         return Path(self.report_dir)
 
 
-_load_dotenv_if_present()
+def load_settings(environ: Mapping[str, str] | None = None, dotenv: str | None = ".env") -> Settings:
+    # From `environ`, or from os.environ after applying `dotenv` (which never overrides real variables).
+    if environ is None and dotenv:
+        _load_dotenv_if_present(dotenv)
+    env = os.environ if environ is None else environ
+    return Settings(
+        openai_api_key=env.get("OPENAI_API_KEY", ""),
+        model_text=env.get("MODEL_TEXT", "gpt-4.1-mini"),
+        model_embed=env.get("MODEL_EMBED", "text-embedding-3-small"),
+        chroma_dir=env.get("CHROMA_DIR", "storage/chroma"),
+        report_dir=env.get("REPORT_DIR", "storage/reports"),
+        clause_top_k=max(1, _env_int(env, "CLAUSE_TOP_K", 3)),
+        enable_llm_risk_explanations=_env_bool(env, "ENABLE_LLM_RISK_EXPLANATIONS"),
+        report_max_age_s=max(0, _env_int(env, "REPORT_MAX_AGE_S", 0)),
+        pdf_workers=max(1, _env_int(env, "PDF_WORKERS", min(4, os.cpu_count() or 1))),
+        pdf_parallel_min_pages=max(1, _env_int(env, "PDF_PARALLEL_MIN_PAGES", 64)),
+        pdf_pages_per_task=max(1, _env_int(env, "PDF_PAGES_PER_TASK", 8)),
+        pdf_page_timeout_s=max(0.0, _env_float(env, "PDF_PAGE_TIMEOUT_S", 30.0)),
+        job_backend=env.get("JOB_BACKEND", "inprocess"),
+        job_workers=max(1, _env_int(env, "JOB_WORKERS", 2)),
+        job_queue_depth=max(0, _env_int(env, "JOB_QUEUE_DEPTH", 16)),
+        job_retention=max(1, _env_int(env, "JOB_RETENTION", 1000)),
+        stream_batch_size=max(1, _env_int(env, "STREAM_BATCH_SIZE", 8)),
+        upload_max_bytes=max(1, _env_int(env, "UPLOAD_MAX_BYTES", 50 * 1024 * 1024)),
+        upload_spool_bytes=max(1, _env_int(env, "UPLOAD_SPOOL_BYTES", 4 * 1024 * 1024)),
+        openai_base_url=env.get("OPENAI_BASE_URL", ""),
+        hash_embed_dim=max(1, _env_int(env, "HASH_EMBED_DIM", 128)),
+        hash_embed_ngrams=max(1, _env_int(env, "HASH_EMBED_NGRAMS", 1)),
+        hash_embed_cache_size=max(0, _env_int(env, "HASH_EMBED_CACHE_SIZE", 100_000)),
+        embed_dimensions=max(0, _env_int(env, "EMBED_DIMENSIONS", 0)),
+        embed_max_concurrency=max(1, _env_int(env, "EMBED_MAX_CONCURRENCY", 4)),
+        embed_batch_tokens=max(1, _env_int(env, "EMBED_BATCH_TOKENS", 100_000)),
+        embed_batch_size=max(1, _env_int(env, "EMBED_BATCH_SIZE", 256)),
+        embed_max_retries=max(0, _env_int(env, "EMBED_MAX_RETRIES", 5)),
+        embed_timeout_s=max(1.0, _env_float(env, "EMBED_TIMEOUT_S", 30.0)),
+        embed_cache_path=env.get("EMBED_CACHE_PATH", "storage/cache/embeddings.sqlite3"),
+        embed_cache_max_entries=max(1, _env_int(env, "EMBED_CACHE_MAX_ENTRIES", 200_000)),
+        embed_cache_memory_entries=max(0, _env_int(env, "EMBED_CACHE_MEMORY_ENTRIES", 4096)),
+        rules_path=env.get("RULES_PATH", ""),
+        llm_explain_min_score=max(0, _env_int(env, "LLM_EXPLAIN_MIN_SCORE", 40)),
+        llm_explain_concurrency=max(1, _env_int(env, "LLM_EXPLAIN_CONCURRENCY", 4)),
+        llm_explain_timeout_s=max(1.0, _env_float(env, "LLM_EXPLAIN_TIMEOUT_S", 20.0)),
+        llm_explain_wait_s=max(0.0, _env_float(env, "LLM_EXPLAIN_WAIT_S", 30.0)),
+        llm_cache_path=env.get("LLM_CACHE_PATH", "storage/cache/llm_explanations.sqlite3"),
+        corpus_manifest=env.get("CORPUS_MANIFEST", "data/regulations/manifest.json"),
+        chunk_workers=max(1, _env_int(env, "CHUNK_WORKERS", min(4, os.cpu_count() or 1))),
+        ann_min_rows=max(0, _env_int(env, "ANN_MIN_ROWS", 50_000)),
+        ann_lists=max(0, _env_int(env, "ANN_LISTS", 0)),
+        ann_nprobe=max(0, _env_int(env, "ANN_NPROBE", 8)),
+        dedupe_threshold=min(1.0, max(0.0, _env_float(env, "DEDUPE_THRESHOLD", 0.9))),
+        clause_store_path=env.get("CLAUSE_STORE_PATH", "storage/cache/clauses.sqlite3"),
+        clause_store_max_entries=max(1, _env_int(env, "CLAUSE_STORE_MAX_ENTRIES", 200_000)),
+        version_min_overlap=min(1.0, max(0.0, _env_float(env, "VERSION_MIN_OVERLAP", 0.5))),
+        version_change_threshold=min(1.0, max(0.0, _env_float(env, "VERSION_CHANGE_THRESHOLD", 0.5))),
+    )
+
+
+settings = load_settings()
+
+
+def get_settings() -> Settings:
+    return settings
+
 
-_raw_top_k = os.environ.get("CLAUSE_TOP_K", "3")
-try:
-    _parsed_top_k = int(_raw_top_k)
-except ValueError:
-    _parsed_top_k = 3
+def reload_settings(environ: Mapping[str, str] | None = None) -> Settings:
+    # Re-reads configuration into the shared `settings` object in place, so every module that
+    # imported it sees the new values without reloading anything.
+    fresh = load_settings(environ)
+    for f in fields(Settings):
+        setattr(settings, f.name, getattr(fresh, f.name))
+    return settings
 
-_raw_llm_explain = os.environ.get("ENABLE_LLM_RISK_EXPLANATIONS", "0").strip().lower()
-_parsed_llm_explain = _raw_llm_explain in {"1", "true", "yes", "on"}
 
-settings = Settings(
-    openai_api_key=os.environ.get("OPENAI_API_KEY", ""),
-    model_text=os.environ.get("MODEL_TEXT", "gpt-4.1-mini"),
-    model_embed=os.environ.get("MODEL_EMBED", "text-embedding-3-small"),
-    chroma_dir=os.environ.get("CHROMA_DIR", "storage/chroma"),
-    report_dir=os.environ.get("REPORT_DIR", "storage/reports"),
-    clause_top_k=max(1, _parsed_top_k),
-    enable_llm_risk_explanations=_parsed_llm_explain,
-)
+@contextmanager
+def override_settings(**values) -> Iterator[Settings]:
+    unknown = sorted(set(values) - {f.name for f in fields(Settings)})
+    if unknown:
+        raise TypeError(f"Unknown settings: {', '.join(unknown)}")
+    saved = {name: getattr(settings, name) for name in values}
+    for name, value in values.items():
+        setattr(settings, name, value)
+    try:
+        yield settings
+    finally:
+        for name, value in saved.items():
+            setattr(settings, name, value)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Generator, Iterable, Iterator, TextIO
+
+
+def collect_inputs(
+    directory: str | Path | None = None,
+    manifest: str | Path | None = None,
+    pattern: str = "*.pdf",
+) -> list[Path]:
+    files: list[Path] = []
+    if directory is not None:
+        root = Path(directory)
+        if not root.is_dir():
+            raise NotADirectoryError(f"Not a directory: {root}")
+        files.extend(sorted(p for p in root.rglob(pattern) if p.is_file()))
+    if manifest is not None:
+        manifest_path = Path(manifest)
+        for line in manifest_path.read_text(encoding="utf-8").splitlines():
+            raw = line.strip()
+            if not raw or raw.startswith("#"):
+                continue
+            path = Path(raw)
+            if not path.is_absolute() and not path.exists():
+                path = manifest_path.parent / path
+            files.append(path)
+    return files
+
+
+def _init_worker(parallel_documents: bool = True) -> None:
+    # Pay index load, embedding backend setup and heavy imports once per worker process.
+    from app.config import settings
+    from app.pipeline.rag_match import get_retriever
+    from app.utils.embeddings import warm_embedding_backend
+
+    if parallel_documents:
+        # Parallelism is already across documents; avoid nesting a page-extraction pool per worker.
+        settings.pdf_workers = 1
+    try:
+        get_retriever().ensure_current()
+    except Exception:
+        pass
+    warm_embedding_backend()
+
+
+def _analyze_one(file_path: str, force: bool = False) -> dict:
+    from app.pipeline.run_pipeline import run
+
+    started = time.perf_counter()
+    try:
+        report_path = run(file_path, force=force)
+        return {
+            "file": file_path,
+            "status": "ok",
+            "report": report_path,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+    except Exception as exc:
+        return {
+            "file": file_path,
+            "status": "error",
+            "error": f"{type(exc).__name__}: {exc}",
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+
+def _pooled(queue: deque[str], workers: int, force: bool) -> Generator[dict, None, list[str]]:
+    # Streams results until `queue` is drained. A worker that dies (OOM killer, segfault) breaks the
+    # whole pool; the documents it left unfinished are returned instead of failing the batch.
+    pending: dict[Future, str] = {}
+    lost: list[str] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+
+        def fill() -> None:
+            # Keep a bounded number of documents in flight so results stream out as they finish.
+            while queue and len(pending) < workers * 2:
+                file_path = queue.popleft()
+                pending[pool.submit(_analyze_one, file_path, force)] = file_path
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = pending.pop(future)
+                try:
+                    yield future.result()
+                except BrokenProcessPool:
+                    lost.append(file_path)
+            if lost:
+                for future, file_path in pending.items():
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool:
+                        lost.append(file_path)
+                return lost
+            fill()
+    return lost
+
+
+def _results(files: list[str], workers: int, force: bool) -> Iterator[dict]:
+    if workers <= 1:
+        _init_worker(parallel_documents=False)
+        for file_path in files:
+            yield _analyze_one(file_path, force)
+        return
+
+    queue = deque(files)
+    while queue:
+        lost = yield from _pooled(queue, workers, force)
+        # Any document in flight may have killed the worker, so each is retried alone in a fresh
+        # pool: only the one that takes its worker down again gets an error row.
+        for file_path in lost:
+            started = time.perf_counter()
+            if (yield from _pooled(deque([file_path]), 1, force)):
+                yield {
+                    "file": file_path,
+                    "status": "error",
+                    "error": "BrokenProcessPool: the worker process died while analysing this document",
+                    "seconds": round(time.perf_counter() - started, 3),
+                }
+
+
+def run_batch(
+    files: Iterable[str | Path],
+    summary_path: str | Path,
+    workers: int | None = None,
+    progress: TextIO | None = sys.stderr,
+    force: bool = False,
+) -> dict:
+    file_list = [str(f) for f in files]
+    workers = max(1, workers or os.cpu_count() or 1)
+    out = Path(summary_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+
+    started = time.perf_counter()
+    ok = failed = 0
+    with out.open("w", encoding="utf-8") as fh:
+        for done, result in enumerate(_results(file_list, workers, force), start=1):
+            fh.write(json.dumps(result) + "\n")
+            fh.flush()
+            if result["status"] == "ok":
+                ok += 1
+            else:
+                failed += 1
+            if progress is not None:
+                elapsed = time.perf_counter() - started
+                progress.write(
+                    f"[{done}/{len(file_list)}] {result['status']} {result['file']} "
+                    f"({result['seconds']}s, {done / elapsed:.2f} docs/s)\n"
+                )
+                progress.flush()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "total": len(file_list),
+        "ok": ok,
+        "failed": failed,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "docs_per_second": round(len(file_list) / elapsed, 3) if elapsed else 0.0,
+        "summary_path": str(out),
+    }
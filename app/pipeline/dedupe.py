@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from app.config import settings
+from app.schemas import Clause, DuplicateGroup, GDPRMatch
+from app.utils.clause_store import ClauseStore
+from app.utils.embedding_cache import normalize_for_cache
+from app.utils.hashing import sha256_text
+from app.utils.minhash import MinHasher, similarity
+
+
+def clause_key(text: str) -> str:
+    return sha256_text(normalize_for_cache(text).lower())[:32]
+
+
+@dataclass
+class DedupePlan:
+    # Which clauses still need matching, and where every other clause's matches come from. Risk is
+    # never shared: the rules run on each clause's own text, where "72 hours" vs "30 days" matters.
+    clauses: list[Clause]
+    fresh: list[Clause]
+    representative_of: dict[str, str] = field(default_factory=dict)
+    stored: dict[str, dict] = field(default_factory=dict)
+    groups: list[DuplicateGroup] = field(default_factory=list)
+    signatures: dict[str, np.ndarray] = field(default_factory=dict)
+    keys: dict[str, str] = field(default_factory=dict)
+
+    def representatives(self, clauses: list[Clause]) -> list[str]:
+        return list(dict.fromkeys(self.representative_of.get(c.clause_id, c.clause_id) for c in clauses))
+
+    def fan_out(self, matches: list[GDPRMatch], clauses: list[Clause] | None = None) -> list[GDPRMatch]:
+        # `clauses` (default: all) is a slice of the document; `matches` must cover its fresh representatives.
+        clauses = self.clauses if clauses is None else clauses
+        match_map: dict[str, list[GDPRMatch]] = {}
+        for m in matches:
+            match_map.setdefault(m.clause_id, []).append(m)
+        for rep in self.representatives(clauses):
+            payload = self.stored.get(rep)
+            if payload is not None:
+                match_map[rep] = [GDPRMatch.from_dict(m) for m in payload["matches"]]
+
+        out: list[GDPRMatch] = []
+        for clause in clauses:
+            rep = self.representative_of.get(clause.clause_id, clause.clause_id)
+            for m in match_map.get(rep, []):
+                out.append(GDPRMatch(clause.clause_id, m.article, m.topic, m.snippet, m.similarity_score))
+        return out
+
+    def remember(self, document_hash: str, fingerprint: str, matches: list[GDPRMatch]) -> None:
+        store = get_clause_store()
+        if store is None:
+            return
+        store.add_document(document_hash, list(self.keys.values()))
+        if not self.signatures:
+            return
+        match_map: dict[str, list[dict]] = {}
+        for m in matches:
+            match_map.setdefault(m.clause_id, []).append(m.to_dict())
+        # Only retrieval results are stored: a later clause reusing them is always re-scored on its own text.
+        entries = []
+        for clause in self.fresh:
+            payload = {
+                "document_hash": document_hash,
+                "clause_id": clause.clause_id,
+                "matches": match_map.get(clause.clause_id, []),
+            }
+            entries.append((self.keys[clause.clause_id], self.signatures[clause.clause_id], payload))
+        store.put_many(fingerprint, entries)
+
+
+_hasher = MinHasher()
+_store: ClauseStore | None = None
+_store_key: tuple | None = None
+_store_lock = threading.Lock()
+
+
+def get_clause_store() -> ClauseStore | None:
+    global _store, _store_key
+    if not settings.clause_store_path:
+        return None
+    key = (os.getpid(), settings.clause_store_path, settings.clause_store_max_entries)
+    with _store_lock:
+        if _store is None or _store_key != key:
+            if _store is not None and _store_key and _store_key[0] == key[0]:
+                _store.close()
+            _store = ClauseStore(settings.clause_store_path, _hasher, settings.clause_store_max_entries)
+            _store_key = key
+        return _store
+
+
+def plan_clauses(clauses: list[Clause], fingerprint: str, use_store: bool = True) -> DedupePlan:
+    threshold = settings.dedupe_threshold
+    keys = {c.clause_id: clause_key(c.text) for c in clauses}
+    if threshold <= 0 or not clauses:
+        return DedupePlan(clauses=clauses, fresh=list(clauses), keys=keys)
+
+    signatures = _hasher.signatures([c.text for c in clauses])
+    representative_of: dict[str, str] = {}
+    members: dict[int, list[int]] = {}
+    scores: dict[int, float] = {}
+    buckets: dict[str, list[int]] = {}
+    # Greedy in document order: a clause joins the most similar earlier representative sharing
+    # an LSH band with it, or becomes a representative itself.
+    for i, signature in enumerate(signatures):
+        bands = _hasher.band_keys(signature)
+        candidates = sorted({j for band in bands for j in buckets.get(band, ())})
+        best, best_score = -1, threshold
+        for j in candidates:
+            score = similarity(signature, signatures[j])
+            if score >= best_score and (best < 0 or score > best_score):
+                best, best_score = j, score
+        if best >= 0:
+            members[best].append(i)
+            scores[best] = min(scores[best], best_score)
+            representative_of[clauses[i].clause_id] = clauses[best].clause_id
+            continue
+        members[i] = [i]
+        scores[i] = 1.0
+        for band in bands:
+            buckets.setdefault(band, []).append(i)
+
+    reps = list(members)
+    store = get_clause_store() if use_store else None
+    hits: dict[int, tuple[float, dict]] = {}
+    if store is not None:
+        # Text analysed before (most of a revised contract) is found by its normalized hash; only
+        # the remaining representatives go through the MinHash bands.
+        exact = store.get_many(fingerprint, [keys[clauses[rep].clause_id] for rep in reps])
+        for n, rep in enumerate(reps):
+            payload = exact.get(keys[clauses[rep].clause_id])
+            if payload is not None:
+                hits[n] = (1.0, payload)
+        rest = [n for n in range(len(reps)) if n not in hits]
+        if rest:
+            near = store.lookup(fingerprint, signatures[[reps[n] for n in rest]], threshold)
+            hits.update((rest[i], hit) for i, hit in near.items())
+
+    plan = DedupePlan(clauses=clauses, fresh=[], representative_of=representative_of, keys=keys)
+    for n, rep in enumerate(reps):
+        clause = clauses[rep]
+        group_ids = [clauses[i].clause_id for i in members[rep]]
+        if n in hits:
+            score, payload = hits[n]
+            plan.stored[clause.clause_id] = payload
+            plan.groups.append(
+                DuplicateGroup(
+                    representative=clause.clause_id,
+                    members=group_ids,
+                    similarity=round(min(score, scores[rep]), 4),
+                    source="store",
+                    source_document=str(payload.get("document_hash", "")),
+                    source_clause=str(payload.get("clause_id", "")),
+                )
+            )
+            continue
+        plan.fresh.append(clause)
+        plan.signatures[clause.clause_id] = signatures[rep]
+        if len(group_ids) > 1:
+            plan.groups.append(DuplicateGroup(clause.clause_id, group_ids, round(scores[rep], 4)))
+    return plan
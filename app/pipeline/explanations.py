@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+from app.config import settings
+from app.schemas import Clause, GDPRMatch
+from app.utils.llm_cache import LLMCache, prompt_key
+from app.utils.metrics import FALLBACKS, LLM_CACHE, LLM_REQUESTS
+
+
+def explanation_prompt(clause: Clause, top_match: GDPRMatch | None, score: int) -> str:
+    article = top_match.article if top_match else "Unknown article"
+    return (
+        "Provide one short compliance rationale sentence for this clause risk assessment.\n"
+        f"Clause: {clause.text[:450]}\n"
+        f"Top GDPR match: {article}\n"
+        f"Rule score: {score}\n"
+        "Keep it factual, under 35 words, no legal advice disclaimer."
+    )
+
+
+class ExplanationService:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str | None = None,
+        max_concurrency: int = 4,
+        timeout_s: float = 20.0,
+        cache: LLMCache | None = None,
+    ) -> None:
+        from openai import OpenAI
+
+        self.model = model
+        self.cache = cache
+        self._client = OpenAI(api_key=api_key, base_url=base_url or None, timeout=timeout_s, max_retries=0)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="explain")
+        self._lock = threading.Lock()
+        # Identical prompts share one request, including across overlapping score_risks calls.
+        self._in_flight: dict[str, Future] = {}
+        self.requests = 0
+        self.failures = 0
+        self.late = 0
+
+    def _complete(self, key: str, prompt: str) -> str | None:
+        content = ""
+        try:
+            response = self._client.chat.completions.create(
+                model=self.model,
+                temperature=0,
+                messages=[{"role": "user", "content": prompt}],
+            )
+            content = (response.choices[0].message.content or "").strip()
+            # Cached even when the caller has stopped waiting, so a late answer serves the next run.
+            if content and self.cache is not None:
+                self.cache.put(key, content)
+            LLM_REQUESTS.inc(outcome="ok")
+        except Exception:
+            LLM_REQUESTS.inc(outcome="error")
+            with self._lock:
+                self.failures += 1
+        finally:
+            with self._lock:
+                self.requests += 1
+                self._in_flight.pop(key, None)
+        return content or None
+
+    def explain_many(self, prompts: dict[str, str], wait_s: float) -> dict[str, str]:
+        keys = {item: prompt_key(self.model, prompt) for item, prompt in prompts.items()}
+        cached = self.cache.get_many(list(keys.values())) if self.cache is not None else {}
+        notes = {item: cached[key] for item, key in keys.items() if key in cached}
+        if self.cache is not None:
+            LLM_CACHE.inc(len(notes), result="hit")
+            LLM_CACHE.inc(len(keys) - len(notes), result="miss")
+
+        futures: dict[str, Future] = {}
+        with self._lock:
+            for item, key in keys.items():
+                if item in notes or key in futures:
+                    continue
+                future = self._in_flight.get(key)
+                if future is None:
+                    future = self._pool.submit(self._complete, key, prompts[item])
+                    self._in_flight[key] = future
+                futures[key] = future
+        if not futures:
+            return notes
+
+        done, pending = wait(list(futures.values()), timeout=max(0.0, wait_s))
+        with self._lock:
+            self.late += len(pending)
+        if pending:
+            FALLBACKS.inc(len(pending), event="llm_note_late")
+        for item, key in keys.items():
+            future = futures.get(key)
+            if future is not None and future in done and future.result():
+                notes[item] = future.result()
+        return notes
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"model": self.model, "requests": self.requests, "failures": self.failures, "late": self.late}
+        stats["cache"] = self.cache.stats() if self.cache is not None else {"enabled": False}
+        return stats
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._client.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_service: ExplanationService | None = None
+_service_key: tuple | None = None
+_service_lock = threading.Lock()
+
+
+def explanations_enabled() -> bool:
+    return settings.enable_llm_risk_explanations and bool(settings.openai_api_key.strip())
+
+
+def get_explanation_service() -> ExplanationService:
+    global _service, _service_key
+    key = (
+        os.getpid(),
+        settings.openai_api_key,
+        settings.openai_base_url,
+        settings.model_text,
+        settings.llm_explain_concurrency,
+        settings.llm_explain_timeout_s,
+        settings.llm_cache_path,
+    )
+    with _service_lock:
+        if _service is None or _service_key != key:
+            if _service is not None and _service_key and _service_key[0] == key[0]:
+                _service.close()
+            cache_path = settings.llm_cache_path.strip()
+            _service = ExplanationService(
+                api_key=settings.openai_api_key,
+                model=settings.model_text,
+                base_url=settings.openai_base_url or None,
+                max_concurrency=settings.llm_explain_concurrency,
+                timeout_s=settings.llm_explain_timeout_s,
+                cache=LLMCache(cache_path) if cache_path else None,
+            )
+            _service_key = key
+        return _service
+
+
+def explain_risks(items: dict[str, tuple[Clause, GDPRMatch | None, int]]) -> dict[str, str]:
+    # Explanations are best effort: whatever has not arrived within LLM_EXPLAIN_WAIT_S is left out.
+    if not explanations_enabled():
+        return {}
+    prompts = {
+        item: explanation_prompt(clause, top_match, score)
+        for item, (clause, top_match, score) in items.items()
+        if score >= settings.llm_explain_min_score
+    }
+    if not prompts:
+        return {}
+    try:
+        service = get_explanation_service()
+    except Exception:
+        return {}
+    return service.explain_many(prompts, settings.llm_explain_wait_s)
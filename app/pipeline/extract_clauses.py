@@ -1,32 +1,11 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable
+from typing import Iterable, Iterator
 
+from app.pipeline.rules import RuleSet, get_ruleset
 from app.schemas import Clause
-from app.utils.text_clean import normalize_text, split_into_clause_like_blocks
-
-
-KEYWORDS = {
-    "security": "Security",
-    "breach": "Breach Notification",
-    "processor": "Processor Obligations",
-    "subprocessor": "Subprocessor",
-    "retention": "Data Retention",
-    "transfer": "International Transfer",
-    "legal basis": "Legal Basis",
-    "consent": "Consent",
-    "rights": "Data Subject Rights",
-    "audit": "Audit",
-}
-
-
-def _categorize(text: str) -> str:
-    lower = text.lower()
-    for key, category in KEYWORDS.items():
-        if key in lower:
-            return category
-    return "General"
+from app.utils.text_clean import ClauseSegmenter
 
 
 def _title_for_block(block: str, idx: int) -> str:
@@ -36,25 +15,32 @@ def _title_for_block(block: str, idx: int) -> str:
     return line if len(line) >= 5 else f"Clause {idx}"
 
 
+def _clause(block: str, idx: int, ruleset: RuleSet) -> Clause:
+    return Clause(
+        clause_id=f"C{idx:03d}",
+        title=_title_for_block(block, idx),
+        category=ruleset.categorize(block),
+        text=block,
+    )
+
+
+def iter_clauses(pieces: Iterable[str]) -> Iterator[Clause]:
+    # `pieces` concatenate to the raw text (e.g. PDF pages); each clause is yielded as soon as
+    # its block is complete, with the same boundaries extract_clauses() gives the joined text.
+    segmenter = ClauseSegmenter(whole_text_fallback=True)
+    ruleset = get_ruleset()
+    idx = 0
+    for piece in pieces:
+        for block in segmenter.feed(piece):
+            idx += 1
+            yield _clause(block, idx, ruleset)
+    for block in segmenter.close():
+        idx += 1
+        yield _clause(block, idx, ruleset)
+
+
 def extract_clauses(raw_text: str) -> list[Clause]:
-    text = normalize_text(raw_text)
-    blocks = split_into_clause_like_blocks(text)
-
-    if not blocks:
-        blocks = [text]
-
-    clauses: list[Clause] = []
-    for i, block in enumerate(blocks, start=1):
-        clause_id = f"C{i:03d}"
-        clauses.append(
-            Clause(
-                clause_id=clause_id,
-                title=_title_for_block(block, i),
-                category=_categorize(block),
-                text=block,
-            )
-        )
-    return clauses
+    return list(iter_clauses([raw_text]))
 
 
 def to_dicts(clauses: Iterable[Clause]) -> list[dict]:
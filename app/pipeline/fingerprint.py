@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+import json
+
+from app.config import settings
+from app.pipeline.rules import get_ruleset
+from app.utils.embeddings import embedding_backend_id
+
+
+def _index_version() -> str:
+    from app.pipeline.rag_match import load_fallback_index
+
+    try:
+        index = load_fallback_index()
+    except Exception:
+        return "missing"
+    version = index.version or f"unversioned:{index.size}x{index.dim}"
+    # Approximate search can return different matches, so its nprobe is part of the version.
+    return version if index.search_mode == "exact" else f"{version}:{index.search_mode}"
+
+
+def pipeline_config() -> dict:
+    return {
+        "model_text": settings.model_text,
+        "embedding_backend": embedding_backend_id(),
+        "clause_top_k": settings.clause_top_k,
+        "llm_risk_explanations": settings.enable_llm_risk_explanations,
+        "llm_explain_min_score": settings.llm_explain_min_score,
+        "dedupe_threshold": settings.dedupe_threshold,
+        "ruleset_version": get_ruleset().fingerprint,
+        "index_version": _index_version(),
+    }
+
+
+def pipeline_fingerprint(config: dict | None = None) -> str:
+    payload = json.dumps(config if config is not None else pipeline_config(), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
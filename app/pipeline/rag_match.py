@@ -1,96 +1,318 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Sequence
+
+import numpy as np
 
 from app.config import settings
+from app.rag.index_store import binary_index_exists, index_stamp, normalize_rows, read_binary_index
+from app.rag.ivf import IVFIndex
 from app.schemas import Clause, GDPRMatch
-from app.utils.embeddings import embed_texts
+from app.utils.embeddings import embed_array, embed_texts, embedding_backend_id, warm_embedding_backend
+from app.utils.metrics import FALLBACKS
 
 
 COLLECTION = "gdpr_chunks"
 FALLBACK_INDEX = "gdpr_index.json"
 
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    dot = sum(x * y for x, y in zip(a, b))
-    na = sum(x * x for x in a) ** 0.5
-    nb = sum(y * y for y in b) ** 0.5
-    if na == 0 or nb == 0:
-        return 0.0
-    return max(0.0, min(1.0, dot / (na * nb)))
+@dataclass
+class FallbackIndex:
+    embeddings: np.ndarray
+    documents: Sequence[str]
+    articles: Sequence[str]
+    topics: Sequence[str]
+    embedding_model: str = ""
+    version: str = ""
+    collection: str = ""
+    ivf: IVFIndex | None = None
+
+    def probes(self, nprobe: int | None = None) -> int:
+        # Number of IVF lists a query scans; 0 means an exact scan of every row.
+        nprobe = settings.ann_nprobe if nprobe is None else nprobe
+        if self.ivf is None or nprobe <= 0 or nprobe >= self.ivf.nlist:
+            return 0
+        return nprobe
+
+    @property
+    def search_mode(self) -> str:
+        probes = self.probes()
+        return f"ivf:{probes}/{self.ivf.nlist}" if probes else "exact"
+
+    @property
+    def size(self) -> int:
+        return int(self.embeddings.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.embeddings.shape[1]) if self.embeddings.ndim == 2 else 0
+
+    def search(self, queries: np.ndarray, top_k: int, nprobe: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        if queries.ndim != 2 or queries.shape[0] == 0 or self.size == 0:
+            empty = np.empty((queries.shape[0] if queries.ndim == 2 else 0, 0))
+            return empty.astype(np.int64), empty.astype(np.float32)
+        if queries.shape[1] != self.dim:
+            raise ValueError(
+                f"Query embedding dim {queries.shape[1]} does not match index dim {self.dim}. "
+                "Rebuild the index with the current embedding backend."
+            )
+
+        probes = self.probes(nprobe)
+        if probes:
+            return self.ivf.search(self.embeddings, normalize_rows(queries), top_k, probes)
+
+        scores = normalize_rows(queries) @ self.embeddings.T
+        np.clip(scores, 0.0, 1.0, out=scores)
+
+        k = min(top_k, self.size)
+        if k < self.size:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            kth = np.take_along_axis(scores, candidates, axis=1).min(axis=1, keepdims=True)
+            # Ties straddling the k boundary: fall back to a stable sort for those rows only.
+            for row in np.flatnonzero((scores >= kth).sum(axis=1) > k):
+                candidates[row] = np.argsort(-scores[row], kind="stable")[:k]
+        else:
+            candidates = np.broadcast_to(np.arange(self.size), scores.shape)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        # Highest score first; ties keep corpus order like the old stable sort did.
+        order = np.lexsort((candidates, -candidate_scores), axis=1)
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+_INDEX_CACHE: dict[str, tuple[tuple[int, int], FallbackIndex]] = {}
+
+
+def _read_json_index(directory: Path) -> FallbackIndex:
+    # Legacy gdpr_index.json written before the binary format existed.
+    FALLBACKS.inc(event="legacy_json_index")
+    path = directory / FALLBACK_INDEX
+    rows = json.loads(path.read_text(encoding="utf-8"))
+    dims = {len(r.get("embedding", [])) for r in rows}
+    if len(dims) > 1:
+        raise ValueError(f"RAG index at {path} mixes embedding dimensions {sorted(dims)}.")
+    dim = dims.pop() if dims else 0
+    matrix = np.array([r.get("embedding", []) for r in rows], dtype=np.float32).reshape(len(rows), dim)
+    metas = [r.get("metadata", {}) for r in rows]
+    return FallbackIndex(
+        embeddings=normalize_rows(matrix),
+        documents=[str(r.get("document", "")) for r in rows],
+        articles=[str(m.get("article", "Unknown")) for m in metas],
+        topics=[str(m.get("topic", "unknown")) for m in metas],
+    )
+
 
+def _read_binary_index(directory: Path) -> FallbackIndex:
+    stored = read_binary_index(directory)
+    return FallbackIndex(
+        embeddings=stored.embeddings,
+        documents=stored.documents,
+        articles=stored.articles,
+        topics=stored.topics,
+        embedding_model=str(stored.meta.get("embedding_model", "")),
+        version=str(stored.meta.get("index_version", "")),
+        collection=str(stored.meta.get("chroma_collection", "")),
+        ivf=stored.ivf,
+    )
 
-def _fallback_match(clauses: list[Clause], top_k: int) -> list[GDPRMatch]:
-    path = Path(settings.chroma_path) / FALLBACK_INDEX
-    if not path.exists():
+
+def load_fallback_index(directory: str | Path | None = None) -> FallbackIndex:
+    directory = Path(directory) if directory is not None else Path(settings.chroma_path)
+    legacy_path = directory / FALLBACK_INDEX
+    if binary_index_exists(directory):
+        stamp = index_stamp(directory)
+        reader = _read_binary_index
+    elif legacy_path.exists():
+        stat = legacy_path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        reader = _read_json_index
+    else:
         raise FileNotFoundError(
-            f"RAG index not found at {path}. Run `python -m app.rag.build_index` first."
+            f"RAG index not found in {directory}. Run `python -m app.rag.build_index` first."
         )
-    rows = json.loads(path.read_text(encoding="utf-8"))
-    clause_embeddings = embed_texts([c.text for c in clauses])
+
+    key = str(directory.resolve())
+    cached = _INDEX_CACHE.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    index = reader(directory)
+    _INDEX_CACHE[key] = (stamp, index)
+    return index
+
+
+def _fallback_match(clauses: list[Clause], top_k: int, index: FallbackIndex | None = None) -> list[GDPRMatch]:
+    index = index if index is not None else load_fallback_index()
+    if not clauses:
+        return []
+    backend = embedding_backend_id()
+    if index.embedding_model and index.embedding_model != backend:
+        raise ValueError(
+            f"RAG index was built with {index.embedding_model} embeddings but queries use {backend}. "
+            "Rebuild the index with `python -m app.rag.build_index`."
+        )
+    queries = embed_array([c.text for c in clauses])
+    top_ids, top_scores = index.search(queries, top_k)
+
     results: list[GDPRMatch] = []
+    for clause, row_ids, row_scores in zip(clauses, top_ids.tolist(), top_scores.tolist()):
+        for row, sim in zip(row_ids, row_scores):
+            results.append(
+                GDPRMatch(
+                    clause_id=clause.clause_id,
+                    article=index.articles[row],
+                    topic=index.topics[row],
+                    snippet=index.documents[row][:280],
+                    similarity_score=round(sim, 4),
+                )
+            )
+
+    return results
+
+
+def _chroma_match(collection, clauses: list[Clause], top_k: int) -> list[GDPRMatch]:
+    clause_embeddings = embed_texts([c.text for c in clauses])
+    query = collection.query(
+        query_embeddings=clause_embeddings,
+        n_results=top_k,
+        include=["metadatas", "documents", "distances"],
+    )
 
-    for clause, emb in zip(clauses, clause_embeddings):
-        ranked = sorted(
-            rows,
-            key=lambda r: _cosine_similarity(emb, r.get("embedding", [])),
-            reverse=True,
-        )[:top_k]
+    results: list[GDPRMatch] = []
+    for idx, clause in enumerate(clauses):
+        docs = query.get("documents", [[]])[idx]
+        metas = query.get("metadatas", [[]])[idx]
+        distances = query.get("distances", [[]])[idx]
 
-        for row in ranked:
-            meta = row.get("metadata", {})
-            sim = _cosine_similarity(emb, row.get("embedding", []))
+        for doc, meta, dist in zip(docs, metas, distances):
+            similarity = max(0.0, min(1.0, 1.0 - float(dist)))
             results.append(
                 GDPRMatch(
                     clause_id=clause.clause_id,
                     article=str(meta.get("article", "Unknown")),
                     topic=str(meta.get("topic", "unknown")),
-                    snippet=str(row.get("document", ""))[:280],
-                    similarity_score=round(sim, 4),
+                    snippet=doc[:280],
+                    similarity_score=round(similarity, 4),
                 )
             )
-
     return results
 
 
-def match_clauses_to_gdpr(clauses: list[Clause], top_k: int | None = None) -> list[GDPRMatch]:
-    top_k = top_k or settings.clause_top_k
-    try:
-        import chromadb
+class Retriever:
+    # Opened once per process and reopened only when the index on disk changes. build_index
+    # always rewrites the binary sidecar, so its stat versions the chromadb collection too.
+    def __init__(self, directory: str | Path) -> None:
+        self.directory = Path(directory)
+        self.backend = "none"
+        self.index: FallbackIndex | None = None
+        self.refreshes = 0
+        self.fallbacks = 0
+        self._collection = None
+        self._stamp: tuple | None = None
+        self._lock = threading.Lock()
 
-        client = chromadb.PersistentClient(path=str(settings.chroma_path))
-        collection = client.get_collection(COLLECTION)
+    def _disk_stamp(self) -> tuple | None:
+        if binary_index_exists(self.directory):
+            return index_stamp(self.directory)
+        legacy_path = self.directory / FALLBACK_INDEX
+        if legacy_path.exists():
+            stat = legacy_path.stat()
+            return stat.st_mtime_ns, stat.st_size
+        return None
 
-        clause_texts = [c.text for c in clauses]
-        clause_embeddings = embed_texts(clause_texts)
+    def _open(self, stamp: tuple | None) -> None:
+        try:
+            index = load_fallback_index(self.directory)
+        except FileNotFoundError:
+            index = None
+        collection = None
+        try:
+            import chromadb
 
-        results: list[GDPRMatch] = []
-        query = collection.query(
-            query_embeddings=clause_embeddings,
-            n_results=top_k,
-            include=["metadatas", "documents", "distances"],
-        )
+            name = index.collection if index is not None and index.collection else COLLECTION
+            collection = chromadb.PersistentClient(path=str(self.directory)).get_collection(name)
+        except Exception:
+            if index is None:
+                raise FileNotFoundError(
+                    f"RAG index not found in {self.directory}. Run `python -m app.rag.build_index` first."
+                ) from None
+        self._collection, self.index, self._stamp = collection, index, stamp
+        self.backend = "chromadb" if collection is not None else "fallback"
+        if collection is None:
+            FALLBACKS.inc(event="chroma_unavailable")
+        self.refreshes += 1
+
+    def ensure_current(self) -> None:
+        stamp = self._disk_stamp()
+        with self._lock:
+            if self.backend == "none" or stamp != self._stamp:
+                self._open(stamp)
+
+    def warm(self) -> None:
+        self.ensure_current()
+        warm_embedding_backend()
+
+    def match(self, clauses: list[Clause], top_k: int) -> list[GDPRMatch]:
+        self.ensure_current()
+        collection, index = self._collection, self.index
+        if collection is not None and clauses:
+            try:
+                return _chroma_match(collection, clauses, top_k)
+            except Exception:
+                if index is None:
+                    raise
+                with self._lock:
+                    self.fallbacks += 1
+                FALLBACKS.inc(event="chroma_query_failed")
+        if index is None:
+            return []
+        return _fallback_match(clauses, top_k, index)
+
+    def status(self) -> dict:
+        index = self.index
+        if self._collection is not None:
+            size = int(self._collection.count())
+        else:
+            size = index.size if index is not None else 0
+        return {
+            "ready": self.backend != "none",
+            "backend": self.backend,
+            "index_size": size,
+            "index_version": index.version if index is not None else "",
+            "embedding_model": index.embedding_model if index is not None else "",
+            "search_mode": index.search_mode if index is not None else "",
+            "refreshes": self.refreshes,
+            "fallbacks": self.fallbacks,
+        }
+
+
+_retrievers: dict[tuple[int, str], Retriever] = {}
+_retrievers_lock = threading.Lock()
 
-        for idx, clause in enumerate(clauses):
-            docs = query.get("documents", [[]])[idx]
-            metas = query.get("metadatas", [[]])[idx]
-            distances = query.get("distances", [[]])[idx]
-
-            for doc, meta, dist in zip(docs, metas, distances):
-                similarity = max(0.0, min(1.0, 1.0 - float(dist)))
-                results.append(
-                    GDPRMatch(
-                        clause_id=clause.clause_id,
-                        article=str(meta.get("article", "Unknown")),
-                        topic=str(meta.get("topic", "unknown")),
-                        snippet=doc[:280],
-                        similarity_score=round(similarity, 4),
-                    )
-                )
 
-        return results
-    except Exception:
-        return _fallback_match(clauses, top_k)
+def get_retriever(directory: str | Path | None = None) -> Retriever:
+    directory = Path(directory) if directory is not None else Path(settings.chroma_path)
+    key = (os.getpid(), str(directory.resolve()))
+    with _retrievers_lock:
+        retriever = _retrievers.get(key)
+        if retriever is None:
+            retriever = Retriever(directory)
+            _retrievers[key] = retriever
+        return retriever
+
+
+def retriever_status() -> dict:
+    retriever = get_retriever()
+    try:
+        retriever.ensure_current()
+    except Exception as exc:
+        return {"ready": False, "backend": "none", "index_size": 0, "error": str(exc)}
+    return retriever.status()
+
+
+def match_clauses_to_gdpr(clauses: list[Clause], top_k: int | None = None) -> list[GDPRMatch]:
+    return get_retriever().match(clauses, top_k or settings.clause_top_k)
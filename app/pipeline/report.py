@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 
-from app.schemas import Clause, ExecutiveSummary, GDPRMatch, PipelineReport, RiskResult, SuggestedFix
+from app.pipeline.report_catalog import catalog_entry, get_catalog
+from app.schemas import Clause, DuplicateGroup, ExecutiveSummary, GDPRMatch, PipelineReport, RiskResult, SuggestedFix
+from app.utils.metrics import FALLBACKS, timed
 
 
 def build_executive_summary(risks: list[RiskResult]) -> ExecutiveSummary:
@@ -36,6 +43,9 @@ def create_report(
     matches: list[GDPRMatch],
     risks: list[RiskResult],
     fixes: list[SuggestedFix],
+    pipeline_fingerprint: str = "",
+    duplicate_groups: list[DuplicateGroup] | None = None,
+    timings: dict[str, float] | None = None,
 ) -> PipelineReport:
     return PipelineReport(
         source_file=source_file,
@@ -45,12 +55,103 @@ def create_report(
         risk_scores=risks,
         suggested_fixes=fixes,
         executive_summary=build_executive_summary(risks),
+        pipeline_fingerprint=pipeline_fingerprint,
+        duplicate_groups=duplicate_groups or [],
+        timings=timings or {},
     )
 
 
-def save_report(report: PipelineReport, out_dir: str | Path) -> Path:
+_writer: ThreadPoolExecutor | None = None
+_log = logging.getLogger(__name__)
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it; done once at import, before any writer threads exist.
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+# mkstemp creates 0600 files; reports get the mode a plain open() would have given them.
+_REPORT_MODE = 0o666 & ~_read_umask()
+
+
+def report_file(out_dir: str | Path, document_hash: str) -> Path:
+    return Path(out_dir) / f"{document_hash}.json"
+
+
+def serialize_report(report: PipelineReport) -> bytes:
+    return json.dumps(report.to_dict(), separators=(",", ":")).encode("utf-8")
+
+
+def write_report_bytes(payload: bytes, report: PipelineReport, out_dir: str | Path) -> Path:
+    with timed("save"):
+        return _write_report_bytes(payload, report, out_dir)
+
+
+def _write_report_bytes(payload: bytes, report: PipelineReport, out_dir: str | Path) -> Path:
     out = Path(out_dir)
     out.mkdir(parents=True, exist_ok=True)
-    path = out / f"{report.document_hash}.json"
-    path.write_text(json.dumps(report.to_dict(), indent=2), encoding="utf-8")
+    document_hash = report.document_hash
+    path = report_file(out, document_hash)
+    # Write aside and rename so concurrent readers never observe a partially written report.
+    fd, tmp_name = tempfile.mkstemp(dir=out, prefix=f".{document_hash}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(payload)
+        os.chmod(tmp_name, _REPORT_MODE)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+    get_catalog(out).upsert(catalog_entry(report, len(payload)))
     return path
+
+
+def save_report(report: PipelineReport, out_dir: str | Path) -> Path:
+    return write_report_bytes(serialize_report(report), report, out_dir)
+
+
+def _check_written(future: Future) -> None:
+    # The client already has its answer, so a failed write (disk full, locked catalog) must not pass silently.
+    if future.cancelled() or future.exception() is None:
+        return
+    FALLBACKS.inc(event="report_write_failed")
+    _log.error("Background report write failed", exc_info=future.exception())
+
+
+def save_report_bytes_async(payload: bytes, report: PipelineReport, out_dir: str | Path) -> Future:
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-writer")
+    future = _writer.submit(write_report_bytes, payload, report, out_dir)
+    future.add_done_callback(_check_written)
+    return future
+
+
+def load_report(out_dir: str | Path, document_hash: str) -> PipelineReport | None:
+    try:
+        return PipelineReport.from_dict(json.loads(report_file(out_dir, document_hash).read_bytes()))
+    except (OSError, KeyError, TypeError, ValueError):
+        return None
+
+
+def load_fresh_report(
+    out_dir: str | Path,
+    document_hash: str,
+    pipeline_fingerprint: str,
+    max_age_s: int = 0,
+) -> PipelineReport | None:
+    path = report_file(out_dir, document_hash)
+    try:
+        if max_age_s > 0 and time.time() - path.stat().st_mtime > max_age_s:
+            return None
+        payload = json.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return None
+    if payload.get("pipeline_fingerprint") != pipeline_fingerprint:
+        return None
+    try:
+        return PipelineReport.from_dict(payload)
+    except (KeyError, TypeError, ValueError):
+        return None
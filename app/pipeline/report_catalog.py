@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import argparse
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from app.schemas import PipelineReport
+
+
+CATALOG_FILE = "catalog.sqlite3"
+SORT_COLUMNS = {
+    "created_at": "created_at",
+    "risk": "overall_risk_score",
+    "high_risk": "high_risk_clauses",
+    "size": "size_bytes",
+}
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+
+def catalog_entry(report: PipelineReport, size_bytes: int, created_at: float | None = None) -> dict:
+    severities = {r.severity for r in report.risk_scores}
+    top = max(severities, key=SEVERITY_RANK.__getitem__) if severities else "low"
+    summary = report.executive_summary
+    return {
+        "id": report.document_hash,
+        "source_file": report.source_file,
+        "document_hash": report.document_hash,
+        "created_at": time.time() if created_at is None else created_at,
+        "overall_risk_score": summary.overall_risk_score,
+        "high_risk_clauses": summary.high_risk_clauses,
+        "total_clauses": summary.total_clauses,
+        "max_severity": SEVERITY_RANK[top],
+        "size_bytes": size_bytes,
+    }
+
+
+def _encode_cursor(value: float | int, report_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([value, report_id]).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[float | int, str]:
+    try:
+        value, report_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as exc:
+        raise ValueError("Invalid cursor.") from exc
+    return value, str(report_id)
+
+
+class ReportCatalog:
+    def __init__(self, report_dir: str | Path) -> None:
+        self.report_dir = Path(report_dir)
+        self.report_dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.report_dir / CATALOG_FILE
+        created = not self.path.exists()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            "id TEXT PRIMARY KEY, source_file TEXT NOT NULL, document_hash TEXT NOT NULL, "
+            "created_at REAL NOT NULL, overall_risk_score INTEGER NOT NULL, "
+            "high_risk_clauses INTEGER NOT NULL, total_clauses INTEGER NOT NULL, "
+            "max_severity INTEGER NOT NULL, size_bytes INTEGER NOT NULL)"
+        )
+        for column in SORT_COLUMNS.values():
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS reports_{column} ON reports({column}, id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reports_severity ON reports(max_severity, created_at, id)")
+        self._conn.commit()
+        if created:
+            # First use against an existing report directory: index what is already on disk.
+            self.rebuild()
+
+    def upsert(self, entry: dict) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports(id, source_file, document_hash, created_at, overall_risk_score, "
+                "high_risk_clauses, total_clauses, max_severity, size_bytes) VALUES "
+                "(:id, :source_file, :document_hash, :created_at, :overall_risk_score, "
+                ":high_risk_clauses, :total_clauses, :max_severity, :size_bytes)",
+                entry,
+            )
+            self._conn.commit()
+
+    def rebuild(self) -> int:
+        entries = []
+        for path in self.report_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+                report = PipelineReport.from_dict(json.loads(path.read_bytes()))
+            except Exception:
+                continue
+            entry = catalog_entry(report, stat.st_size, created_at=stat.st_mtime)
+            entry["id"] = path.stem
+            entries.append(entry)
+
+        with self._lock:
+            self._conn.execute("DELETE FROM reports")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO reports(id, source_file, document_hash, created_at, overall_risk_score, "
+                "high_risk_clauses, total_clauses, max_severity, size_bytes) VALUES "
+                "(:id, :source_file, :document_hash, :created_at, :overall_risk_score, "
+                ":high_risk_clauses, :total_clauses, :max_severity, :size_bytes)",
+                entries,
+            )
+            self._conn.commit()
+        return len(entries)
+
+    def query(
+        self,
+        limit: int = 50,
+        cursor: str | None = None,
+        sort: str = "created_at",
+        order: str = "desc",
+        severity: str | None = None,
+        since: float | None = None,
+        until: float | None = None,
+    ) -> tuple[list[dict], str | None]:
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"sort must be one of: {', '.join(SORT_COLUMNS)}")
+        if order not in {"asc", "desc"}:
+            raise ValueError("order must be asc or desc")
+        column = SORT_COLUMNS[sort]
+        op = "<" if order == "desc" else ">"
+
+        where: list[str] = []
+        params: list = []
+        if severity is not None:
+            if severity not in SEVERITY_RANK:
+                raise ValueError("severity must be one of: low, medium, high")
+            where.append("max_severity = ?")
+            params.append(SEVERITY_RANK[severity])
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("created_at < ?")
+            params.append(until)
+        if cursor:
+            value, last_id = _decode_cursor(cursor)
+            # Keyset pagination: seek past the last row instead of OFFSET, so each page costs the same.
+            where.append(f"({column}, id) {op} (?, ?)")
+            params.extend([value, last_id])
+
+        sql = "SELECT * FROM reports"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {column} {order.upper()}, id {order.upper()} LIMIT ?"
+        params.append(max(1, limit) + 1)
+
+        with self._lock:
+            rows = [dict(r) for r in self._conn.execute(sql, params).fetchall()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1][column], rows[-1]["id"])
+        severity_names = {rank: name for name, rank in SEVERITY_RANK.items()}
+        for row in rows:
+            row["max_severity"] = severity_names[row["max_severity"]]
+            row["path"] = str(self.report_dir / f"{row['id']}.json")
+        return rows, next_cursor
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_catalogs: dict[tuple[int, str], ReportCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(report_dir: str | Path) -> ReportCatalog:
+    key = (os.getpid(), str(Path(report_dir).resolve()))
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = ReportCatalog(report_dir)
+            _catalogs[key] = catalog
+        return catalog
+
+
+def main() -> None:
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Maintain the report catalog")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index every report JSON in REPORT_DIR")
+    args = parser.parse_args()
+
+    catalog = get_catalog(settings.report_path)
+    if args.rebuild:
+        print(f"Catalogued reports: {catalog.rebuild()}")
+
+
+if __name__ == "__main__":
+    main()
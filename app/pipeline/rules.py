@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+from app.config import settings
+
+
+DEFAULT_RULES_PATH = Path(__file__).with_name("default_rules.json")
+# Joins a batch of clauses for one scan; no term may contain it, so no hit can straddle two clauses.
+_BATCH_SEPARATOR = "\x00"
+
+
+def _trie_pattern(terms: Sequence[str]) -> str:
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Greedy optional suffix: the longest term starting at a position wins.
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class TermMatcher:
+    # All (possibly overlapping) substring hits of a fixed term set in one regex pass. The
+    # alternation is laid out as a trie, so each position costs the length of the longest
+    # match rather than the number of terms; shorter terms that are prefixes of the longest
+    # match at a position are implied.
+    def __init__(self, terms: Sequence[str]) -> None:
+        self.terms = tuple(sorted(set(terms)))
+        for term in self.terms:
+            if not term or _BATCH_SEPARATOR in term:
+                raise ValueError(f"Invalid rule term: {term!r}")
+        self._pattern = re.compile(f"(?=({_trie_pattern(self.terms)}))") if self.terms else None
+        self._implied = {t: frozenset(p for p in self.terms if t.startswith(p)) for t in self.terms}
+
+    def hits(self, text: str) -> set[str]:
+        found: set[str] = set()
+        if self._pattern is not None:
+            for m in self._pattern.finditer(text):
+                found |= self._implied[m.group(1)]
+        return found
+
+    def hits_many(self, texts: Sequence[str]) -> list[set[str]]:
+        found: list[set[str]] = [set() for _ in texts]
+        if self._pattern is None or not texts:
+            return found
+        starts = []
+        pos = 0
+        for text in texts:
+            starts.append(pos)
+            pos += len(text) + 1
+        for m in self._pattern.finditer(_BATCH_SEPARATOR.join(texts)):
+            found[bisect_right(starts, m.start()) - 1] |= self._implied[m.group(1)]
+        return found
+
+
+@dataclass
+class Rule:
+    rule_id: str
+    score: int
+    issue: str
+    any_terms: tuple[str, ...] = ()
+    all_terms: tuple[str, ...] = ()
+    none_terms: tuple[str, ...] = ()
+
+    def __post_init__(self) -> None:
+        if not self.any_terms and not self.all_terms:
+            raise ValueError(f"Rule {self.rule_id!r} needs at least one 'any' or 'all' term.")
+
+    def applies(self, hits: set[str]) -> bool:
+        if self.any_terms and hits.isdisjoint(self.any_terms):
+            return False
+        return all(t in hits for t in self.all_terms) and hits.isdisjoint(self.none_terms)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> Rule:
+        return cls(
+            rule_id=str(payload["id"]),
+            score=int(payload["score"]),
+            issue=str(payload["issue"]),
+            any_terms=tuple(str(t).lower() for t in payload.get("any", ())),
+            all_terms=tuple(str(t).lower() for t in payload.get("all", ())),
+            none_terms=tuple(str(t).lower() for t in payload.get("none", ())),
+        )
+
+
+@dataclass
+class RuleSet:
+    version: str
+    categories: list[tuple[str, str]]
+    rules: list[Rule]
+    default_category: str = "General"
+    base_score: int = 20
+    weak_alignment_min_similarity: float = 0.25
+    weak_alignment_score: int = 15
+    weak_alignment_issue: str = "Weak GDPR alignment based on semantic match."
+    high_threshold: int = 70
+    medium_threshold: int = 40
+    no_issue: str = "No significant GDPR risks detected by MVP rule set."
+    digest: str = ""
+    matcher: TermMatcher = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        terms = [term for term, _ in self.categories]
+        for rule in self.rules:
+            terms.extend(rule.any_terms + rule.all_terms + rule.none_terms)
+        self.matcher = TermMatcher(terms)
+
+    @property
+    def fingerprint(self) -> str:
+        return f"{self.version}:{self.digest}" if self.digest else self.version
+
+    def categorize(self, text: str) -> str:
+        hits = self.matcher.hits(text.lower())
+        for term, category in self.categories:
+            if term in hits:
+                return category
+        return self.default_category
+
+    def evaluate(self, hits: set[str], top_similarity: float | None) -> tuple[int, list[str]]:
+        score = self.base_score
+        issues: list[str] = []
+        for rule in self.rules:
+            if rule.applies(hits):
+                score += rule.score
+                issues.append(rule.issue)
+        if top_similarity is None or top_similarity < self.weak_alignment_min_similarity:
+            score += self.weak_alignment_score
+            issues.append(self.weak_alignment_issue)
+        return max(0, min(100, score)), issues
+
+    def severity(self, score: int) -> str:
+        if score >= self.high_threshold:
+            return "high"
+        if score >= self.medium_threshold:
+            return "medium"
+        return "low"
+
+    @classmethod
+    def from_dict(cls, payload: dict, digest: str = "") -> RuleSet:
+        weak = payload.get("weak_alignment", {})
+        severity = payload.get("severity", {})
+        defaults = cls(version="", categories=[], rules=[])
+        return cls(
+            version=str(payload.get("version", "1")),
+            categories=[(str(c["term"]).lower(), str(c["category"])) for c in payload.get("categories", [])],
+            rules=[Rule.from_dict(r) for r in payload.get("rules", [])],
+            default_category=str(payload.get("default_category", defaults.default_category)),
+            base_score=int(payload.get("base_score", defaults.base_score)),
+            weak_alignment_min_similarity=float(weak.get("min_similarity", defaults.weak_alignment_min_similarity)),
+            weak_alignment_score=int(weak.get("score", defaults.weak_alignment_score)),
+            weak_alignment_issue=str(weak.get("issue", defaults.weak_alignment_issue)),
+            high_threshold=int(severity.get("high", defaults.high_threshold)),
+            medium_threshold=int(severity.get("medium", defaults.medium_threshold)),
+            no_issue=str(payload.get("no_issue", defaults.no_issue)),
+            digest=digest,
+        )
+
+
+def load_ruleset(path: str | Path) -> RuleSet:
+    raw = Path(path).read_bytes()
+    try:
+        payload = json.loads(raw)
+        return RuleSet.from_dict(payload, digest=hashlib.sha256(raw).hexdigest()[:12])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid rule set {path}: {exc}") from exc
+
+
+_RULESET_CACHE: dict[str, tuple[tuple[int, int], RuleSet]] = {}
+_ruleset_lock = threading.Lock()
+
+
+def rules_path() -> Path:
+    return Path(settings.rules_path) if settings.rules_path else DEFAULT_RULES_PATH
+
+
+def get_ruleset() -> RuleSet:
+    # Compiled once per file version; editing the rule file takes effect without a restart.
+    path = rules_path()
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = str(path.resolve())
+    with _ruleset_lock:
+        cached = _RULESET_CACHE.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+        ruleset = load_ruleset(path)
+        _RULESET_CACHE[key] = (stamp, ruleset)
+        return ruleset
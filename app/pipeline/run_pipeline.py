@@ -1,45 +1,331 @@
 from __future__ import annotations
 
 import argparse
+import importlib
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
 
 from app.config import settings
-from app.pipeline.extract_clauses import extract_clauses
-from app.pipeline.rag_match import match_clauses_to_gdpr
-from app.pipeline.report import create_report, save_report
+from app.pipeline.extract_clauses import iter_clauses
+from app.pipeline.report import create_report, load_fresh_report, load_report, report_file, save_report
 from app.pipeline.risk_score import score_risks
 from app.pipeline.suggest_fixes import suggest_fixes
-from app.utils.hashing import sha256_text
-from app.utils.pdf_text import extract_pdf_text
+from app.schemas import Clause, GDPRMatch, PipelineReport, RiskResult, SuggestedFix
+from app.utils.hashing import StrippedTextHash
+from app.utils.metrics import CLAUSES, DOCUMENTS, StageTimer
+from app.utils.pdf_text import PdfSource, iter_pdf_text
 
+if TYPE_CHECKING:
+    from app.pipeline.dedupe import plan_clauses
+    from app.pipeline.fingerprint import pipeline_fingerprint
+    from app.pipeline.rag_match import match_clauses_to_gdpr
+    from app.pipeline.version_diff import diff_versions, version_diff
 
-def run(file_path: str) -> str:
-    raw_text = extract_pdf_text(file_path)
-    doc_hash = sha256_text(raw_text)[:16]
 
-    clauses = extract_clauses(raw_text)
-    matches = match_clauses_to_gdpr(clauses)
-    risks = score_risks(clauses, matches)
-    fixes = suggest_fixes(clauses, matches, risks)
+# These stages pull in numpy, the retriever and the embedding backend, so they are imported on the
+# first analysis rather than at startup (`--help`, the API and the batch parent never need them).
+# They are still module attributes: `run_pipeline.match_clauses_to_gdpr` resolves and patches as usual.
+_LAZY_STAGES = {
+    "plan_clauses": "app.pipeline.dedupe",
+    "pipeline_fingerprint": "app.pipeline.fingerprint",
+    "match_clauses_to_gdpr": "app.pipeline.rag_match",
+    "diff_versions": "app.pipeline.version_diff",
+    "version_diff": "app.pipeline.version_diff",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY_STAGES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = globals()[name] = getattr(importlib.import_module(module), name)
+    return value
+
+
+def _load_stages() -> None:
+    # Bare global lookups bypass __getattr__; names already set (imported or patched) are kept.
+    for name in _LAZY_STAGES:
+        if name not in globals():
+            __getattr__(name)
+
+
+def _read_document(file_path: PdfSource, timer: StageTimer | None = None) -> tuple[str, list[Clause]]:
+    # Pages are hashed and segmented as they are extracted; the joined text is never built.
+    timer = timer or StageTimer()
+    hasher = StrippedTextHash()
+    pdf_s = 0.0
+
+    def pieces():
+        nonlocal pdf_s
+        pages = iter_pdf_text(file_path)
+        while True:
+            started = time.perf_counter()
+            piece = next(pages, None)
+            pdf_s += time.perf_counter() - started
+            if piece is None:
+                return
+            hasher.update(piece)
+            yield piece
+
+    # Extraction and segmentation interleave, so segmentation is whatever the pass spent outside pypdf.
+    started = time.perf_counter()
+    clauses = list(iter_clauses(pieces()))
+    timer.add("pdf_text", pdf_s)
+    timer.add("segment", time.perf_counter() - started - pdf_s)
+    return hasher.hexdigest()[:16], clauses
+
+
+EventSink = Callable[[str, dict], None]
+
+
+def _emit_clauses(
+    emit: EventSink,
+    clauses: list[Clause],
+    matches: list[GDPRMatch],
+    risks: list[RiskResult],
+    fixes: list[SuggestedFix],
+) -> None:
+    match_map: dict[str, list[dict]] = {}
+    for m in matches:
+        match_map.setdefault(m.clause_id, []).append(m.to_dict())
+    risk_map = {r.clause_id: r.to_dict() for r in risks}
+    fix_map = {f.clause_id: f.to_dict() for f in fixes}
+    for clause in clauses:
+        emit(
+            "clause",
+            {
+                "clause": clause.to_dict(),
+                "matches": match_map.get(clause.clause_id, []),
+                "risk": risk_map.get(clause.clause_id),
+                "fix": fix_map.get(clause.clause_id),
+            },
+        )
+
+
+def _emit_document(emit: EventSink, report: PipelineReport, cached: bool, fresh: int) -> None:
+    emit(
+        "document",
+        {
+            "source_file": report.source_file,
+            "document_hash": report.document_hash,
+            "pipeline_fingerprint": report.pipeline_fingerprint,
+            "total_clauses": len(report.clauses),
+            "analysed_clauses": fresh,
+            "cached": cached,
+            "duplicate_groups": [g.to_dict() for g in report.duplicate_groups],
+        },
+    )
+
+
+def _emit_summary(emit: EventSink, report: PipelineReport) -> None:
+    emit(
+        "summary",
+        {
+            "report_id": report.document_hash,
+            "executive_summary": report.executive_summary.to_dict(),
+            "version_diff": report.version_diff.to_dict() if report.version_diff is not None else None,
+            "timings": dict(report.timings),
+        },
+    )
+
+
+def _source_label(source: PdfSource) -> str:
+    if isinstance(source, (str, Path)):
+        return str(source)
+    name = getattr(source, "name", "")
+    return name if isinstance(name, str) else ""
+
+
+def _previous_report(previous: str | None) -> PipelineReport | None:
+    if previous is None:
+        return None
+    report = load_report(settings.report_path, previous)
+    if report is None:
+        raise FileNotFoundError(f"No saved report for previous version: {previous}")
+    return report
+
+
+def _analyze(
+    file_path: PdfSource,
+    source_name: str | None,
+    force: bool,
+    emit: EventSink | None = None,
+    batch_size: int = 0,
+    previous: str | None = None,
+) -> tuple[PipelineReport, bool]:
+    try:
+        report, reused = _run_stages(file_path, source_name, force, emit, batch_size, _previous_report(previous))
+    except Exception:
+        DOCUMENTS.inc(outcome="failed")
+        raise
+    DOCUMENTS.inc(outcome="cached" if reused else "analyzed")
+    return report, reused
+
+
+def _run_stages(
+    file_path: PdfSource,
+    source_name: str | None,
+    force: bool,
+    emit: EventSink | None,
+    batch_size: int,
+    previous: PipelineReport | None,
+) -> tuple[PipelineReport, bool]:
+    _load_stages()
+    timer = StageTimer()
+    doc_hash, clauses = _read_document(file_path, timer)
+    fingerprint = pipeline_fingerprint()
+
+    if not force:
+        cached = load_fresh_report(settings.report_path, doc_hash, fingerprint, settings.report_max_age_s)
+        if cached is not None:
+            if source_name is not None:
+                cached.source_file = source_name
+            if previous is not None and previous.document_hash != doc_hash:
+                cached.version_diff = diff_versions(previous, cached)
+            timer.finish()
+            if emit is not None:
+                _emit_document(emit, cached, cached=True, fresh=0)
+                _emit_clauses(emit, cached.clauses, cached.gdpr_matches, cached.risk_scores, cached.suggested_fixes)
+                _emit_summary(emit, cached)
+            return cached, True
+
+    # Near-duplicate clauses share one representative; only representatives not already matched
+    # under this fingerprint are sent to retrieval, and their matches fan back out to every member.
+    with timer.stage("dedupe"):
+        plan = plan_clauses(clauses, fingerprint, use_store=not force)
+    stored = sum(len(g.members) for g in plan.groups if g.source == "store")
+    CLAUSES.inc(len(plan.fresh), source="fresh")
+    CLAUSES.inc(stored, source="store")
+    CLAUSES.inc(len(clauses) - len(plan.fresh) - stored, source="document")
+
+    report = create_report(
+        source_file=source_name if source_name is not None else _source_label(file_path),
+        document_hash=doc_hash,
+        clauses=clauses,
+        matches=[],
+        risks=[],
+        fixes=[],
+        pipeline_fingerprint=fingerprint,
+        duplicate_groups=plan.groups,
+    )
+    if emit is not None:
+        _emit_document(emit, report, cached=False, fresh=len(plan.fresh))
+
+    # Clauses are processed in document order, `batch_size` at a time (0: all at once). Every
+    # clause is matched, scored and fixed on its own, so batching never changes the results;
+    # a duplicate's representative always comes earlier in the document.
+    fresh_ids = {c.clause_id for c in plan.fresh}
+    fresh_matches: dict[str, list[GDPRMatch]] = {}
+    matches: list[GDPRMatch] = []
+    risks: list[RiskResult] = []
+    fixes: list[SuggestedFix] = []
+    size = batch_size if batch_size > 0 else max(1, len(clauses))
+    for start in range(0, len(clauses), size):
+        batch = clauses[start : start + size]
+        todo = [c for c in batch if c.clause_id in fresh_ids]
+        with timer.stage("match"):
+            for m in match_clauses_to_gdpr(todo) if todo else []:
+                fresh_matches.setdefault(m.clause_id, []).append(m)
+        with timer.stage("dedupe"):
+            reps = plan.representatives(batch)
+            batch_matches = plan.fan_out([m for rep in reps for m in fresh_matches.get(rep, [])], batch)
+        with timer.stage("score"):
+            # The rule pass is cheap and runs on every clause, duplicates included.
+            batch_risks = score_risks(batch, batch_matches)
+        with timer.stage("fixes"):
+            batch_fixes = suggest_fixes(batch, batch_matches, batch_risks)
+        matches += batch_matches
+        risks += batch_risks
+        fixes += batch_fixes
+        if emit is not None:
+            _emit_clauses(emit, batch, batch_matches, batch_risks, batch_fixes)
+
+    with timer.stage("dedupe"):
+        plan.remember(
+            doc_hash,
+            fingerprint,
+            [m for c in plan.fresh for m in fresh_matches.get(c.clause_id, [])],
+        )
 
     report = create_report(
-        source_file=file_path,
+        source_file=report.source_file,
         document_hash=doc_hash,
         clauses=clauses,
         matches=matches,
         risks=risks,
         fixes=fixes,
+        pipeline_fingerprint=fingerprint,
+        duplicate_groups=plan.groups,
     )
-    path = save_report(report, settings.report_path)
-    return str(path)
+    # A revised contract is diffed against the version it was edited from, named by `previous` or
+    # found as the saved report sharing the most clauses with it.
+    with timer.stage("diff"):
+        report.version_diff = version_diff(report, settings.report_path, list(plan.keys.values()), previous)
+    report.timings = timer.finish()
+    if emit is not None:
+        _emit_summary(emit, report)
+    return report, False
+
+
+def analyze_document(
+    file_path: PdfSource,
+    source_name: str | None = None,
+    force: bool = False,
+    emit: EventSink | None = None,
+    batch_size: int = 0,
+    previous: str | None = None,
+) -> PipelineReport:
+    # `file_path` may also be PDF bytes or a seekable binary file object (read from the start).
+    # With `emit`, progress is reported as ("document" | "clause" | "summary", payload) events while
+    # clauses are processed `batch_size` at a time; the returned report is the same either way.
+    # `previous` is the document hash of a saved report to diff against instead of the detected one.
+    return _analyze(file_path, source_name, force, emit, batch_size, previous)[0]
+
+
+def run(file_path: str, force: bool = False, previous: str | None = None) -> str:
+    report, reused = _analyze(file_path, None, force, previous=previous)
+    # A cached report given a diff against an explicitly named version is saved again with it.
+    if reused and previous is None:
+        return str(report_file(settings.report_path, report.document_hash))
+    return str(save_report(report, settings.report_path))
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Run ComplyAI Week 1 pipeline")
-    parser.add_argument("--file", required=True, help="Path to PDF file")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="Path to PDF file")
+    source.add_argument("--dir", help="Directory of PDF files to analyze (searched recursively)")
+    source.add_argument("--manifest", help="Text file listing one PDF path per line")
+    parser.add_argument("--pattern", default="*.pdf", help="Glob for --dir mode (default: *.pdf)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for batch mode (default: CPU count)")
+    parser.add_argument(
+        "--summary",
+        default=None,
+        help="JSONL file for per-document batch results (default: <REPORT_DIR>/batch_summary.jsonl)",
+    )
+    parser.add_argument("--force", action="store_true", help="Re-analyze even if a fresh report already exists")
+    parser.add_argument(
+        "--previous", default=None, help="Report id (document hash) of the earlier version to diff against (--file only)"
+    )
     args = parser.parse_args()
+    if args.previous and not args.file:
+        parser.error("--previous requires --file")
+
+    if args.file:
+        output_path = run(args.file, force=args.force, previous=args.previous)
+        print(f"Report generated: {output_path}")
+        return
 
-    output_path = run(args.file)
-    print(f"Report generated: {output_path}")
+    from app.pipeline.batch import collect_inputs, run_batch
+
+    files = collect_inputs(directory=args.dir, manifest=args.manifest, pattern=args.pattern)
+    summary_path = args.summary or settings.report_path / "batch_summary.jsonl"
+    summary = run_batch(files, summary_path, workers=args.workers, force=args.force)
+    print(
+        f"Analyzed {summary['ok']}/{summary['total']} documents ({summary['failed']} failed) "
+        f"in {summary['seconds']}s, {summary['docs_per_second']} docs/s. Summary: {summary['summary_path']}"
+    )
 
 
 if __name__ == "__main__":
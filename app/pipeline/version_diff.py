@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.pipeline.dedupe import clause_key, get_clause_store
+from app.pipeline.report import load_report, report_file
+from app.schemas import Clause, ClauseChange, PipelineReport, RiskResult, VersionDiff
+from app.utils.minhash import MinHasher
+
+
+_hasher = MinHasher()
+
+
+def find_previous_version(report_dir: str | Path, document_hash: str, keys: list[str]) -> str | None:
+    # The saved report of another document sharing the most clause keys (ties: the most recently
+    # analysed), if it shares at least VERSION_MIN_OVERLAP of this document's distinct clauses.
+    store = get_clause_store()
+    distinct = set(keys)
+    if store is None or not distinct or settings.version_min_overlap <= 0:
+        return None
+    for candidate, shared in store.related_documents(list(distinct), exclude=document_hash):
+        if shared / len(distinct) < settings.version_min_overlap:
+            break
+        if report_file(report_dir, candidate).exists():
+            return candidate
+    return None
+
+
+def _pair_edited(added: list[Clause], removed: list[Clause], threshold: float) -> list[tuple[int, int, float]]:
+    # Greedy, most similar first: a rewritten clause pairs with the removed clause it most resembles.
+    if not added or not removed or threshold <= 0:
+        return []
+    old = _hasher.signatures([c.text for c in removed])
+    candidates = []
+    for i, signature in enumerate(_hasher.signatures([c.text for c in added])):
+        scores = (old == signature).mean(axis=1)
+        candidates.extend((-float(scores[j]), i, int(j)) for j in np.flatnonzero(scores >= threshold))
+    pairs, used_new, used_old = [], set(), set()
+    for score, i, j in sorted(candidates):
+        if i not in used_new and j not in used_old:
+            used_new.add(i)
+            used_old.add(j)
+            pairs.append((i, j, -score))
+    return pairs
+
+
+def _change(
+    kind: str,
+    clause: Clause | None,
+    previous: Clause | None,
+    risk: RiskResult | None,
+    before: RiskResult | None,
+    similarity: float = 0.0,
+) -> ClauseChange:
+    named = clause if clause is not None else previous
+    return ClauseChange(
+        change=kind,
+        clause_id=clause.clause_id if clause is not None else "",
+        previous_clause_id=previous.clause_id if previous is not None else "",
+        title=named.title if named is not None else "",
+        similarity=round(similarity, 4),
+        risk_score=risk.risk_score if risk is not None else None,
+        previous_risk_score=before.risk_score if before is not None else None,
+        risk_delta=(risk.risk_score if risk is not None else 0) - (before.risk_score if before is not None else 0),
+        severity=risk.severity if risk is not None else "",
+        previous_severity=before.severity if before is not None else "",
+    )
+
+
+def diff_versions(previous: PipelineReport, current: PipelineReport, threshold: float | None = None) -> VersionDiff:
+    threshold = settings.version_change_threshold if threshold is None else threshold
+    risks = {r.clause_id: r for r in current.risk_scores}
+    before = {r.clause_id: r for r in previous.risk_scores}
+
+    # Identical normalized text pairs up first, in document order; what is left on either side is
+    # either an edited clause (paired by MinHash similarity) or a real addition or removal.
+    waiting: dict[str, list[Clause]] = {}
+    for clause in previous.clauses:
+        waiting.setdefault(clause_key(clause.text), []).append(clause)
+    kept: set[str] = set()
+    added: list[Clause] = []
+    for clause in current.clauses:
+        same = waiting.get(clause_key(clause.text))
+        if same:
+            kept.add(same.pop(0).clause_id)
+        else:
+            added.append(clause)
+    removed = [c for c in previous.clauses if c.clause_id not in kept]
+    pairs = {i: (j, score) for i, j, score in _pair_edited(added, removed, threshold)}
+    paired_old = {j for j, _ in pairs.values()}
+
+    changes = []
+    for i, clause in enumerate(added):
+        if i in pairs:
+            j, score = pairs[i]
+            old = removed[j]
+            changes.append(_change("changed", clause, old, risks.get(clause.clause_id), before.get(old.clause_id), score))
+        else:
+            changes.append(_change("added", clause, None, risks.get(clause.clause_id), None))
+    for j, old in enumerate(removed):
+        if j not in paired_old:
+            changes.append(_change("removed", None, old, None, before.get(old.clause_id)))
+
+    return VersionDiff(
+        previous_document=previous.document_hash,
+        previous_source_file=previous.source_file,
+        unchanged=len(kept),
+        added=len(added) - len(pairs),
+        removed=len(removed) - len(pairs),
+        changed=len(pairs),
+        overall_risk_delta=current.executive_summary.overall_risk_score - previous.executive_summary.overall_risk_score,
+        high_risk_delta=current.executive_summary.high_risk_clauses - previous.executive_summary.high_risk_clauses,
+        changes=changes,
+    )
+
+
+def version_diff(
+    report: PipelineReport, report_dir: str | Path, keys: list[str], previous: PipelineReport | None = None
+) -> VersionDiff | None:
+    # Against `previous` when given, otherwise against the detected earlier version, if any.
+    if previous is None:
+        document = find_previous_version(report_dir, report.document_hash, keys)
+        previous = load_report(report_dir, document) if document else None
+    if previous is None or previous.document_hash == report.document_hash:
+        return None
+    return diff_versions(previous, report)
@@ -1,59 +1,222 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import json
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
 
 from app.config import settings
-from app.rag.gdpr_chunks import build_gdpr_chunks
-from app.utils.embeddings import embed_texts
+from app.rag.corpus import iter_corpus, load_manifest, write_chunks
+from app.rag.ivf import default_list_count
+from app.rag.index_store import BinaryIndexWriter, StoredIndex, binary_index_exists, read_binary_index
+from app.utils.embeddings import embed_array, embedding_backend_id
+from app.utils.hashing import sha256_text
 
 
 COLLECTION = "gdpr_chunks"
-FALLBACK_INDEX = "gdpr_index.json"
+CHUNKS_PATH = "data/regulations/chunks.jsonl"
+BATCH_SIZE = 512
+
+
+@dataclass
+class IndexBuildResult:
+    total: int
+    embedded: int
+    reused: int
+    removed: int
+    index_version: str
+    published: bool
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
 
 
-def load_chunks(chunks_path: str | Path = "data/regulations/gdpr/chunks.jsonl") -> list[dict]:
+def load_chunks(chunks_path: str | Path = CHUNKS_PATH) -> Iterator[dict]:
     path = Path(chunks_path)
     if not path.exists():
         raise FileNotFoundError(f"Missing chunks file: {path}")
-    rows = []
-    for line in path.read_text(encoding="utf-8").splitlines():
-        if not line.strip():
-            continue
-        rows.append(json.loads(line))
-    return rows
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
 
 
-def build_index() -> int:
-    settings.chroma_path.mkdir(parents=True, exist_ok=True)
-    build_gdpr_chunks()
+def chunk_hash(text: str) -> str:
+    return sha256_text(text)[:16]
+
+
+def _previous_index(backend: str) -> StoredIndex | None:
+    # Vectors are only reusable from an index built by the same backend that recorded chunk hashes.
+    if not binary_index_exists(settings.chroma_path):
+        return None
+    try:
+        stored = read_binary_index(settings.chroma_path)
+    except Exception:
+        return None
+    if stored.meta.get("embedding_model") != backend or len(stored.meta.get("content_hashes", [])) != len(stored.ids):
+        return None
+    return stored
 
-    chunks = load_chunks()
-    docs = [c["text"] for c in chunks]
-    ids = [c["id"] for c in chunks]
-    metadatas = [{"article": c["article"], "topic": c["topic"], "source": c["source"]} for c in chunks]
-    embeddings = embed_texts(docs)
 
+def _chroma_client():
     try:
         import chromadb
 
-        client = chromadb.PersistentClient(path=str(settings.chroma_path))
-        try:
-            client.delete_collection(COLLECTION)
-        except Exception:
-            pass
+        return chromadb.PersistentClient(path=str(settings.chroma_path))
+    except Exception:
+        return None
+
 
-        collection = client.create_collection(name=COLLECTION)
-        collection.add(ids=ids, documents=docs, metadatas=metadatas, embeddings=embeddings)
+def _drop_collections(client, keep: set[str]) -> None:
+    try:
+        for collection in client.list_collections():
+            name = getattr(collection, "name", collection)
+            if name.startswith(COLLECTION) and name not in keep:
+                client.delete_collection(name)
     except Exception:
-        fallback_path = settings.chroma_path / FALLBACK_INDEX
-        payload = []
-        for idx, doc, meta, emb in zip(ids, docs, metadatas, embeddings):
-            payload.append({"id": idx, "document": doc, "metadata": meta, "embedding": emb})
-        fallback_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    return len(ids)
+        pass
+
+
+def ivf_list_count(rows: int) -> int:
+    # 0 keeps the fallback index exact; large corpora get an IVF index for approximate search.
+    if not settings.ann_min_rows or rows < settings.ann_min_rows:
+        return 0
+    return min(rows, settings.ann_lists) if settings.ann_lists else default_list_count(rows)
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def update_index(
+    full: bool = False,
+    manifest: str | Path | None = None,
+    chunks_path: str | Path = CHUNKS_PATH,
+    workers: int | None = None,
+) -> IndexBuildResult:
+    settings.chroma_path.mkdir(parents=True, exist_ok=True)
+    sources = load_manifest(manifest or settings.corpus_manifest)
+    workers = settings.chunk_workers if workers is None else workers
+    backend = embedding_backend_id()
+
+    previous = None if full else _previous_index(backend)
+    previous_collection = str(previous.meta.get("chroma_collection", "")) if previous is not None else ""
+    # Diff by content hash: unchanged text keeps its vector even if its chunk id moved.
+    rows_by_hash: dict[str, int] = {}
+    if previous is not None:
+        for row, h in enumerate(previous.meta["content_hashes"]):
+            rows_by_hash.setdefault(h, row)
+
+    client = _chroma_client()
+    writer = BinaryIndexWriter(settings.chroma_path)
+    # The new version's collection is filled aside and only named by the sidecar once complete.
+    collection_name = f"{COLLECTION}_{writer.token}" if client is not None else ""
+    collection = None
+    hashes: list[str] = []
+    version = hashlib.sha256(backend.encode("utf-8"))
+    embedded = reused = 0
+    try:
+        if client is not None:
+            try:
+                collection = client.create_collection(name=collection_name)
+            except Exception:
+                client, collection_name = None, ""
+        # Chunks stream from the corpus through the chunks file into the index in fixed batches.
+        for batch in _batches(write_chunks(iter_corpus(sources, workers), chunks_path), BATCH_SIZE):
+            docs = [c["text"] for c in batch]
+            ids = [c["id"] for c in batch]
+            metadatas = [
+                {key: c.get(key, "") for key in ("article", "topic", "source", "regulation", "jurisdiction")}
+                for c in batch
+            ]
+            batch_hashes = [chunk_hash(d) for d in docs]
+            for chunk_id, h, meta in zip(ids, batch_hashes, metadatas):
+                version.update(json.dumps([chunk_id, h, meta], sort_keys=True).encode("utf-8"))
+
+            missing = [i for i, h in enumerate(batch_hashes) if h not in rows_by_hash]
+            fresh = embed_array([docs[i] for i in missing]) if missing else None
+            if fresh is not None:
+                dim = fresh.shape[1]
+            else:
+                dim = previous.embeddings.shape[1] if previous is not None else 0
+            matrix = np.zeros((len(batch), dim), dtype=np.float32)
+            hits = [i for i, h in enumerate(batch_hashes) if h in rows_by_hash]
+            if hits:
+                matrix[hits] = previous.embeddings[[rows_by_hash[batch_hashes[i]] for i in hits]]
+            if fresh is not None:
+                matrix[missing] = fresh
+
+            writer.add(ids, docs, metadatas, matrix)
+            if collection is not None:
+                collection.add(ids=ids, documents=docs, metadatas=metadatas, embeddings=matrix)
+            hashes.extend(batch_hashes)
+            embedded += len(missing)
+            reused += len(hits)
+    except BaseException:
+        writer.abort()
+        if client is not None:
+            _drop_collections(client, {previous_collection})
+        raise
+
+    index_version = version.hexdigest()[:16]
+    removed = len(set(previous.ids) - set(writer.ids)) if previous is not None else 0
+    ivf_lists = ivf_list_count(len(hashes))
+    if (
+        previous is not None
+        and previous.meta.get("index_version") == index_version
+        and bool(previous_collection) == (client is not None)
+        and previous.meta.get("ivf_lists", 0) == ivf_lists
+    ):
+        writer.abort()
+        if client is not None:
+            _drop_collections(client, {previous_collection})
+        return IndexBuildResult(len(hashes), 0, len(hashes), 0, index_version, published=False)
+
+    # The binary index is always written so the offline retriever works even when
+    # chromadb is installed but unavailable at query time.
+    writer.commit(
+        extra_meta={
+            "embedding_model": backend,
+            "index_version": index_version,
+            "content_hashes": hashes,
+            "chroma_collection": collection_name,
+        },
+        ivf_lists=ivf_lists,
+    )
+    if client is not None:
+        _drop_collections(client, {collection_name, previous_collection})
+    return IndexBuildResult(len(hashes), embedded, reused, removed, index_version, published=True)
+
+
+def build_index(full: bool = False) -> int:
+    return update_index(full=full).total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or incrementally update the regulation retrieval index")
+    parser.add_argument("--full", action="store_true", help="Re-embed every chunk instead of reusing unchanged ones")
+    parser.add_argument("--manifest", default=None, help="Corpus manifest (default: CORPUS_MANIFEST)")
+    parser.add_argument("--workers", type=int, default=None, help="Chunking processes (default: CHUNK_WORKERS)")
+    args = parser.parse_args()
+
+    result = update_index(full=args.full, manifest=args.manifest, workers=args.workers)
+    state = "published" if result.published else "already up to date"
+    print(
+        f"Indexed regulation chunks: {result.total} ({result.embedded} embedded, {result.reused} reused, "
+        f"{result.removed} removed; version {result.index_version} {state})"
+    )
 
 
 if __name__ == "__main__":
-    count = build_index()
-    print(f"Indexed GDPR chunks: {count}")
+    main()
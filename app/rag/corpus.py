@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from app.utils.text_clean import LineNormalizer
+
+
+_READ_CHARS = 1 << 20
+
+
+@dataclass
+class RegulationSource:
+    regulation: str
+    jurisdiction: str
+    source_dir: str
+    pattern: str = "*.txt"
+    chunk_size: int = 700
+    overlap: int = 120
+    id_prefix: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.regulation.strip():
+            raise ValueError("regulation cannot be empty")
+        if self.chunk_size <= 0 or not 0 <= self.overlap < self.chunk_size:
+            raise ValueError(f"{self.regulation}: need chunk_size > overlap >= 0")
+
+    @classmethod
+    def from_dict(cls, payload: dict, base_dir: Path | None = None) -> RegulationSource:
+        source_dir = Path(payload["source_dir"])
+        if base_dir is not None and not source_dir.is_absolute():
+            source_dir = base_dir / source_dir
+        return cls(
+            regulation=str(payload["regulation"]),
+            jurisdiction=str(payload.get("jurisdiction", "")),
+            source_dir=str(source_dir),
+            pattern=str(payload.get("pattern", "*.txt")),
+            chunk_size=int(payload.get("chunk_size", 700)),
+            overlap=int(payload.get("overlap", 120)),
+            id_prefix=str(payload.get("id_prefix", "")),
+        )
+
+    def files(self) -> list[Path]:
+        return sorted(Path(self.source_dir).glob(self.pattern))
+
+
+def load_manifest(path: str | Path) -> list[RegulationSource]:
+    # Relative source directories are resolved against the manifest's own directory.
+    manifest = Path(path)
+    try:
+        payload = json.loads(manifest.read_text(encoding="utf-8"))
+        sources = [RegulationSource.from_dict(s, manifest.parent) for s in payload["sources"]]
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid corpus manifest {manifest}: {exc}") from exc
+    if not sources:
+        raise ValueError(f"Corpus manifest {manifest} lists no sources")
+    return sources
+
+
+def _normalized_lines(pieces: Iterable[str]) -> Iterator[list[tuple[str, str]]]:
+    normalizer = LineNormalizer()
+    for piece in pieces:
+        yield normalizer.feed(piece)
+    yield normalizer.close()
+
+
+def iter_windows(pieces: Iterable[str], chunk_size: int, overlap: int) -> Iterator[str]:
+    # Fixed character windows over normalize_text() of the concatenated pieces, produced as the
+    # text streams in; only the current window plus the overlap is buffered.
+    buf = ""
+    base = 0
+    start = 0
+    leading = True
+    for lines in _normalized_lines(pieces):
+        for sep, line in lines:
+            text = sep + line
+            if leading:
+                text, leading = text.lstrip(), False
+            buf += text
+        # Windows ending strictly before the last non-space char cannot change as more text arrives.
+        known = base + len(buf.rstrip())
+        while start + chunk_size < known:
+            end = start + chunk_size
+            chunk = buf[start - base : end - base].strip()
+            if chunk:
+                yield chunk
+            start = end - overlap
+            buf, base = buf[start - base :], start
+
+    buf = buf.rstrip()
+    length = base + len(buf)
+    while start < length:
+        end = min(start + chunk_size, length)
+        chunk = buf[start - base : end - base].strip()
+        if chunk:
+            yield chunk
+        if end == length:
+            break
+        start = end - overlap
+
+
+def _read_pieces(path: Path) -> Iterator[str]:
+    with path.open("r", encoding="utf-8") as fh:
+        while True:
+            piece = fh.read(_READ_CHARS)
+            if not piece:
+                return
+            yield piece
+
+
+def chunk_file(path: str | Path, source: RegulationSource) -> list[dict]:
+    file = Path(path)
+    stem = file.stem
+    prefix = f"{source.regulation.lower()}_"
+    name = stem[len(prefix) :] if stem.lower().startswith(prefix) else stem
+    rows = []
+    for idx, text in enumerate(iter_windows(_read_pieces(file), source.chunk_size, source.overlap)):
+        rows.append(
+            {
+                "id": f"{source.id_prefix}{stem}_{idx}",
+                "text": text,
+                "article": name.replace("_", " ").title(),
+                "topic": name.replace("_", "-"),
+                "source": str(file),
+                "regulation": source.regulation,
+                "jurisdiction": source.jurisdiction,
+            }
+        )
+    return rows
+
+
+def iter_corpus(sources: list[RegulationSource], workers: int = 1) -> Iterator[dict]:
+    # Files are chunked in parallel but yielded in manifest/file order, with a bounded number
+    # of files in flight, so output is deterministic and memory stays flat.
+    tasks = [(file, source) for source in sources for file in source.files()]
+    seen: set[str] = set()
+    for rows in _chunked_files(tasks, workers):
+        for row in rows:
+            if row["id"] in seen:
+                raise ValueError(f"Duplicate chunk id {row['id']!r}; set id_prefix in the manifest.")
+            seen.add(row["id"])
+            yield row
+
+
+def _chunked_files(tasks: list[tuple[Path, RegulationSource]], workers: int) -> Iterator[list[dict]]:
+    if workers <= 1 or len(tasks) < 2:
+        for file, source in tasks:
+            yield chunk_file(file, source)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = deque(tasks)
+    in_flight: deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        while pending and len(in_flight) < workers * 2:
+            in_flight.append(pool.submit(chunk_file, *pending.popleft()))
+        while in_flight:
+            rows = in_flight.popleft().result()
+            if pending:
+                in_flight.append(pool.submit(chunk_file, *pending.popleft()))
+            yield rows
+
+
+def write_chunks(rows: Iterable[dict], out_path: str | Path) -> Iterator[dict]:
+    # Passes rows through while streaming them to JSONL; the file is replaced only once the
+    # stream is exhausted, so a failed build never leaves a truncated chunks file behind.
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + f".{os.getpid()}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8") as fh:
+            for row in rows:
+                fh.write(json.dumps(row, ensure_ascii=True) + "\n")
+                yield row
+        tmp.replace(out)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def build_corpus_chunks(manifest: str | Path, out_path: str | Path, workers: int = 1) -> int:
+    count = 0
+    for _ in write_chunks(iter_corpus(load_manifest(manifest), workers), out_path):
+        count += 1
+    return count
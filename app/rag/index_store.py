@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import shutil
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from app.rag.ivf import IVFIndex, load_ivf, save_ivf, train_ivf
+
+
+INDEX_FORMAT_VERSION = 1
+INDEX_BASENAME = "gdpr_index"
+EMBEDDINGS_SUFFIX = ".npy"
+DOCUMENTS_SUFFIX = ".docs.bin"
+META_SUFFIX = ".meta.json"
+IVF_SUFFIX = ".ivf.npz"
+# Per-row metadata columns kept in the sidecar: column name -> (metadata key, default).
+_META_COLUMNS = {
+    "articles": ("article", "Unknown"),
+    "topics": ("topic", "unknown"),
+    "sources": ("source", ""),
+    "regulations": ("regulation", ""),
+    "jurisdictions": ("jurisdiction", ""),
+}
+
+
+class DocumentStore(Sequence[str]):
+    def __init__(self, buffer: bytes | mmap.mmap, offsets: list[int]) -> None:
+        self._buffer = buffer
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def __getitem__(self, idx):  # type: ignore[override]
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+        return bytes(self._buffer[self._offsets[idx] : self._offsets[idx + 1]]).decode("utf-8")
+
+
+@dataclass
+class StoredIndex:
+    embeddings: np.ndarray
+    ids: list[str]
+    documents: Sequence[str]
+    articles: list[str]
+    topics: list[str]
+    sources: list[str]
+    meta: dict
+    regulations: list[str] = field(default_factory=list)
+    jurisdictions: list[str] = field(default_factory=list)
+    ivf: IVFIndex | None = None
+
+
+def index_paths(directory: str | Path, basename: str = INDEX_BASENAME) -> dict[str, Path]:
+    base = Path(directory)
+    return {
+        "embeddings": base / f"{basename}{EMBEDDINGS_SUFFIX}",
+        "documents": base / f"{basename}{DOCUMENTS_SUFFIX}",
+        "meta": base / f"{basename}{META_SUFFIX}",
+    }
+
+
+def _data_files(directory: str | Path, meta: dict, basename: str = INDEX_BASENAME) -> tuple[Path, ...]:
+    # Sidecars written before versioned data files point at the fixed default names.
+    defaults = index_paths(directory, basename)
+    base = Path(directory)
+    embeddings = base / meta["embeddings_file"] if meta.get("embeddings_file") else defaults["embeddings"]
+    documents = base / meta["documents_file"] if meta.get("documents_file") else defaults["documents"]
+    if meta.get("ivf_file"):
+        return embeddings, documents, base / meta["ivf_file"]
+    return embeddings, documents
+
+
+def _read_meta(directory: str | Path, basename: str = INDEX_BASENAME) -> dict | None:
+    try:
+        return json.loads(index_paths(directory, basename)["meta"].read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def binary_index_exists(directory: str | Path, basename: str = INDEX_BASENAME) -> bool:
+    # The sidecar is the commit point of a build; data files are never published without it.
+    return index_paths(directory, basename)["meta"].exists()
+
+
+def index_files(directory: str | Path, basename: str = INDEX_BASENAME) -> list[Path]:
+    meta = _read_meta(directory, basename)
+    if meta is None:
+        return []
+    return [index_paths(directory, basename)["meta"], *_data_files(directory, meta, basename)]
+
+
+def index_stamp(directory: str | Path, basename: str = INDEX_BASENAME) -> tuple[int, int]:
+    # The sidecar is written last, so its stat identifies a complete index version.
+    stat = index_paths(directory, basename)["meta"].stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class BinaryIndexWriter:
+    # Streams rows into a new, unpublished index version: vectors go to a raw file and documents
+    # to the blob as they arrive, so only ids and small metadata are held until commit().
+    def __init__(self, directory: str | Path, basename: str = INDEX_BASENAME) -> None:
+        self.directory = Path(directory)
+        self.basename = basename
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.token = uuid.uuid4().hex[:12]
+        self.emb_path = self.directory / f"{basename}.{self.token}{EMBEDDINGS_SUFFIX}"
+        self.docs_path = self.directory / f"{basename}.{self.token}{DOCUMENTS_SUFFIX}"
+        self.ivf_path = self.directory / f"{basename}.{self.token}{IVF_SUFFIX}"
+        self._raw_path = self.emb_path.with_name(self.emb_path.name + ".raw.tmp")
+        self._docs_tmp = self.docs_path.with_name(self.docs_path.name + ".tmp")
+        self._raw = self._raw_path.open("wb")
+        self._docs = self._docs_tmp.open("wb")
+        self.dim: int | None = None
+        self.ids: list[str] = []
+        self._columns: dict[str, list[str]] = {name: [] for name in _META_COLUMNS}
+        self._offsets = [0]
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    def add(
+        self,
+        ids: Sequence[str],
+        documents: Sequence[str],
+        metadatas: Sequence[dict],
+        embeddings: Sequence[Sequence[float]] | np.ndarray,
+    ) -> None:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.size == 0:
+            matrix = matrix.reshape(len(ids), self.dim or 0)
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(f"Expected {len(ids)} embedding rows, got shape {matrix.shape}.")
+        if self.dim is not None and ids and matrix.shape[1] != self.dim:
+            raise ValueError(f"Embedding dim {matrix.shape[1]} does not match earlier rows ({self.dim}).")
+        if ids:
+            self.dim = int(matrix.shape[1])
+        self._raw.write(normalize_rows(matrix).tobytes())
+        for doc in documents:
+            blob = doc.encode("utf-8")
+            self._docs.write(blob)
+            self._offsets.append(self._offsets[-1] + len(blob))
+        self.ids.extend(ids)
+        for name, (key, default) in _META_COLUMNS.items():
+            self._columns[name].extend(str(m.get(key, default)) for m in metadatas)
+
+    def commit(self, extra_meta: dict | None = None, ivf_lists: int = 0) -> Path:
+        self._raw.close()
+        self._docs.close()
+        dim = self.dim or 0
+        meta = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "count": self.count,
+            "dim": dim,
+            "normalized": True,
+            "ids": self.ids,
+            **self._columns,
+            "doc_offsets": self._offsets,
+        }
+        meta.update(extra_meta or {})
+        meta["embeddings_file"] = self.emb_path.name
+        meta["documents_file"] = self.docs_path.name
+
+        tmp_emb = self.emb_path.with_name(self.emb_path.name + ".tmp")
+        with tmp_emb.open("wb") as out, self._raw_path.open("rb") as raw:
+            header = {"descr": np.lib.format.dtype_to_descr(np.dtype(np.float32)), "fortran_order": False, "shape": (self.count, dim)}
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out, 1 << 20)
+        self._raw_path.unlink()
+        os.replace(tmp_emb, self.emb_path)
+        os.replace(self._docs_tmp, self.docs_path)
+        if ivf_lists > 0 and self.count and dim:
+            ivf = train_ivf(np.load(self.emb_path, mmap_mode="r"), ivf_lists)
+            save_ivf(self.ivf_path, ivf)
+            meta["ivf_file"] = self.ivf_path.name
+            meta["ivf_lists"] = ivf.nlist
+
+        # Data files get a fresh name per build and the sidecar naming them is swapped in last, so
+        # publishing is a single rename: readers see the old index or the new one, never a mix.
+        previous = _read_meta(self.directory, self.basename)
+        meta_path = index_paths(self.directory, self.basename)["meta"]
+        tmp_meta = meta_path.with_name(meta_path.name + ".tmp")
+        tmp_meta.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_meta, meta_path)
+
+        keep = {self.emb_path, self.docs_path, self.ivf_path}
+        if previous is not None:
+            # A reader may have read the previous sidecar but not opened its files yet.
+            keep.update(_data_files(self.directory, previous, self.basename))
+        _prune(self.directory, self.basename, keep)
+        return meta_path
+
+    def abort(self) -> None:
+        self._raw.close()
+        self._docs.close()
+        for path in (self._raw_path, self._docs_tmp):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def write_binary_index(
+    directory: str | Path,
+    ids: list[str],
+    documents: list[str],
+    metadatas: list[dict],
+    embeddings: Sequence[Sequence[float]] | np.ndarray,
+    basename: str = INDEX_BASENAME,
+    extra_meta: dict | None = None,
+    ivf_lists: int = 0,
+) -> Path:
+    writer = BinaryIndexWriter(directory, basename)
+    try:
+        writer.add(ids, documents, metadatas, embeddings)
+    except Exception:
+        writer.abort()
+        raise
+    return writer.commit(extra_meta, ivf_lists)
+
+
+def _prune(directory: str | Path, basename: str, keep: set[Path]) -> None:
+    base = Path(directory)
+    defaults = index_paths(directory, basename)
+    candidates = [defaults["embeddings"], defaults["documents"]]
+    candidates += base.glob(f"{basename}.*{EMBEDDINGS_SUFFIX}")
+    candidates += base.glob(f"{basename}.*{DOCUMENTS_SUFFIX}")
+    candidates += base.glob(f"{basename}.*{IVF_SUFFIX}")
+    for path in candidates:
+        if path not in keep:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _map_file(path: Path) -> bytes | mmap.mmap:
+    with path.open("rb") as fh:
+        if os.fstat(fh.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def read_binary_index(directory: str | Path, basename: str = INDEX_BASENAME) -> StoredIndex:
+    paths = index_paths(directory, basename)
+    meta = json.loads(paths["meta"].read_text(encoding="utf-8"))
+    emb_path, docs_path, *ivf_path = _data_files(directory, meta, basename)
+    version = int(meta.get("format_version", 0))
+    if version != INDEX_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported index format version {version} at {paths['meta']}; "
+            "rebuild with `python -m app.rag.build_index`."
+        )
+
+    if meta["count"] * meta["dim"] == 0:
+        embeddings = np.zeros((meta["count"], meta["dim"]), dtype=np.float32)
+    else:
+        # Memory-mapped read-only: worker processes share the pages through the OS cache.
+        embeddings = np.load(emb_path, mmap_mode="r")
+    if embeddings.shape != (meta["count"], meta["dim"]):
+        raise ValueError(
+            f"Index at {directory} is inconsistent: matrix {embeddings.shape}, "
+            f"sidecar {meta['count']}x{meta['dim']}."
+        )
+
+    return StoredIndex(
+        embeddings=embeddings,
+        ids=meta["ids"],
+        documents=DocumentStore(_map_file(docs_path), meta["doc_offsets"]),
+        articles=meta["articles"],
+        topics=meta["topics"],
+        sources=meta["sources"],
+        meta=meta,
+        regulations=meta.get("regulations", [""] * meta["count"]),
+        jurisdictions=meta.get("jurisdictions", [""] * meta["count"]),
+        ivf=load_ivf(ivf_path[0]) if ivf_path else None,
+    )
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+
+KMEANS_ITERATIONS = 12
+# k-means is trained on a sample of this many rows per list; every row is assigned afterwards.
+TRAIN_ROWS_PER_LIST = 64
+_ASSIGN_BLOCK = 8192
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def default_list_count(rows: int) -> int:
+    return max(1, min(rows, int(round(math.sqrt(rows)))))
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty(matrix.shape[0], dtype=np.int64)
+    for start in range(0, matrix.shape[0], _ASSIGN_BLOCK):
+        block = np.asarray(matrix[start : start + _ASSIGN_BLOCK], dtype=np.float32)
+        out[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+@dataclass
+class IVFIndex:
+    # Inverted file over unit vectors: rows are grouped by their nearest k-means centroid and a
+    # query only scans the lists of its nprobe nearest centroids.
+    centroids: np.ndarray
+    offsets: np.ndarray
+    order: np.ndarray
+
+    @property
+    def nlist(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def search(self, embeddings: np.ndarray, queries: np.ndarray, top_k: int, nprobe: int) -> tuple[np.ndarray, np.ndarray]:
+        # queries must be unit rows. Ranking and tie order match the exact scan over the probed rows.
+        k = min(top_k, int(embeddings.shape[0]))
+        ids = np.zeros((queries.shape[0], k), dtype=np.int64)
+        scores = np.zeros((queries.shape[0], k), dtype=np.float32)
+        if k == 0 or queries.shape[0] == 0:
+            return ids, scores
+        sizes = np.diff(self.offsets)
+        ranked = np.argsort(-(queries @ self.centroids.T), axis=1, kind="stable")
+        # Probe further lists for queries whose nearest lists hold fewer than k rows between them.
+        need = np.maximum(nprobe, (np.cumsum(sizes[ranked], axis=1) < k).sum(axis=1) + 1)
+        probed = np.arange(self.nlist)[None, :] < need[:, None]
+        query_of, list_of = np.nonzero(probed)
+        list_of = ranked[query_of, list_of]
+        by_list = np.argsort(list_of, kind="stable")
+        query_of, list_of = query_of[by_list], list_of[by_list]
+        bounds = np.flatnonzero(np.diff(list_of)) + 1
+
+        # Each probed list is gathered once and scored against all of its queries in one product;
+        # only its per-query top k survive to the final merge.
+        found_ids: list[list[np.ndarray]] = [[] for _ in range(queries.shape[0])]
+        found_scores: list[list[np.ndarray]] = [[] for _ in range(queries.shape[0])]
+        for group_q, group_l in zip(np.split(query_of, bounds), np.split(list_of, bounds)):
+            c = int(group_l[0])
+            rows = self.order[self.offsets[c] : self.offsets[c + 1]]
+            if not len(rows):
+                continue
+            sims = np.clip(np.asarray(embeddings[rows], dtype=np.float32) @ queries[group_q].T, 0.0, 1.0)
+            top = np.argsort(-sims, axis=0, kind="stable")[:k]
+            for col, q in enumerate(group_q.tolist()):
+                found_ids[q].append(rows[top[:, col]])
+                found_scores[q].append(sims[top[:, col], col])
+
+        for q in range(queries.shape[0]):
+            cand = np.concatenate(found_ids[q])
+            sims = np.concatenate(found_scores[q])
+            top = np.lexsort((cand, -sims))[:k]
+            ids[q], scores[q] = cand[top], sims[top]
+        return ids, scores
+
+
+def train_ivf(embeddings: np.ndarray, nlist: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> IVFIndex:
+    # Spherical k-means: rows and centroids are unit vectors, so assignment is a max dot product.
+    rows = int(embeddings.shape[0])
+    nlist = max(1, min(nlist, rows))
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(rows, min(rows, nlist * TRAIN_ROWS_PER_LIST), replace=False))
+    train = np.asarray(embeddings[sample], dtype=np.float32)
+    centroids = train[rng.choice(len(train), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _assign(train, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, train)
+        empty = np.flatnonzero(np.bincount(assign, minlength=nlist) == 0)
+        # Lists that lost every row are reseeded from random training rows.
+        sums[empty] = train[rng.choice(len(train), len(empty))]
+        centroids = _unit_rows(sums)
+
+    assign = _assign(embeddings, centroids)
+    offsets = np.zeros(nlist + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assign, minlength=nlist), out=offsets[1:])
+    return IVFIndex(centroids=centroids, offsets=offsets, order=np.argsort(assign, kind="stable").astype(np.int64))
+
+
+def save_ivf(path: str | Path, ivf: IVFIndex) -> Path:
+    target = Path(path)
+    tmp = target.with_name(target.name + ".tmp")
+    with tmp.open("wb") as fh:
+        np.savez(fh, centroids=ivf.centroids, offsets=ivf.offsets, order=ivf.order)
+    os.replace(tmp, target)
+    return target
+
+
+def load_ivf(path: str | Path) -> IVFIndex:
+    with np.load(path, allow_pickle=False) as data:
+        return IVFIndex(centroids=data["centroids"], offsets=data["offsets"], order=data["order"])
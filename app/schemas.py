@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 
 
 @dataclass
@@ -17,6 +17,10 @@ class Clause:
     def to_dict(self) -> dict:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, payload: dict) -> Clause:
+        return cls(**payload)
+
 
 @dataclass
 class GDPRMatch:
@@ -32,6 +36,10 @@ class GDPRMatch:
     def to_dict(self) -> dict:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, payload: dict) -> GDPRMatch:
+        return cls(**payload)
+
 
 @dataclass
 class RiskResult:
@@ -48,6 +56,10 @@ class RiskResult:
     def to_dict(self) -> dict:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, payload: dict) -> RiskResult:
+        return cls(**payload)
+
 
 @dataclass
 class SuggestedFix:
@@ -59,6 +71,10 @@ class SuggestedFix:
     def to_dict(self) -> dict:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, payload: dict) -> SuggestedFix:
+        return cls(**payload)
+
 
 @dataclass
 class ExecutiveSummary:
@@ -75,6 +91,76 @@ class ExecutiveSummary:
     def to_dict(self) -> dict:
         return asdict(self)
 
+    @classmethod
+    def from_dict(cls, payload: dict) -> ExecutiveSummary:
+        return cls(**payload)
+
+
+@dataclass
+class DuplicateGroup:
+    representative: str
+    members: list[str]
+    similarity: float
+    source: str = "document"
+    source_document: str = ""
+    source_clause: str = ""
+
+    def __post_init__(self) -> None:
+        if self.source not in {"document", "store"}:
+            raise ValueError("source must be one of: document, store")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> DuplicateGroup:
+        return cls(**payload)
+
+
+@dataclass
+class ClauseChange:
+    change: str
+    clause_id: str = ""
+    previous_clause_id: str = ""
+    title: str = ""
+    similarity: float = 0.0
+    risk_score: int | None = None
+    previous_risk_score: int | None = None
+    risk_delta: int = 0
+    severity: str = ""
+    previous_severity: str = ""
+
+    def __post_init__(self) -> None:
+        if self.change not in {"added", "removed", "changed"}:
+            raise ValueError("change must be one of: added, removed, changed")
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> ClauseChange:
+        return cls(**payload)
+
+
+@dataclass
+class VersionDiff:
+    previous_document: str
+    previous_source_file: str
+    unchanged: int
+    added: int
+    removed: int
+    changed: int
+    overall_risk_delta: int
+    high_risk_delta: int
+    changes: list[ClauseChange] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> VersionDiff:
+        return cls(**{**payload, "changes": [ClauseChange.from_dict(c) for c in payload.get("changes", [])]})
+
 
 @dataclass
 class PipelineReport:
@@ -85,14 +171,38 @@ class PipelineReport:
     risk_scores: list[RiskResult]
     suggested_fixes: list[SuggestedFix]
     executive_summary: ExecutiveSummary
+    pipeline_fingerprint: str = ""
+    duplicate_groups: list[DuplicateGroup] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)
+    version_diff: VersionDiff | None = None
 
     def to_dict(self) -> dict:
         return {
             "source_file": self.source_file,
             "document_hash": self.document_hash,
+            "pipeline_fingerprint": self.pipeline_fingerprint,
             "clauses": [c.to_dict() for c in self.clauses],
             "gdpr_matches": [m.to_dict() for m in self.gdpr_matches],
             "risk_scores": [r.to_dict() for r in self.risk_scores],
             "suggested_fixes": [s.to_dict() for s in self.suggested_fixes],
             "executive_summary": self.executive_summary.to_dict(),
+            "duplicate_groups": [g.to_dict() for g in self.duplicate_groups],
+            "timings": dict(self.timings),
+            "version_diff": self.version_diff.to_dict() if self.version_diff is not None else None,
         }
+
+    @classmethod
+    def from_dict(cls, payload: dict) -> PipelineReport:
+        return cls(
+            source_file=payload["source_file"],
+            document_hash=payload["document_hash"],
+            clauses=[Clause.from_dict(c) for c in payload.get("clauses", [])],
+            gdpr_matches=[GDPRMatch.from_dict(m) for m in payload.get("gdpr_matches", [])],
+            risk_scores=[RiskResult.from_dict(r) for r in payload.get("risk_scores", [])],
+            suggested_fixes=[SuggestedFix.from_dict(s) for s in payload.get("suggested_fixes", [])],
+            executive_summary=ExecutiveSummary.from_dict(payload["executive_summary"]),
+            pipeline_fingerprint=payload.get("pipeline_fingerprint", ""),
+            duplicate_groups=[DuplicateGroup.from_dict(g) for g in payload.get("duplicate_groups", [])],
+            timings=dict(payload.get("timings", {})),
+            version_diff=VersionDiff.from_dict(payload["version_diff"]) if payload.get("version_diff") else None,
+        )
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+
+from app.config import override_settings
+
+
+def override_for_test(case: unittest.TestCase, **values) -> None:
+    # override_settings for the rest of one test, undone by its cleanups.
+    stack = ExitStack()
+    case.addCleanup(stack.close)
+    stack.enter_context(override_settings(**values))
+
+
+def use_temp_storage(case: unittest.TestCase, **values) -> Path:
+    # Reports and the clause, embedding and LLM caches of one test live in a fresh directory, so the
+    # suite never writes into storage/. Extra keyword arguments are overridden for the test as well.
+    tmp = tempfile.TemporaryDirectory()
+    case.addCleanup(tmp.cleanup)
+    root = Path(tmp.name)
+    override_for_test(
+        case,
+        report_dir=str(root / "reports"),
+        clause_store_path=str(root / "clauses.sqlite3"),
+        embed_cache_path=str(root / "embeddings.sqlite3"),
+        llm_cache_path=str(root / "llm.sqlite3"),
+        **values,
+    )
+    return root
+
+
+def build_temp_index(cls: type[unittest.TestCase]) -> None:
+    # The regulation index for a test class, built under a temporary CHROMA_DIR for its lifetime.
+    from app.rag.build_index import build_index
+
+    stack = ExitStack()
+    cls.addClassCleanup(stack.close)
+    root = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+    stack.enter_context(
+        override_settings(chroma_dir=str(root / "chroma"), embed_cache_path=str(root / "embeddings.sqlite3"))
+    )
+    build_index()
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.api import jobs
+from app.api.jobs import InProcessJobQueue, QueueFullError
+from app.api.main import app
+from app.api.routes import analyze
+from app.config import override_settings
+from app.pipeline import report as report_module
+from app.tests.support import build_temp_index, use_temp_storage
+
+
+SAMPLE_PDF = Path("data/samples/contracts/sample_vendor_agreement.pdf")
+
+
+def _chunked_upload(data: bytes, chunk_bytes: int, filename: str = "vendor.pdf") -> tuple[Request, list[int]]:
+    # A multipart request without a content-length whose body arrives chunk_bytes at a time; the
+    # returned list counts the chunks the server has read.
+    boundary = "test-boundary"
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    chunks = [body[i : i + chunk_bytes] for i in range(0, len(body), chunk_bytes)]
+    read: list[int] = []
+
+    async def receive() -> dict:
+        read.append(len(chunks[len(read)]))
+        return {"type": "http.request", "body": chunks[len(read) - 1], "more_body": len(read) < len(chunks)}
+
+    headers = [(b"content-type", f"multipart/form-data; boundary={boundary}".encode())]
+    return Request({"type": "http", "method": "POST", "path": "/analyze", "headers": headers}, receive), read
+
+
+def _drain_report_writer() -> None:
+    if report_module._writer is not None:
+        report_module._writer.submit(lambda: None).result(timeout=30)
+
+
+class InProcessJobQueueTests(unittest.TestCase):
+    def test_rejects_when_full_and_recovers(self) -> None:
+        queue = InProcessJobQueue(max_workers=1, max_queue=1)
+        release = threading.Event()
+        first = queue.submit(release.wait, filename="a.pdf")
+        second = queue.submit(lambda: "done", filename="b.pdf")
+        with self.assertRaises(QueueFullError):
+            queue.submit(lambda: None)
+
+        release.set()
+        self.assertEqual(second.future.result(timeout=5), "done")
+        first.future.result(timeout=5)
+        self.assertEqual(queue.get(second.job_id).status, "succeeded")
+        queue.submit(lambda: None).future.result(timeout=5)
+        queue.shutdown()
+
+    def test_failed_job_records_error(self) -> None:
+        queue = InProcessJobQueue(max_workers=1, max_queue=0)
+        job = queue.submit(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            job.future.result(timeout=5)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("ZeroDivisionError", job.error)
+        queue.shutdown()
+
+
+class AnalyzeJobApiTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        build_temp_index(cls)
+
+    def setUp(self) -> None:
+        use_temp_storage(self)
+        patcher = mock.patch.object(jobs, "_queue", InProcessJobQueue(max_workers=1, max_queue=2))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Reports are persisted in the background; let pending writes land before the directory goes.
+        self.addCleanup(_drain_report_writer)
+        self.client = TestClient(app)
+
+    def test_analyze_returns_job_then_report(self) -> None:
+        with SAMPLE_PDF.open("rb") as fh:
+            response = self.client.post("/analyze", files={"file": ("vendor.pdf", fh, "application/pdf")})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            status = self.client.get(f"/jobs/{job_id}").json()
+            if status["status"] in {"succeeded", "failed"}:
+                break
+            time.sleep(0.05)
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual(status["result"]["source_file"], "vendor.pdf")
+        self.assertEqual(self.client.get("/jobs/unknown").status_code, 404)
+
+    def test_wait_returns_report_and_persists_it(self) -> None:
+        with SAMPLE_PDF.open("rb") as fh:
+            response = self.client.post(
+                "/analyze?wait=true", files={"file": ("renamed.pdf", fh, "application/pdf")}
+            )
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(report["source_file"], "renamed.pdf")
+
+        deadline = time.time() + 10
+        stored = self.client.get(f"/reports/{report['document_hash']}")
+        while stored.json().get("source_file") != "renamed.pdf" and time.time() < deadline:
+            time.sleep(0.05)
+            stored = self.client.get(f"/reports/{report['document_hash']}")
+        self.assertEqual(stored.json(), report)
+
+    def test_upload_is_hashed_and_size_limited(self) -> None:
+        data = SAMPLE_PDF.read_bytes()
+        response = self.client.post("/analyze?wait=false", files={"file": ("vendor.pdf", data, "application/pdf")})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()["upload_sha256"], hashlib.sha256(data).hexdigest())
+        self.assertEqual(response.json()["upload_bytes"], len(data))
+        jobs._queue.get(response.json()["job_id"]).future.result(timeout=30)
+
+        with override_settings(upload_max_bytes=len(data) - 1), mock.patch.object(jobs._queue, "submit") as submit:
+            response = self.client.post("/analyze", files={"file": ("vendor.pdf", data, "application/pdf")})
+        self.assertEqual(response.status_code, 413)
+        submit.assert_not_called()
+
+    def test_spool_writes_leave_the_event_loop_once_on_disk(self) -> None:
+        data = b"%PDF-1.4\n" + b"0" * 10_000
+        written = []
+
+        async def offloaded(fn, *args):
+            written.append(len(args[0]))
+            return fn(*args)
+
+        request, _ = _chunked_upload(data, 1024)
+        with override_settings(upload_spool_bytes=4096), mock.patch.object(analyze, "run_in_threadpool", offloaded):
+            upload = asyncio.run(analyze._spool_upload(request))
+        self.assertEqual((upload.filename, upload.size), ("vendor.pdf", len(data)))
+        self.assertEqual(upload.sha256, hashlib.sha256(data).hexdigest())
+        self.assertEqual(upload.file.read(), data)
+        upload.file.close()
+        # Only the data past the in-memory spool size went through the thread pool, and the file was
+        # read straight from the request, not copied out of a spool of the whole body.
+        self.assertLess(sum(written), len(data) - 4096 + 1024)
+        self.assertGreater(sum(written), len(data) - 4096 - 1024)
+
+    def test_chunked_upload_is_refused_before_it_is_read(self) -> None:
+        data = b"%PDF-1.4\n" + b"0" * 100_000
+        request, read = _chunked_upload(data, 1024)
+        with override_settings(upload_max_bytes=10_000), self.assertRaises(HTTPException) as caught:
+            asyncio.run(analyze._spool_upload(request))
+        self.assertEqual(caught.exception.status_code, 413)
+        self.assertLess(sum(read), 12_000)
+
+    def test_non_pdf_upload_is_refused_from_its_part_headers(self) -> None:
+        request, read = _chunked_upload(b"0" * 100_000, 1024, filename="notes.txt")
+        with self.assertRaises(HTTPException) as caught:
+            asyncio.run(analyze._spool_upload(request))
+        self.assertEqual(caught.exception.status_code, 400)
+        self.assertEqual(len(read), 1)
+
+    def test_queue_full_returns_429(self) -> None:
+        with mock.patch.object(jobs._queue, "submit", side_effect=QueueFullError("full")):
+            with SAMPLE_PDF.open("rb") as fh:
+                response = self.client.post("/analyze", files={"file": ("vendor.pdf", fh, "application/pdf")})
+        self.assertEqual(response.status_code, 429)
+
+
+if __name__ == "__main__":
+    unittest.main()
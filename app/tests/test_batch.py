@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.pipeline import batch, run_pipeline
+
+
+def _run_or_die(file_path: str, force: bool = False) -> str:
+    # Stands in for a document that gets its worker OOM-killed or segfaults the parser.
+    if Path(file_path).name == "crash.pdf":
+        os._exit(1)
+    return file_path + ".json"
+
+
+@unittest.skipUnless(multiprocessing.get_start_method() == "fork", "patches reach pool workers only when forked")
+class BatchTests(unittest.TestCase):
+    def test_dead_worker_fails_only_its_document(self) -> None:
+        files = ["a.pdf", "crash.pdf", "b.pdf", "c.pdf", "d.pdf"]
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(run_pipeline, "run", _run_or_die), mock.patch.object(
+            batch, "_init_worker"
+        ):
+            summary = batch.run_batch(files, Path(tmp) / "summary.jsonl", workers=2, progress=None)
+            rows = [json.loads(line) for line in (Path(tmp) / "summary.jsonl").read_text(encoding="utf-8").splitlines()]
+
+        self.assertEqual((summary["total"], summary["ok"], summary["failed"]), (5, 4, 1))
+        by_file = {row["file"]: row for row in rows}
+        self.assertEqual(sorted(by_file), sorted(files))
+        self.assertEqual(by_file["crash.pdf"]["status"], "error")
+        self.assertIn("BrokenProcessPool", by_file["crash.pdf"]["error"])
+        self.assertEqual({by_file[f]["report"] for f in files if f != "crash.pdf"}, {f + ".json" for f in files if f != "crash.pdf"})
+
+
+if __name__ == "__main__":
+    unittest.main()
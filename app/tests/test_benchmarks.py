@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+
+from app.benchmarks.bench_pipeline import compare, run_benchmark
+from app.benchmarks.bench_startup import BUDGETS_PATH, check, import_profile
+from app.benchmarks.synthetic import synthetic_contract_clauses, write_regulation_corpus
+from app.config import settings
+from app.rag.corpus import iter_corpus, load_manifest
+
+
+class SyntheticGeneratorTests(unittest.TestCase):
+    def test_generators_are_seeded_and_sized(self) -> None:
+        first = synthetic_contract_clauses(40, "decimal", duplicate_rate=0.5, seed=3)
+        self.assertEqual(first, synthetic_contract_clauses(40, "decimal", duplicate_rate=0.5, seed=3))
+        self.assertNotEqual(first, synthetic_contract_clauses(40, "decimal", duplicate_rate=0.5, seed=4))
+        self.assertEqual(len(first), 40)
+        self.assertTrue(all(clause[0][0].isdigit() for clause in first))
+        bodies = [" ".join(clause[1:]) for clause in first]
+        self.assertLess(len(set(bodies)), 30)
+        with self.assertRaises(ValueError):
+            synthetic_contract_clauses(1, "roman")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            rows = list(iter_corpus(load_manifest(write_regulation_corpus(tmp, 123, chunks_per_file=50))))
+        self.assertEqual(len(rows), 123)
+        self.assertEqual(rows[0]["regulation"], "SYNTH")
+
+
+class PipelineBenchmarkTests(unittest.TestCase):
+    def test_small_run_times_every_stage_offline(self) -> None:
+        config = {"pages": 2, "clauses": 12, "heading_style": "title", "duplicate_rate": 0.3, "chunks": 60, "seed": 1}
+        chroma_dir = settings.chroma_dir
+        result = run_benchmark(config, repeat=1)
+        self.assertEqual(settings.chroma_dir, chroma_dir)
+        self.assertEqual(result["counts"]["chunks"], 60)
+        self.assertEqual(result["counts"]["clauses"], 12)
+        self.assertLess(result["counts"]["analysed_clauses"], 12)
+        self.assertEqual(
+            set(result["stages"]), {"pdf_text", "segment", "dedupe", "match", "score", "fixes", "build_index", "run"}
+        )
+
+    def test_compare_flags_only_material_slowdowns(self) -> None:
+        config = {"clauses": 1}
+        baseline = {"config": config, "stages": {"match": {"min_s": 0.1}, "fixes": {"min_s": 0.0001}}}
+        result = {
+            "config": config,
+            "stages": {"match": {"min_s": 0.2}, "fixes": {"min_s": 0.001}, "new": {"min_s": 1.0}},
+        }
+        rows = {r["stage"]: r for r in compare(result, baseline, 0.25, {}, min_delta_s=0.005)}
+        self.assertEqual(set(rows), {"match", "fixes"})
+        self.assertTrue(rows["match"]["regressed"])
+        self.assertFalse(rows["fixes"]["regressed"])
+        self.assertFalse(compare(result, baseline, 0.25, {"match": 1.5}, 0.005)[0]["regressed"])
+        with self.assertRaises(ValueError):
+            compare({**result, "config": {"clauses": 2}}, baseline, 0.25, {}, 0.005)
+
+
+class StartupBenchmarkTests(unittest.TestCase):
+    def test_entry_points_import_without_heavy_backends(self) -> None:
+        budgets = json.loads(BUDGETS_PATH.read_text(encoding="utf-8"))
+        modules = budgets["forbidden_imports"]
+        result = {"timings": {}, "imports": {m: import_profile(m) for m in modules}}
+        self.assertEqual(check(result, {"forbidden_imports": modules}), [])
+        self.assertIn("app.pipeline.extract_clauses", result["imports"]["app.pipeline.run_pipeline"]["modules"])
+
+    def test_check_reports_budgets_and_banned_modules(self) -> None:
+        result = {"timings": {"run_pipeline_help": 0.4, "api_ready": 0.1}, "imports": {"app.x": {"modules": ["numpy"]}}}
+        budgets = {
+            "budgets_s": {"run_pipeline_help": 0.3, "api_ready": 0.3, "missing": 1.0},
+            "forbidden_imports": {"app.x": ["numpy", "pypdf"]},
+        }
+        self.assertEqual(check(result, budgets), ["run_pipeline_help took 0.400s (budget 0.3s)", "import app.x loads numpy"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from app.config import settings
+from app.rag import build_index
+from app.rag.index_store import index_files, read_binary_index
+from app.tests.support import override_for_test
+
+
+SOURCE_DIR = Path("data/regulations/gdpr/source")
+
+
+class IncrementalBuildTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        self.source = root / "source"
+        shutil.copytree(SOURCE_DIR, self.source)
+        self.chunks = root / "chunks.jsonl"
+        self.manifest = root / "manifest.json"
+        self.manifest.write_text(
+            json.dumps({"sources": [{"regulation": "GDPR", "jurisdiction": "EU", "source_dir": "source"}]}), encoding="utf-8"
+        )
+        override_for_test(self, chroma_dir=str(root / "index"))
+
+    def _update(self, full: bool = False) -> tuple[build_index.IndexBuildResult, int]:
+        with mock.patch.object(build_index, "embed_array", wraps=build_index.embed_array) as spy:
+            result = build_index.update_index(full=full, manifest=self.manifest, chunks_path=self.chunks, workers=1)
+        return result, sum(len(call.args[0]) for call in spy.call_args_list)
+
+    def test_only_changed_chunks_are_embedded(self) -> None:
+        first, embedded = self._update()
+        self.assertEqual((first.embedded, embedded, first.published), (first.total, first.total, True))
+
+        again, embedded = self._update()
+        self.assertEqual((again.published, embedded, again.index_version), (False, 0, first.index_version))
+
+        target = self.source / "gdpr_article_33.txt"
+        target.write_text(target.read_text(encoding="utf-8") + "\nAmended: notify without undue delay.\n", encoding="utf-8")
+        (self.source / "gdpr_article_5.txt").unlink()
+        changed, embedded = self._update()
+        self.assertTrue(changed.published)
+        self.assertGreater(changed.removed, 0)
+        self.assertEqual(embedded, changed.embedded)
+        self.assertLess(changed.embedded, changed.total)
+
+        stored = read_binary_index(settings.chroma_path)
+        self.assertEqual(set(zip(stored.regulations, stored.jurisdictions)), {("GDPR", "EU")})
+        full, _ = self._update(full=True)
+        rebuilt = read_binary_index(settings.chroma_path)
+        self.assertEqual(full.index_version, changed.index_version)
+        self.assertEqual(rebuilt.ids, stored.ids)
+        np.testing.assert_allclose(rebuilt.embeddings, stored.embeddings, atol=1e-6)
+
+    def test_superseded_files_are_pruned(self) -> None:
+        self._update()
+        for i in range(3):
+            (self.source / f"gdpr_extra_{i}.txt").write_text(f"Extra article {i} on data portability.", encoding="utf-8")
+            self._update()
+        data_files = [p for p in settings.chroma_path.iterdir() if p.suffix in {".npy", ".bin"}]
+        # The live version plus the one before it, which a concurrent reader may still be opening.
+        self.assertEqual(len(data_files), 4)
+        self.assertTrue(all(p.exists() for p in index_files(settings.chroma_path)))
+
+
+if __name__ == "__main__":
+    unittest.main()
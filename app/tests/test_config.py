@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import unittest
+from dataclasses import fields
+
+from app.config import load_settings, override_settings, reload_settings, settings
+
+
+class SettingsTests(unittest.TestCase):
+    def test_load_from_mapping_ignores_process_environment(self) -> None:
+        loaded = load_settings({"CLAUSE_TOP_K": "0", "PDF_WORKERS": "x", "ENABLE_LLM_RISK_EXPLANATIONS": "yes"})
+        self.assertEqual(loaded.clause_top_k, 1)
+        self.assertGreaterEqual(loaded.pdf_workers, 1)
+        self.assertTrue(loaded.enable_llm_risk_explanations)
+        self.assertEqual(loaded.chroma_dir, "storage/chroma")
+        self.assertIsNot(loaded, settings)
+
+    def test_reload_updates_the_shared_instance(self) -> None:
+        # Reloading replaces every field, so all of them are put back afterwards.
+        before = {f.name: getattr(settings, f.name) for f in fields(settings)}
+        try:
+            same = reload_settings({"REPORT_DIR": "elsewhere", "CLAUSE_TOP_K": "7"})
+            self.assertIs(same, settings)
+            self.assertEqual((settings.report_dir, settings.clause_top_k), ("elsewhere", 7))
+        finally:
+            for name, value in before.items():
+                setattr(settings, name, value)
+
+    def test_override_restores_and_rejects_unknown_names(self) -> None:
+        top_k = settings.clause_top_k
+        with override_settings(clause_top_k=top_k + 5) as current:
+            self.assertEqual(current.clause_top_k, top_k + 5)
+        self.assertEqual(settings.clause_top_k, top_k)
+        with self.assertRaises(RuntimeError):
+            with override_settings(clause_top_k=99):
+                raise RuntimeError
+        self.assertEqual(settings.clause_top_k, top_k)
+        with self.assertRaises(TypeError):
+            with override_settings(clause_topk=1):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
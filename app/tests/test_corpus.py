@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.rag.corpus import build_corpus_chunks, iter_corpus, iter_windows, load_manifest
+from app.utils.text_clean import normalize_text
+
+
+SOURCE_DIR = Path("data/regulations/gdpr/source").resolve()
+_ALPHABET = ["a", "b", " ", "\t", "\n", "\n\n", "\r", "\r\n", "Web", "3/4", "xxxxx"]
+
+
+def _windows(text: str, chunk_size: int, overlap: int) -> list[str]:
+    # The original whole-string loop from gdpr_chunks.build_gdpr_chunks.
+    text = normalize_text(text)
+    out = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        chunk = text[start:end].strip()
+        if chunk:
+            out.append(chunk)
+        if end == len(text):
+            break
+        start = max(0, end - overlap)
+    return out
+
+
+class CorpusTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        sector = self.root / "hipaa"
+        sector.mkdir()
+        for i in range(3):
+            (sector / f"hipaa_section_{i}.txt").write_text(f"Section {i}. Covered entities safeguard PHI.\n" * 40, encoding="utf-8")
+        self.manifest = self.root / "manifest.json"
+        self.manifest.write_text(
+            json.dumps(
+                {
+                    "sources": [
+                        {"regulation": "GDPR", "jurisdiction": "EU", "source_dir": str(SOURCE_DIR)},
+                        {"regulation": "HIPAA", "jurisdiction": "US", "source_dir": "hipaa", "chunk_size": 300, "overlap": 50},
+                    ]
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def test_streamed_windows_match_whole_text_windows(self) -> None:
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 200)))
+            chunk_size = rng.randint(1, 30)
+            overlap = rng.randint(0, chunk_size - 1)
+            cuts = sorted(rng.choices(range(len(text) + 1), k=rng.randint(0, 8)))
+            pieces = [text[a:b] for a, b in zip([0, *cuts], [*cuts, len(text)])]
+            self.assertEqual(list(iter_windows(pieces, chunk_size, overlap)), _windows(text, chunk_size, overlap), repr(pieces))
+
+    def test_parallel_output_matches_serial(self) -> None:
+        serial, parallel = self.root / "serial.jsonl", self.root / "parallel.jsonl"
+        count = build_corpus_chunks(self.manifest, serial, workers=1)
+        self.assertEqual(build_corpus_chunks(self.manifest, parallel, workers=2), count)
+        self.assertEqual(serial.read_bytes(), parallel.read_bytes())
+
+        rows = [json.loads(line) for line in serial.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(rows), count)
+        tags = {(r["regulation"], r["jurisdiction"]) for r in rows}
+        self.assertEqual(tags, {("GDPR", "EU"), ("HIPAA", "US")})
+        hipaa = [r for r in rows if r["regulation"] == "HIPAA"]
+        self.assertTrue(all(len(r["text"]) <= 300 for r in hipaa))
+        self.assertEqual(hipaa[0]["article"], "Section 0")
+
+    def test_invalid_manifest_is_rejected(self) -> None:
+        self.manifest.write_text(json.dumps({"sources": [{"regulation": "X", "source_dir": ".", "overlap": 900}]}), encoding="utf-8")
+        with self.assertRaises(ValueError):
+            load_manifest(self.manifest)
+
+    def test_duplicate_chunk_ids_are_rejected(self) -> None:
+        source = load_manifest(self.manifest)[0]
+        with self.assertRaises(ValueError):
+            list(iter_corpus([source, source]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.config import override_settings
+from app.pipeline import run_pipeline
+from app.pipeline.dedupe import plan_clauses
+from app.pipeline.rag_match import match_clauses_to_gdpr
+from app.pipeline.risk_score import score_risks
+from app.schemas import Clause
+from app.tests.support import build_temp_index, use_temp_storage
+from app.utils.minhash import MinHasher, similarity
+
+
+SAMPLE_PDF = Path("data/samples/contracts/sample_vendor_agreement.pdf")
+BREACH = (
+    "Vendor will notify Customer of any personal data breach without undue delay and in any event within "
+    "72 hours after becoming aware of it, and will provide all information reasonably required by Customer."
+)
+BREACH_DETAIL = (
+    BREACH + " The notice shall describe the nature of the breach, the categories and approximate number of data "
+    "subjects and records concerned, the likely consequences of the breach, and the measures taken or proposed to "
+    "address it, including measures to mitigate its possible adverse effects. Vendor shall document every breach, "
+    "its effects and the remedial action taken, and keep that record available to Customer and to the competent "
+    "supervisory authority."
+)
+SECURITY = (
+    "Vendor shall implement appropriate technical and organizational measures including encryption of personal "
+    "data at rest and in transit, access controls, and regular testing of those measures."
+)
+
+
+class MinHashTests(unittest.TestCase):
+    def test_similarity_tracks_overlap(self) -> None:
+        hasher = MinHasher()
+        base = hasher.signature(BREACH)
+        self.assertEqual(similarity(base, hasher.signature(BREACH.upper())), 1.0)
+        self.assertGreater(similarity(base, hasher.signature(BREACH + " Page 4")), 0.85)
+        self.assertLess(similarity(base, hasher.signature(SECURITY)), 0.2)
+        self.assertEqual(hasher.band_keys(base), MinHasher().band_keys(base))
+
+
+class DedupeTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        build_temp_index(cls)
+
+    def setUp(self) -> None:
+        self.root = use_temp_storage(self)
+
+    def test_duplicates_share_one_representative(self) -> None:
+        clauses = [
+            Clause("C001", "Breach", "breach_notification", BREACH),
+            Clause("C002", "Security", "security", SECURITY),
+            Clause("C003", "Breach", "breach_notification", BREACH + " Page 4"),
+            Clause("C004", "Breach", "breach_notification", BREACH),
+        ]
+        plan = plan_clauses(clauses, "fp", use_store=False)
+        self.assertEqual([c.clause_id for c in plan.fresh], ["C001", "C002"])
+        self.assertEqual([(g.representative, g.members, g.source) for g in plan.groups], [("C001", ["C001", "C003", "C004"], "document")])
+
+        fresh_matches = match_clauses_to_gdpr(plan.fresh)
+        matches = plan.fan_out(fresh_matches)
+        risks = score_risks(clauses, matches)
+        self.assertEqual({m.clause_id for m in matches}, {"C001", "C002", "C003", "C004"})
+
+        # Exact copies get exactly what analysing them on their own would have produced.
+        direct = score_risks(clauses, match_clauses_to_gdpr(clauses))
+        self.assertEqual(risks[3].to_dict(), direct[3].to_dict())
+        with override_settings(dedupe_threshold=0.0):
+            self.assertEqual(len(plan_clauses(clauses, "fp").fresh), 4)
+
+    def test_near_duplicates_share_matches_but_not_risk(self) -> None:
+        # Only the notification deadline differs, and it flips the 72-hour breach rule.
+        clauses = [
+            Clause("C001", "Breach", "breach_notification", BREACH_DETAIL),
+            Clause("C002", "Breach", "breach_notification", BREACH_DETAIL.replace("72 hours", "30 days")),
+        ]
+        plan = plan_clauses(clauses, "fp", use_store=False)
+        self.assertEqual([c.clause_id for c in plan.fresh], ["C001"])
+        matches = plan.fan_out(match_clauses_to_gdpr(plan.fresh))
+        self.assertEqual([m.article for m in matches if m.clause_id == "C002"], [m.article for m in matches if m.clause_id == "C001"])
+        risks = score_risks(clauses, matches)
+        self.assertGreater(risks[1].risk_score, risks[0].risk_score)
+        self.assertTrue(any("72-hour" in issue for issue in risks[1].issues))
+        self.assertFalse(any("72-hour" in issue for issue in risks[0].issues))
+
+    def test_clauses_analysed_before_are_reused_from_the_store(self) -> None:
+        first = run_pipeline.analyze_document(str(SAMPLE_PDF))
+        self.assertEqual(first.duplicate_groups, [])
+
+        with mock.patch.object(run_pipeline, "match_clauses_to_gdpr", wraps=run_pipeline.match_clauses_to_gdpr) as spy:
+            with override_settings(report_dir=str(self.root / "other")):
+                second = run_pipeline.analyze_document(str(SAMPLE_PDF))
+            self.assertEqual(spy.call_count, 0)
+            forced = run_pipeline.analyze_document(str(SAMPLE_PDF), force=True)
+            self.assertEqual(spy.call_count, 1)
+
+        self.assertEqual(second.to_dict()["risk_scores"], first.to_dict()["risk_scores"])
+        self.assertEqual(second.to_dict()["gdpr_matches"], first.to_dict()["gdpr_matches"])
+        self.assertEqual({g.source for g in second.duplicate_groups}, {"store"})
+        self.assertEqual({g.source_document for g in second.duplicate_groups}, {first.document_hash})
+        self.assertEqual(forced.duplicate_groups, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
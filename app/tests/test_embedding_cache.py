@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.utils.embedding_cache import EmbeddingCache
+
+
+class EmbeddingCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "embeddings.sqlite3"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_hits_ignore_whitespace_and_persist(self) -> None:
+        cache = EmbeddingCache(self.path, memory_entries=0)
+        cache.put_many("m", 3, [("Data  is\nencrypted", [1.0, 2.0, 3.0])])
+        self.assertEqual(cache.get_many("m", 3, ["Data is encrypted", "other"]), {0: [1.0, 2.0, 3.0]})
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+        reopened = EmbeddingCache(self.path)
+        self.assertEqual(reopened.get_many("m", 3, ["Data is encrypted"]), {0: [1.0, 2.0, 3.0]})
+        self.assertEqual(reopened.get_many("other-model", 3, ["Data is encrypted"]), {})
+        reopened.close()
+
+    def test_evicts_least_recently_used(self) -> None:
+        cache = EmbeddingCache(self.path, max_entries=2, memory_entries=0)
+        cache.put_many("m", 1, [("a", [1.0])])
+        cache.put_many("m", 1, [("b", [2.0])])
+        cache.get_many("m", 1, ["a"])
+        cache.put_many("m", 1, [("c", [3.0])])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(sorted(cache.get_many("m", 1, ["a", "b", "c"])), [0, 2])
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils.embedding_client import EmbeddingClient, EmbeddingError, make_batches
+
+
+class _StubEmbeddingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.batches: list[list[str]] = []
+        self.fail_next: list[int] = []
+        self.lock = threading.Lock()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: _StubEmbeddingServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            status = self.server.fail_next.pop(0) if self.server.fail_next else 200
+            if status == 200:
+                self.server.batches.append(request["input"])
+        if status != 200:
+            self._send(status, {"error": {"message": "stub failure", "type": "stub"}})
+            return
+        data = [
+            {"object": "embedding", "index": i, "embedding": [float(len(text)), 1.0]}
+            for i, text in enumerate(request["input"])
+        ]
+        self._send(200, {"object": "list", "data": data, "model": request["model"], "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+
+
+class EmbeddingClientTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = _StubEmbeddingServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = EmbeddingClient(
+            api_key="test",
+            model="stub-embed",
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+            max_batch_size=2,
+            max_concurrency=3,
+            max_retries=2,
+            sleep=lambda _: None,
+        )
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_batches_concurrently_and_preserves_order(self) -> None:
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+        vectors = self.client.embed(texts)
+        self.assertEqual([v[0] for v in vectors], [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(sorted(len(b) for b in self.server.batches), [1, 2, 2])
+        stats = self.client.stats()
+        self.assertEqual(stats["texts_embedded"], 5)
+        self.assertGreater(stats["texts_per_second"], 0)
+
+    def test_retries_rate_limits(self) -> None:
+        self.server.fail_next = [429, 503]
+        self.assertEqual(self.client.embed(["abc"]), [[3.0, 1.0]])
+        self.assertEqual(self.client.retries, 2)
+
+    def test_non_retryable_error_raises(self) -> None:
+        self.server.fail_next = [400]
+        with self.assertRaises(EmbeddingError):
+            self.client.embed(["abc"])
+        self.assertEqual(self.client.retries, 0)
+
+    def test_batches_respect_token_budget(self) -> None:
+        self.assertEqual(make_batches(["x" * 40, "x" * 40, "x" * 40], max_batch_tokens=25, max_batch_size=10), [(0, 2), (2, 3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
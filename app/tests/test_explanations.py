@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.pipeline.explanations import get_explanation_service
+from app.pipeline.risk_score import score_risks
+from app.schemas import Clause
+from app.tests.support import use_temp_storage
+
+
+class _StubChatServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.prompts: list[str] = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    server: _StubChatServer
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = request["messages"][0]["content"]
+        with self.server.lock:
+            self.server.prompts.append(prompt)
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        time.sleep(1.5 if "SLOW" in prompt else 0.05)
+        with self.server.lock:
+            self.server.active -= 1
+        clause = prompt.split("Clause: ", 1)[1].split("\n", 1)[0]
+        body = json.dumps(
+            {
+                "id": "stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request["model"],
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": f"note: {clause}"}, "finish_reason": "stop"}
+                ],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _clause(i: int, text: str) -> Clause:
+    return Clause(clause_id=f"C{i:03d}", title="t", category="General", text=text)
+
+
+class ExplanationTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = _StubChatServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        use_temp_storage(
+            self,
+            openai_api_key="test",
+            openai_base_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+            enable_llm_risk_explanations=True,
+            llm_explain_min_score=40,
+            llm_explain_concurrency=3,
+            llm_explain_wait_s=0.5,
+        )
+
+    def tearDown(self) -> None:
+        get_explanation_service().close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_explains_risky_clauses_concurrently_and_caches(self) -> None:
+        # Without a match every clause scores at least 35; breach language pushes it over 40.
+        clauses = [_clause(i, f"breach notice {i % 4}") for i in range(8)] + [_clause(8, "plain text")]
+        risks = score_risks(clauses, [])
+        notes = {r.clause_id: r.issues[-1] for r in risks if r.issues[-1].startswith("LLM note")}
+        self.assertEqual(len(notes), 8)
+        self.assertEqual(notes["C005"], "LLM note: note: breach notice 1")
+        self.assertEqual(len(self.server.prompts), 4)
+        self.assertLessEqual(self.server.max_active, 3)
+        self.assertGreater(self.server.max_active, 1)
+
+        again = score_risks(clauses, [])
+        self.assertEqual([r.issues for r in again], [r.issues for r in risks])
+        self.assertEqual(len(self.server.prompts), 4)
+
+    def test_late_explanations_do_not_delay_scoring(self) -> None:
+        clauses = [_clause(1, "breach notice SLOW"), _clause(2, "breach notice fast")]
+        started = time.monotonic()
+        risks = score_risks(clauses, [])
+        self.assertLess(time.monotonic() - started, 1.2)
+        self.assertFalse(risks[0].issues[-1].startswith("LLM note"))
+        self.assertEqual(risks[1].issues[-1], "LLM note: note: breach notice fast")
+        self.assertEqual(risks[0].risk_score, 60)
+
+        time.sleep(1.5)
+        risks = score_risks(clauses, [])
+        self.assertEqual(risks[0].issues[-1], "LLM note: note: breach notice SLOW")
+        self.assertEqual(len(self.server.prompts), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
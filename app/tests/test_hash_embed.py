@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import hashlib
+import unittest
+
+import numpy as np
+
+from app.utils.hash_embed import HashEmbedder
+
+
+def _legacy_hash_embedding(text: str, dim: int = 128) -> list[float]:
+    vec = [0.0] * dim
+    for token in text.lower().split():
+        h = int(hashlib.sha256(token.encode("utf-8")).hexdigest(), 16)
+        idx = h % dim
+        sign = -1.0 if (h >> 8) % 2 else 1.0
+        vec[idx] += sign
+    norm = sum(v * v for v in vec) ** 0.5
+    if norm == 0:
+        return vec
+    return [v / norm for v in vec]
+
+
+TEXTS = [
+    "Processor shall notify the Controller of any personal data breach without undue delay.",
+    "",
+    "   ",
+    "Data data DATA retention retention",
+    "Sous-traitant: données à caractère personnel",
+]
+
+
+class HashEmbedderTests(unittest.TestCase):
+    def test_matches_legacy_vectors_exactly(self) -> None:
+        for dim in (128, 7, 384):
+            vectors = HashEmbedder(dim=dim).embed(TEXTS, dtype=np.float64)
+            self.assertEqual(vectors.tolist(), [_legacy_hash_embedding(t, dim) for t in TEXTS])
+
+    def test_float32_output_and_token_cache(self) -> None:
+        embedder = HashEmbedder(dim=64, cache_size=8)
+        vectors = embedder.embed(TEXTS)
+        self.assertEqual(vectors.dtype, np.float32)
+        self.assertEqual(vectors.shape, (len(TEXTS), 64))
+        embedder.embed(TEXTS)
+        self.assertGreater(embedder.cache_info()["hits"], 0)
+        self.assertLessEqual(embedder.cache_info()["size"], 8)
+
+    def test_cache_smaller_than_working_set(self) -> None:
+        embedder = HashEmbedder(dim=16, cache_size=3)
+        exact = HashEmbedder(dim=16, cache_size=0)
+        embedder.embed(["x y z"])
+        # The batch hits every cached token, so making room for "w" evicts one it needs.
+        self.assertEqual(embedder.embed(["x y z w"]).tolist(), exact.embed(["x y z w"]).tolist())
+        self.assertEqual(embedder.embed(TEXTS).tolist(), exact.embed(TEXTS).tolist())
+        self.assertLessEqual(embedder.cache_info()["size"], 3)
+
+    def test_ngrams_add_features(self) -> None:
+        uni = HashEmbedder(dim=256).embed(["data breach notice"])
+        bi = HashEmbedder(dim=256, ngrams=2).embed(["data breach notice"])
+        self.assertFalse(np.allclose(uni, bi))
+        self.assertEqual(HashEmbedder(dim=256, ngrams=2).backend_id, "hash:256:ng2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from app.benchmarks.bench_ann import clustered_vectors
+from app.config import override_settings, settings
+from app.pipeline.fingerprint import pipeline_config
+from app.pipeline.rag_match import FallbackIndex, load_fallback_index
+from app.rag import build_index
+from app.rag.index_store import index_files, normalize_rows
+from app.rag.ivf import train_ivf
+from app.tests.support import override_for_test
+
+
+def _index(corpus: np.ndarray, lists: int) -> FallbackIndex:
+    size = len(corpus)
+    return FallbackIndex(
+        embeddings=corpus, documents=[""] * size, articles=[""] * size, topics=[""] * size, ivf=train_ivf(corpus, lists)
+    )
+
+
+class IVFSearchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.corpus = normalize_rows(clustered_vectors(3000, 32, clusters=60, spread=0.3, seed=1))
+        self.queries = normalize_rows(self.corpus[::37] + 0.1 * np.random.default_rng(2).standard_normal((82, 32)))
+
+    def test_probing_every_list_is_exact(self) -> None:
+        index = _index(self.corpus, 40)
+        exact_ids, exact_scores = index.search(self.queries, 5, nprobe=0)
+        ids, scores = index.ivf.search(index.embeddings, self.queries, 5, nprobe=index.ivf.nlist)
+        self.assertEqual(ids.tolist(), exact_ids.tolist())
+        np.testing.assert_allclose(scores, exact_scores, rtol=1e-5)
+
+    def test_recall_grows_with_nprobe(self) -> None:
+        index = _index(self.corpus, 40)
+        exact_ids, _ = index.search(self.queries, 5, nprobe=0)
+        recalls = []
+        for nprobe in (1, 4, 16):
+            ids, _ = index.search(self.queries, 5, nprobe=nprobe)
+            recalls.append(np.mean([len(set(a) & set(b)) / 5 for a, b in zip(ids.tolist(), exact_ids.tolist())]))
+        self.assertEqual(recalls, sorted(recalls))
+        self.assertGreater(recalls[1], 0.9)
+
+    def test_small_lists_still_return_top_k(self) -> None:
+        index = _index(self.corpus[:50], 50)
+        ids, _ = index.search(self.queries, 4, nprobe=1)
+        self.assertEqual(ids.shape, (len(self.queries), 4))
+        self.assertTrue(all(len(set(row)) == 4 for row in ids.tolist()))
+
+
+class IVFBuildTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        root = Path(self._tmp.name)
+        shutil.copytree("data/regulations/gdpr/source", root / "source")
+        self.manifest = root / "manifest.json"
+        source = {"regulation": "GDPR", "source_dir": "source", "chunk_size": 120, "overlap": 20}
+        self.manifest.write_text(json.dumps({"sources": [source]}), encoding="utf-8")
+        self.chunks = root / "chunks.jsonl"
+        override_for_test(self, chroma_dir=str(root / "index"), ann_min_rows=10, ann_lists=4, ann_nprobe=2)
+
+    def _update(self):
+        return build_index.update_index(manifest=self.manifest, chunks_path=self.chunks, workers=1)
+
+    def test_index_is_persisted_and_used(self) -> None:
+        result = self._update()
+        self.assertGreater(result.total, 10)
+        index = load_fallback_index(settings.chroma_path)
+        self.assertEqual((index.ivf.nlist, index.search_mode), (4, "ivf:2/4"))
+        self.assertEqual(sum(p.name.endswith(".ivf.npz") for p in index_files(settings.chroma_path)), 1)
+        self.assertTrue(pipeline_config()["index_version"].endswith(":ivf:2/4"))
+
+        # Changing the list count republishes even though the chunks did not change.
+        with override_settings(ann_lists=3):
+            self.assertTrue(self._update().published)
+            self.assertEqual(load_fallback_index(settings.chroma_path).ivf.nlist, 3)
+        with override_settings(ann_min_rows=0):
+            self.assertTrue(self._update().published)
+            index = load_fallback_index(settings.chroma_path)
+            self.assertEqual((index.ivf, index.search_mode), (None, "exact"))
+
+
+if __name__ == "__main__":
+    unittest.main()
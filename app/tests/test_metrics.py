@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import unittest
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.api.main import app
+from app.config import override_settings
+from app.pipeline import run_pipeline
+from app.tests.support import build_temp_index, use_temp_storage
+from app.utils.metrics import (
+    CLAUSES,
+    DOCUMENTS,
+    EMBEDDING_TEXTS,
+    FALLBACKS,
+    PAGES,
+    STAGE_SECONDS,
+    Counter,
+    Histogram,
+    _Metric,
+)
+
+
+SAMPLE_PDF = Path("data/samples/contracts/sample_vendor_agreement.pdf")
+
+
+class MetricTypeTests(unittest.TestCase):
+    def test_text_format(self) -> None:
+        counter = Counter("demo_total", "Demo counter.", ["kind"])
+        counter.inc(kind='a"b')
+        counter.inc(2, kind='a"b')
+        self.assertEqual(counter.render().splitlines()[-1], 'demo_total{kind="a\\"b"} 3')
+        with self.assertRaises(ValueError):
+            counter.inc(other="x")
+
+        histogram = Histogram("demo_seconds", "Demo histogram.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        lines = histogram.render().splitlines()[2:]
+        self.assertEqual(
+            lines,
+            [
+                'demo_seconds_bucket{le="0.1"} 1',
+                'demo_seconds_bucket{le="1"} 2',
+                'demo_seconds_bucket{le="+Inf"} 3',
+                "demo_seconds_sum 5.55",
+                "demo_seconds_count 3",
+            ],
+        )
+
+    def test_incomplete_metric_fails_when_created(self) -> None:
+        class NoSamples(_Metric):
+            kind = "gauge"
+
+        with self.assertRaises(TypeError):
+            NoSamples("demo_gauge", "Demo gauge.")
+
+
+class PipelineMetricsTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        build_temp_index(cls)
+
+    def setUp(self) -> None:
+        self.root = use_temp_storage(self)
+
+    def test_run_records_stages_counts_and_report_timings(self) -> None:
+        before = (
+            DOCUMENTS.value(outcome="analyzed"),
+            DOCUMENTS.value(outcome="cached"),
+            PAGES.value(),
+            CLAUSES.value(source="fresh"),
+            EMBEDDING_TEXTS.value(backend="hash"),
+            FALLBACKS.value(event="hash_embeddings"),
+            STAGE_SECONDS.count(stage="match"),
+            STAGE_SECONDS.count(stage="save"),
+        )
+        with override_settings(openai_api_key=""):
+            report = run_pipeline.analyze_document(str(SAMPLE_PDF))
+            run_pipeline.run(str(SAMPLE_PDF))
+        after = (
+            DOCUMENTS.value(outcome="analyzed"),
+            DOCUMENTS.value(outcome="cached"),
+            PAGES.value(),
+            CLAUSES.value(source="fresh"),
+            EMBEDDING_TEXTS.value(backend="hash"),
+            FALLBACKS.value(event="hash_embeddings"),
+            STAGE_SECONDS.count(stage="match"),
+            STAGE_SECONDS.count(stage="save"),
+        )
+        analyzed, cached, pages, fresh, hashed, hash_fallbacks, match_runs, saves = (b - a for a, b in zip(before, after))
+        # analyze_document() does not save, so run() analyses again, with every clause served by the store.
+        self.assertEqual((analyzed, cached, fresh, match_runs, saves), (2, 0, len(report.clauses), 2, 1))
+        self.assertTrue(pages > 0 and pages % 2 == 0)
+        self.assertGreaterEqual(hashed, len(report.clauses))
+        self.assertGreaterEqual(hash_fallbacks, 1)
+
+        self.assertEqual(set(report.timings), {"pdf_text", "segment", "dedupe", "match", "score", "fixes", "diff", "total"})
+        self.assertGreaterEqual(report.timings["total"], report.timings["match"])
+        self.assertEqual(report.to_dict()["timings"], report.timings)
+
+    def test_metrics_endpoint(self) -> None:
+        FALLBACKS.inc(event="test_event")
+        response = TestClient(app).get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn('complai_fallback_events_total{event="test_event"}', response.text)
+        self.assertIn("# TYPE complai_stage_seconds histogram", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
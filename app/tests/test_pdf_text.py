@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import io
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.benchmarks.synthetic import write_text_pdf
+from app.config import override_settings
+from app.utils import pdf_text
+
+
+class _SlowPage:
+    def extract_text(self) -> str:
+        time.sleep(5)
+        return "never"
+
+
+class _GuardedSlowPage:
+    # Like pypdf, which wraps much of its parsing in broad exception handlers.
+    def __init__(self, catch: type[BaseException]) -> None:
+        self.catch = catch
+
+    def extract_text(self) -> str:
+        try:
+            time.sleep(5)
+        except self.catch:
+            pass
+        return "late"
+
+
+class PdfTextTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+
+    def test_parallel_pages_match_sequential_order(self) -> None:
+        pages = [f"{i}. Section {i}\nThe processor shall keep data (page {i}) secure." for i in range(1, 21)]
+        path = write_text_pdf(self.dir / "doc.pdf", pages)
+        sequential = list(pdf_text.iter_pdf_pages(path, workers=1))
+        with override_settings(pdf_parallel_min_pages=4, pdf_pages_per_task=3):
+            parallel = list(pdf_text.iter_pdf_pages(path, workers=2))
+        self.assertEqual([n for n, _ in sequential], list(range(1, 21)))
+        self.assertEqual(parallel, sequential)
+        self.assertIn("Section 7", sequential[6][1])
+
+    def test_bytes_and_streams_extract_like_paths(self) -> None:
+        pages = [f"{i}. Section {i}\nThe processor shall keep data (page {i}) secure." for i in range(1, 9)]
+        path = write_text_pdf(self.dir / "doc.pdf", pages)
+        expected = list(pdf_text.iter_pdf_pages(path, workers=1))
+        data = path.read_bytes()
+        self.assertEqual(list(pdf_text.iter_pdf_pages(data, workers=1)), expected)
+        self.assertEqual(list(pdf_text.iter_pdf_pages(memoryview(bytearray(data)), workers=1)), expected)
+        with path.open("rb") as fh:
+            fh.read(10)
+            self.assertEqual(list(pdf_text.iter_pdf_pages(fh, workers=1)), expected)
+
+        # Streams that need worker processes reach them through shared memory, never a temp file.
+        spilled = AssertionError("spilled to disk")
+        with override_settings(pdf_parallel_min_pages=4, pdf_pages_per_task=3), mock.patch(
+            "tempfile.NamedTemporaryFile", side_effect=spilled
+        ), mock.patch("tempfile.mkstemp", side_effect=spilled):
+            self.assertEqual(list(pdf_text.iter_pdf_pages(io.BytesIO(data), workers=2)), expected)
+            self.assertEqual(list(pdf_text.iter_pdf_pages(data, workers=2)), expected)
+
+        raw = b"Not a pdf\r\n\r\nData  \t retention"
+        self.assertEqual(list(pdf_text.iter_pdf_pages(raw)), [(0, "Not a pdf\n\nData retention")])
+        with self.assertRaises(ValueError):
+            list(pdf_text.iter_pdf_pages(b" \r\n\t "))
+
+    def test_slow_page_is_cut_off(self) -> None:
+        started = time.perf_counter()
+        self.assertEqual(pdf_text._extract_page(_SlowPage(), 0.2), "")
+        self.assertLess(time.perf_counter() - started, 2)
+
+    def test_page_timeout_survives_broad_exception_handlers(self) -> None:
+        for catch in (Exception, BaseException):
+            started = time.perf_counter()
+            self.assertEqual(pdf_text._extract_page(_GuardedSlowPage(catch), 0.2), "")
+            self.assertLess(time.perf_counter() - started, 2)
+
+    def test_page_timeout_off_the_main_thread_uses_worker_processes(self) -> None:
+        pages = [f"{i}. Section {i}\nThe processor shall keep data (page {i}) secure." for i in range(1, 4)]
+        path = write_text_pdf(self.dir / "doc.pdf", pages)
+        expected = list(pdf_text.iter_pdf_pages(path, workers=1))
+        results: dict[float, list] = {}
+
+        def extract(timeout_s: float) -> None:
+            with mock.patch.object(pdf_text, "_iter_pages_parallel", wraps=pdf_text._iter_pages_parallel) as spy:
+                results[timeout_s] = [list(pdf_text.iter_pdf_pages(path, workers=1, page_timeout_s=timeout_s)), spy.called]
+
+        for timeout_s in (5.0, 0.0):
+            thread = threading.Thread(target=extract, args=(timeout_s,))
+            thread.start()
+            thread.join()
+        # Far below PDF_PARALLEL_MIN_PAGES, yet a worker process enforces the limit; without one, no pool.
+        self.assertEqual(results[5.0], [expected, True])
+        self.assertEqual(results[0.0], [expected, False])
+
+    def test_raw_fallback_streams_in_chunks(self) -> None:
+        path = self.dir / "broken.pdf"
+        path.write_bytes(b"\n  Not a pdf\r\n\r\n\r\n\r\nData  \t retention" + b" " * 50 + b"\n\n\n\nend \n\n")
+        with mock.patch.object(pdf_text, "_RAW_CHUNK_BYTES", 7):
+            pieces = list(pdf_text.iter_pdf_pages(path))
+            text = list(pdf_text.iter_pdf_text(path))
+        # Never more than a chunk (plus the whitespace carried over) per piece, all for page 0.
+        self.assertGreater(len(pieces), 3)
+        self.assertEqual({n for n, _ in pieces}, {0})
+        self.assertTrue(all(len(t) <= 7 + 60 for _, t in pieces))
+        self.assertEqual("".join(t for _, t in pieces), "Not a pdf\n\nData retention \n\nend")
+        self.assertEqual("".join(text), "Not a pdf\n\nData retention \n\nend")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+import numpy as np
+
+from app.pipeline.rag_match import FallbackIndex, load_fallback_index
+from app.rag.index_store import normalize_rows, read_binary_index, write_binary_index
+
+
+class FallbackIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(3)
+        self.corpus = rng.standard_normal((50, 16)).astype(np.float32)
+        self.queries = rng.standard_normal((7, 16)).astype(np.float32)
+        self.index = FallbackIndex(
+            embeddings=normalize_rows(self.corpus),
+            documents=[f"doc {i}" for i in range(50)],
+            articles=["Article 5"] * 50,
+            topics=["article-5"] * 50,
+        )
+
+    def test_search_matches_brute_force_ranking(self) -> None:
+        ids, scores = self.index.search(self.queries, 4)
+        exact = np.clip(normalize_rows(self.queries) @ normalize_rows(self.corpus).T, 0.0, 1.0)
+        for row in range(len(self.queries)):
+            expected = np.argsort(-exact[row], kind="stable")[:4]
+            self.assertEqual(ids[row].tolist(), expected.tolist())
+            np.testing.assert_allclose(scores[row], exact[row][expected], rtol=1e-5)
+
+    def test_ties_keep_corpus_order(self) -> None:
+        index = FallbackIndex(
+            embeddings=normalize_rows(np.array([[0.0, 1.0], [1.0, 0.0], [1.0, 0.0], [1.0, 0.0]])),
+            documents=["a", "b", "c", "d"],
+            articles=["Article 5"] * 4,
+            topics=["article-5"] * 4,
+        )
+        ids, _ = index.search(np.array([[1.0, 0.0]], dtype=np.float32), 2)
+        self.assertEqual(ids[0].tolist(), [1, 2])
+
+    def test_dimension_mismatch_raises(self) -> None:
+        with self.assertRaises(ValueError):
+            self.index.search(np.ones((1, 8), dtype=np.float32), 3)
+
+
+class BinaryIndexTests(unittest.TestCase):
+    def test_round_trip_is_memory_mapped_and_normalized(self) -> None:
+        embeddings = np.array([[3.0, 4.0], [0.0, 0.0], [1.0, 0.0]])
+        metadatas = [{"article": f"Article {i}", "topic": f"t{i}", "source": "s"} for i in range(3)]
+        docs = ["first", "zweit\u00e4", ""]
+        with tempfile.TemporaryDirectory() as tmp:
+            write_binary_index(tmp, ["a", "b", "c"], docs, metadatas, embeddings)
+            stored = read_binary_index(tmp)
+            self.assertIsInstance(stored.embeddings, np.memmap)
+            np.testing.assert_allclose(stored.embeddings[0], [0.6, 0.8], rtol=1e-6)
+            self.assertEqual(list(stored.documents), docs)
+            self.assertEqual(stored.articles, ["Article 0", "Article 1", "Article 2"])
+
+            index = load_fallback_index(tmp)
+            self.assertIs(index, load_fallback_index(tmp))
+            self.assertEqual(index.size, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import os
+import stat
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from app.config import override_settings, settings
+from app.pipeline import report as report_module
+from app.pipeline import run_pipeline
+from app.pipeline.report import create_report, serialize_report
+from app.tests.support import build_temp_index, use_temp_storage
+from app.utils.metrics import FALLBACKS
+
+
+SAMPLE_PDF = Path("data/samples/contracts/sample_vendor_agreement.pdf")
+
+
+class ReportCacheTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        build_temp_index(cls)
+
+    def setUp(self) -> None:
+        self.root = use_temp_storage(self)
+
+    def _run_counting(self, **kwargs) -> tuple[str, int]:
+        with mock.patch.object(
+            run_pipeline, "match_clauses_to_gdpr", wraps=run_pipeline.match_clauses_to_gdpr
+        ) as spy:
+            path = run_pipeline.run(str(SAMPLE_PDF), **kwargs)
+        return path, spy.call_count
+
+    def test_second_run_reuses_fresh_report(self) -> None:
+        first, calls = self._run_counting()
+        self.assertEqual(calls, 1)
+        second, calls = self._run_counting()
+        self.assertEqual((second, calls), (first, 0))
+
+    def test_report_file_mode_follows_umask(self) -> None:
+        path, _ = self._run_counting()
+        probe = self.root / "probe"
+        probe.write_text("", encoding="utf-8")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), stat.S_IMODE(probe.stat().st_mode))
+
+    def test_failed_background_write_is_logged_and_counted(self) -> None:
+        report = create_report("x.pdf", "0123456789abcdef", [], [], [], [])
+        blocked = self.root / "not-a-dir"
+        blocked.write_text("", encoding="utf-8")
+        before = FALLBACKS.value(event="report_write_failed")
+        with self.assertLogs("app.pipeline.report", "ERROR") as logs:
+            future = report_module.save_report_bytes_async(serialize_report(report), report, blocked)
+            with self.assertRaises(OSError):
+                future.result(timeout=10)
+            # Callbacks run on the writer thread once the task is settled; the next task waits for them.
+            report_module._writer.submit(lambda: None).result(timeout=10)
+        self.assertEqual(FALLBACKS.value(event="report_write_failed"), before + 1)
+        self.assertIn("Background report write failed", logs.output[0])
+
+    def test_force_and_config_change_invalidate(self) -> None:
+        self._run_counting()
+        _, calls = self._run_counting(force=True)
+        self.assertEqual(calls, 1)
+        with override_settings(clause_top_k=settings.clause_top_k + 1):
+            _, calls = self._run_counting()
+        self.assertEqual(calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
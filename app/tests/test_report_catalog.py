@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.pipeline.report import create_report, save_report
+from app.pipeline.report_catalog import ReportCatalog
+from app.schemas import Clause, RiskResult
+
+
+def _report(doc_hash: str, scores: list[int]):
+    clauses = [Clause(clause_id=f"C{i:03d}", title="t", category="General", text="x") for i in range(len(scores))]
+    risks = [
+        RiskResult(
+            clause_id=c.clause_id,
+            risk_score=s,
+            issues=[],
+            severity="high" if s >= 70 else "medium" if s >= 40 else "low",
+        )
+        for c, s in zip(clauses, scores)
+    ]
+    return create_report(f"{doc_hash}.pdf", doc_hash, clauses, [], risks, [])
+
+
+class ReportCatalogTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.dir = Path(self._tmp.name)
+        for i in range(7):
+            save_report(_report(f"doc{i}", [20 + i * 5, 90 if i % 3 == 0 else 10]), self.dir)
+
+    def test_cursor_pagination_visits_every_report_once(self) -> None:
+        catalog = ReportCatalog(self.dir)
+        seen, cursor = [], None
+        while True:
+            page, cursor = catalog.query(limit=3, cursor=cursor, sort="risk", order="asc")
+            seen.extend(row["id"] for row in page)
+            if cursor is None:
+                break
+        self.assertEqual(sorted(seen), [f"doc{i}" for i in range(7)])
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_severity_filter_and_rebuild(self) -> None:
+        catalog = ReportCatalog(self.dir)
+        high, _ = catalog.query(severity="high")
+        self.assertEqual(sorted(r["id"] for r in high), ["doc0", "doc3", "doc6"])
+        self.assertEqual(high[0]["source_file"], f"{high[0]['id']}.pdf")
+
+        (self.dir / "doc0.json").unlink()
+        self.assertEqual(catalog.rebuild(), 6)
+        self.assertEqual(len(catalog.query(limit=100)[0]), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
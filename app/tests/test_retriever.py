@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+from fastapi.testclient import TestClient
+
+from app.api.main import app
+from app.pipeline.rag_match import get_retriever
+from app.rag.index_store import write_binary_index
+from app.schemas import Clause
+from app.tests.support import override_for_test
+from app.utils.embeddings import embed_array, embedding_backend_id
+
+
+def _write_index(directory: str, docs: list[str]) -> None:
+    write_binary_index(
+        directory,
+        [f"chunk_{i}" for i in range(len(docs))],
+        docs,
+        [{"article": f"Article {i + 1}", "topic": "t", "source": "s"} for i in range(len(docs))],
+        embed_array(docs),
+        extra_meta={"embedding_model": embedding_backend_id(), "index_version": f"v{len(docs)}"},
+    )
+
+
+class RetrieverTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        override_for_test(self, chroma_dir=self._tmp.name)
+
+    def test_opens_once_and_refreshes_on_new_index(self) -> None:
+        _write_index(self._tmp.name, ["data breach notification", "records of processing"])
+        retriever = get_retriever()
+        clause = Clause(clause_id="C001", title="t", category="General", text="breach notification")
+        for _ in range(3):
+            matches = retriever.match([clause], 1)
+        self.assertIs(get_retriever(), retriever)
+        self.assertEqual((retriever.refreshes, matches[0].article), (1, "Article 1"))
+
+        _write_index(self._tmp.name, ["unrelated", "cookie banner", "breach notification within 72 hours"])
+        matches = retriever.match([clause], 1)
+        self.assertEqual(retriever.refreshes, 2)
+        self.assertEqual(matches[0].article, "Article 3")
+        self.assertEqual(retriever.status()["index_version"], "v3")
+
+    def test_ready_endpoint_reports_backend_and_size(self) -> None:
+        with TestClient(app) as client:
+            response = client.get("/ready")
+            self.assertEqual(response.status_code, 503)
+            self.assertFalse(response.json()["ready"])
+
+            _write_index(self._tmp.name, ["a", "b", "c", "d"])
+            response = client.get("/ready")
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual((body["ready"], body["backend"], body["index_size"]), (True, "fallback", 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
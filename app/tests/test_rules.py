@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+
+from app.config import override_settings
+from app.pipeline.fingerprint import pipeline_config
+from app.pipeline.risk_score import score_risks
+from app.pipeline.rules import TermMatcher, get_ruleset, load_ruleset
+from app.schemas import Clause, GDPRMatch
+
+
+_KEYWORDS = {
+    "security": "Security",
+    "breach": "Breach Notification",
+    "processor": "Processor Obligations",
+    "subprocessor": "Subprocessor",
+    "retention": "Data Retention",
+    "transfer": "International Transfer",
+    "legal basis": "Legal Basis",
+    "consent": "Consent",
+    "rights": "Data Subject Rights",
+    "audit": "Audit",
+}
+_HIGH_RISK = ("sell", "share with any third party", "unlimited", "without notice")
+_LOW_CONF = ("reasonable", "best effort", "as needed", "commercially reasonable")
+_VOCAB = [*_KEYWORDS, *_HIGH_RISK, *_LOW_CONF, "72", "encryption", "access control", "data", "the", "Sub", "SELL"]
+
+
+def _legacy_category(text: str) -> str:
+    lower = text.lower()
+    for key, category in _KEYWORDS.items():
+        if key in lower:
+            return category
+    return "General"
+
+
+def _legacy_score(text: str, similarity: float | None) -> tuple[int, list[str]]:
+    text = text.lower()
+    score, issues = 20, []
+    if "breach" in text and "72" not in text:
+        score += 25
+        issues.append("Breach clause does not mention 72-hour notification window (GDPR Art. 33).")
+    if "security" in text and "encryption" not in text and "access control" not in text:
+        score += 20
+        issues.append("Security obligations may be too vague for GDPR Art. 32.")
+    if any(term in text for term in _HIGH_RISK):
+        score += 20
+        issues.append("Overly broad data use/sharing language detected.")
+    if any(term in text for term in _LOW_CONF):
+        score += 10
+        issues.append("Ambiguous wording may reduce enforceability.")
+    if similarity is None or similarity < 0.25:
+        score += 15
+        issues.append("Weak GDPR alignment based on semantic match.")
+    return min(100, score), issues
+
+
+class RuleEngineTests(unittest.TestCase):
+    def test_term_matcher_finds_overlapping_hits(self) -> None:
+        matcher = TermMatcher(["processor", "subprocessor", "reasonable", "commercially reasonable", "sub"])
+        self.assertEqual(
+            matcher.hits("a subprocessor acts commercially reasonable"),
+            {"processor", "subprocessor", "sub", "reasonable", "commercially reasonable"},
+        )
+        texts = ["no hits here", "subprocessor", "", "reasonable sub"]
+        self.assertEqual(matcher.hits_many(texts), [matcher.hits(t) for t in texts])
+
+    def test_default_rules_match_legacy_scoring(self) -> None:
+        rng = random.Random(1)
+        clauses, matches, expected = [], [], []
+        for i in range(300):
+            text = " ".join(rng.choice(_VOCAB) for _ in range(rng.randint(0, 8))) or "empty"
+            clause_id = f"C{i:03d}"
+            clauses.append(Clause(clause_id=clause_id, title="t", category="General", text=text))
+            similarity = rng.choice([None, 0.1, 0.25, 0.9])
+            if similarity is not None:
+                matches.append(GDPRMatch(clause_id, "Article 1", "topic", "snippet", similarity))
+            expected.append(_legacy_score(text, similarity))
+            self.assertEqual(get_ruleset().categorize(text), _legacy_category(text), text)
+
+        for risk, (score, issues) in zip(score_risks(clauses, matches), expected):
+            self.assertEqual(risk.risk_score, score)
+            self.assertEqual(risk.issues, issues or ["No significant GDPR risks detected by MVP rule set."])
+
+    def test_custom_rule_file_changes_scoring_and_fingerprint(self) -> None:
+        rules = {
+            "version": "custom",
+            "categories": [{"term": "cookie", "category": "Cookies"}],
+            "rules": [{"id": "cookies", "any": ["Cookie"], "score": 60, "issue": "Cookie use."}],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rules.json"
+            path.write_text(json.dumps(rules), encoding="utf-8")
+            before = pipeline_config()["ruleset_version"]
+            with override_settings(rules_path=str(path)):
+                clause = Clause(clause_id="C001", title="t", category="General", text="We set a COOKIE.")
+                risk = score_risks([clause], [GDPRMatch("C001", "Article 1", "t", "s", 0.9)])[0]
+                self.assertEqual((risk.risk_score, risk.severity, risk.issues), (80, "high", ["Cookie use."]))
+                self.assertEqual(get_ruleset().categorize(clause.text), "Cookies")
+                self.assertNotEqual(pipeline_config()["ruleset_version"], before)
+
+            path.write_text(json.dumps({"rules": [{"id": "bad", "score": 1, "issue": "x"}]}), encoding="utf-8")
+            with self.assertRaises(ValueError):
+                load_ruleset(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,7 +8,7 @@ from app.pipeline.rag_match import match_clauses_to_gdpr
 from app.pipeline.report import create_report
 from app.pipeline.risk_score import score_risks
 from app.pipeline.suggest_fixes import suggest_fixes
-from app.rag.build_index import build_index
+from app.tests.support import build_temp_index
 from app.utils.hashing import sha256_text
 from app.utils.pdf_text import extract_pdf_text
 
@@ -19,7 +19,7 @@ SAMPLE_PDF = Path("data/samples/contracts/sample_vendor_agreement.pdf")
 class SmokeTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls) -> None:
-        build_index()
+        build_temp_index(cls)
         raw_text = extract_pdf_text(SAMPLE_PDF)
         cls.clauses = extract_clauses(raw_text)
         cls.matches = match_clauses_to_gdpr(cls.clauses)
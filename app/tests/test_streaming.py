@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.api import jobs
+from app.api.jobs import InProcessJobQueue
+from app.api.main import app
+from app.benchmarks.synthetic import write_synthetic_contract
+from app.pipeline import run_pipeline
+from app.tests.support import build_temp_index, use_temp_storage
+
+
+def _without_timings(report: dict) -> dict:
+    return {k: v for k, v in report.items() if k != "timings"}
+
+
+class StreamingTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        build_temp_index(cls)
+
+    def setUp(self) -> None:
+        root = use_temp_storage(self, stream_batch_size=4)
+        patcher = mock.patch.object(jobs, "_queue", InProcessJobQueue(max_workers=1, max_queue=2))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pdf = write_synthetic_contract(
+            root / "contract.pdf", pages=3, clauses=30, heading_style="mixed", duplicate_rate=0.3, seed=2
+        )
+
+    def test_batched_events_build_the_same_report(self) -> None:
+        events: list[tuple[str, dict]] = []
+        streamed = run_pipeline.analyze_document(
+            str(self.pdf), force=True, emit=lambda event, data: events.append((event, data)), batch_size=3
+        )
+        whole = run_pipeline.analyze_document(str(self.pdf), force=True)
+
+        self.assertEqual(_without_timings(streamed.to_dict()), _without_timings(whole.to_dict()))
+        self.assertTrue(whole.duplicate_groups)
+        self.assertEqual(set(streamed.timings), set(whole.timings))
+        self.assertEqual([e for e, _ in events], ["document"] + ["clause"] * 30 + ["summary"])
+        self.assertEqual(events[0][1]["analysed_clauses"], 30 - sum(len(g.members) - 1 for g in whole.duplicate_groups))
+        clause_events = [data for event, data in events if event == "clause"]
+        self.assertEqual([d["clause"]["clause_id"] for d in clause_events], [c.clause_id for c in whole.clauses])
+        self.assertEqual([d["risk"] for d in clause_events], [r.to_dict() for r in whole.risk_scores])
+        self.assertEqual(
+            [m for d in clause_events for m in d["matches"]], [m.to_dict() for m in whole.gdpr_matches]
+        )
+        self.assertEqual([d["fix"] for d in clause_events if d["fix"]], [f.to_dict() for f in whole.suggested_fixes])
+        self.assertEqual(events[-1][1]["executive_summary"], whole.executive_summary.to_dict())
+
+    def test_ndjson_stream_persists_the_regular_report(self) -> None:
+        client = TestClient(app)
+        with self.pdf.open("rb") as fh:
+            response = client.post("/analyze/stream", files={"file": ("contract.pdf", fh, "application/pdf")})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+        events = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([e["event"] for e in events[:2]], ["job", "document"])
+        self.assertEqual(events[-1]["event"], "summary")
+        self.assertEqual(sum(e["event"] == "clause" for e in events), 30)
+
+        report_id = events[-1]["report_id"]
+        deadline = time.time() + 10
+        stored = client.get(f"/reports/{report_id}")
+        while stored.status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+            stored = client.get(f"/reports/{report_id}")
+        with self.pdf.open("rb") as fh:
+            regular = client.post(
+                "/analyze?wait=true&force=true", files={"file": ("contract.pdf", fh, "application/pdf")}
+            ).json()
+        self.assertEqual(_without_timings(stored.json()), _without_timings(regular))
+        self.assertEqual(client.get(f"/jobs/{events[0]['job_id']}").json()["status"], "succeeded")
+
+    def test_sse_stream_and_errors(self) -> None:
+        client = TestClient(app)
+        with self.pdf.open("rb") as fh:
+            response = client.post(
+                "/analyze/stream",
+                files={"file": ("contract.pdf", fh, "application/pdf")},
+                headers={"Accept": "text/event-stream"},
+            )
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        frames = [frame.split("\n") for frame in response.text.strip().split("\n\n")]
+        self.assertEqual(frames[1][0], "event: document")
+        self.assertEqual(json.loads(frames[1][1][len("data: ") :])["total_clauses"], 30)
+        self.assertEqual(frames[-1][0], "event: summary")
+
+        with mock.patch.object(run_pipeline, "score_risks", side_effect=RuntimeError("boom")):
+            with self.pdf.open("rb") as fh:
+                failed = client.post(
+                    "/analyze/stream?force=true", files={"file": ("contract.pdf", fh, "application/pdf")}
+                )
+        last = json.loads(failed.text.splitlines()[-1])
+        self.assertEqual(last, {"event": "error", "detail": "Analysis failed: boom"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import random
+import unittest
+from pathlib import Path
+
+from app.benchmarks.bench_segmenter import legacy_clause_blocks, legacy_normalize_text, legacy_split_blocks
+from app.benchmarks.synthetic import synthetic_contract_text
+from app.pipeline.extract_clauses import extract_clauses, iter_clauses
+from app.utils.hashing import StrippedTextHash, sha256_text
+from app.utils.pdf_text import iter_pdf_text
+from app.utils.text_clean import ClauseSegmenter, LineNormalizer, normalize_text, split_into_clause_like_blocks
+
+
+GOLDEN = Path(__file__).parent / "golden" / "sample_contract_clauses.json"
+SAMPLES = Path("data/samples/contracts")
+_ALPHABET = ["a", "b", "Z", " ", "\t", "\n", "\r", "\r\n", "\u00a0", "\x0c", "\u2028", "\x1e", "\x85", ".", ":", "1", "/"]
+_FRAGMENTS = ["\n\n\n", "1. Security", "Data Retention:", "TRY GROK", "Web", "12/31/24, 9:05 PM", "https://x.io/a", "3/7"]
+
+
+def _random_text(rng: random.Random, size: int) -> str:
+    out = []
+    for _ in range(size):
+        out.append(rng.choice(_FRAGMENTS) if rng.random() < 0.1 else rng.choice(_ALPHABET))
+    return "".join(out)
+
+
+def _random_pieces(rng: random.Random, text: str) -> list[str]:
+    # Repeated cuts yield empty pieces, e.g. between the "\r" and "\n" of a split CRLF.
+    cuts = sorted(rng.choices(range(len(text) + 1), k=rng.randint(0, 12)))
+    return [text[a:b] for a, b in zip([0, *cuts], [*cuts, len(text)])]
+
+
+class TextCleanTests(unittest.TestCase):
+    def test_sample_contracts_match_golden_clauses(self) -> None:
+        golden = json.loads(GOLDEN.read_text(encoding="utf-8"))
+        for name, expected in golden.items():
+            path = SAMPLES / name
+            streamed = [[c.clause_id, c.title, c.category, c.text] for c in iter_clauses(iter_pdf_text(path))]
+            self.assertEqual(streamed, expected, name)
+
+    def test_matches_legacy_on_random_text_and_piece_splits(self) -> None:
+        rng = random.Random(3)
+        for _ in range(400):
+            text = _random_text(rng, rng.randint(0, 300))
+            normalized = legacy_normalize_text(text)
+            self.assertEqual(normalize_text(text), normalized)
+            for min_chars in (1, 10, 60):
+                self.assertEqual(split_into_clause_like_blocks(normalized, min_chars), legacy_split_blocks(normalized, min_chars))
+
+            pieces = _random_pieces(rng, text)
+            normalizer = LineNormalizer()
+            lines = [line for piece in pieces for line in normalizer.feed(piece)] + normalizer.close()
+            self.assertEqual("".join(sep + line for sep, line in lines).strip(), normalized)
+
+            segmenter = ClauseSegmenter(min_chars=10, whole_text_fallback=True)
+            blocks = [block for piece in pieces for block in segmenter.feed(piece)] + segmenter.close()
+            self.assertEqual(blocks, legacy_split_blocks(normalized, 10) or [normalized])
+
+    def test_crlf_split_across_pieces(self) -> None:
+        text = "ab\r\n\nsecond paragraph\r\nthird\r"
+        for pieces in (["ab\r", "\n", "\nsecond paragraph\r", "", "\nthird\r"], ["ab\r", "", "\n\nsecond", " paragraph\r\nthird\r"]):
+            normalizer = LineNormalizer()
+            lines = [line for piece in pieces for line in normalizer.feed(piece)] + normalizer.close()
+            self.assertEqual("".join(sep + line for sep, line in lines).strip(), normalize_text(text))
+
+    def test_synthetic_contract_streams_identically(self) -> None:
+        text = synthetic_contract_text(200_000, seed=11)
+        expected = legacy_clause_blocks(text)
+        self.assertGreater(len(expected), 50)
+        pieces = [text[i : i + 4096] for i in range(0, len(text), 4096)]
+        self.assertEqual([c.text for c in iter_clauses(pieces)], expected)
+        self.assertEqual([c.text for c in extract_clauses(text)], expected)
+
+    def test_stripped_text_hash_matches_joined_text(self) -> None:
+        rng = random.Random(5)
+        for _ in range(200):
+            text = _random_text(rng, rng.randint(0, 80))
+            hasher = StrippedTextHash()
+            for piece in _random_pieces(rng, text):
+                hasher.update(piece)
+            self.assertEqual(hasher.hexdigest(), sha256_text(text.strip()))
+
+
+if __name__ == "__main__":
+    unittest.main()
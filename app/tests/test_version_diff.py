@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import json
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.api.main import app
+from app.benchmarks.synthetic import synthetic_contract_clauses, write_text_pdf
+from app.config import settings
+from app.pipeline import run_pipeline
+from app.tests.support import build_temp_index, use_temp_storage
+
+
+EXTRA = "Vendor shall also encrypt all backups and rotate the encryption keys every ninety days."
+NEW_CLAUSE = [
+    "13. Audit Rights",
+    "Customer may audit the processing of personal data once per year on thirty days written notice,",
+    "and vendor shall make available all information necessary to demonstrate compliance.",
+]
+
+BREACH = [
+    "13. Breach Notification",
+    "Vendor will notify Customer of any personal data breach without undue delay and in any event within 72 hours",
+    "after becoming aware of it. The notice shall describe the nature of the breach, the categories and approximate",
+    "number of data subjects and records concerned, the likely consequences of the breach, and the measures taken or",
+    "proposed to address it, including measures to mitigate its possible adverse effects. Vendor shall document every",
+    "breach, its effects and the remedial action taken, and keep that record available to the supervisory authority.",
+]
+
+
+def _write(path: Path, clauses: list[list[str]]) -> str:
+    write_text_pdf(path, ["\n".join(line for clause in clauses for line in clause)])
+    return str(path)
+
+
+class VersionDiffTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        build_temp_index(cls)
+
+    def setUp(self) -> None:
+        self.root = use_temp_storage(self)
+        self.v1 = synthetic_contract_clauses(12, "numbered", seed=5)
+        # v2: clause 2 gains a sentence, clause 6 is dropped and a new clause is appended.
+        self.v2 = [list(c) for c in self.v1]
+        self.v2[1] = self.v2[1] + [EXTRA]
+        del self.v2[5]
+        self.v2.append(NEW_CLAUSE)
+
+    def _run(self, name: str, clauses: list[list[str]], **kwargs) -> dict:
+        path = run_pipeline.run(_write(self.root / name, clauses), **kwargs)
+        return json.loads(Path(path).read_text(encoding="utf-8"))
+
+    def test_revision_reanalyses_only_new_clauses_and_reports_the_diff(self) -> None:
+        first = self._run("v1.pdf", self.v1)
+        self.assertIsNone(first["version_diff"])
+
+        with mock.patch.object(run_pipeline, "match_clauses_to_gdpr", wraps=run_pipeline.match_clauses_to_gdpr) as spy:
+            second = self._run("v2.pdf", self.v2)
+        matched = [c.clause_id for call in spy.call_args_list for c in call.args[0]]
+        self.assertLessEqual(len(matched), 2)
+
+        diff = second["version_diff"]
+        self.assertEqual(diff["previous_document"], first["document_hash"])
+        self.assertEqual(
+            (diff["unchanged"], diff["changed"], diff["added"], diff["removed"]), (len(self.v1) - 2, 1, 1, 1)
+        )
+        by_kind = {c["change"]: c for c in diff["changes"]}
+        self.assertEqual(by_kind["added"]["title"], "Audit Rights")
+        self.assertIsNone(by_kind["removed"]["risk_score"])
+        self.assertEqual(by_kind["removed"]["risk_delta"], -by_kind["removed"]["previous_risk_score"])
+        changed = by_kind["changed"]
+        self.assertGreaterEqual(changed["similarity"], settings.version_change_threshold)
+        self.assertEqual(changed["risk_delta"], changed["risk_score"] - changed["previous_risk_score"])
+        summary = (second["executive_summary"], first["executive_summary"])
+        self.assertEqual(diff["overall_risk_delta"], summary[0]["overall_risk_score"] - summary[1]["overall_risk_score"])
+
+        # v3 is diffed against v2, the saved version it shares the most clauses with.
+        v3 = self.v2[:-1] + [NEW_CLAUSE[:2]]
+        self.assertEqual(self._run("v3.pdf", v3)["version_diff"]["previous_document"], second["document_hash"])
+        # An explicitly named version wins, also for a report that is already cached.
+        again = self._run("v3.pdf", v3, previous=first["document_hash"])
+        self.assertEqual(again["version_diff"]["previous_document"], first["document_hash"])
+        with self.assertRaises(FileNotFoundError):
+            run_pipeline.run(str(self.root / "v3.pdf"), previous="0" * 16)
+
+    def test_edit_reusing_stored_matches_is_rescored(self) -> None:
+        first = self._run("v1.pdf", self.v1 + [BREACH])
+        # The edit keeps the clause a near match of the stored one, but drops the 72-hour window.
+        edited = [BREACH[0], BREACH[1].replace("72 hours", "30 days")] + BREACH[2:]
+        second = self._run("v2.pdf", self.v1 + [edited])
+
+        clause_id = second["clauses"][-1]["clause_id"]
+        self.assertIn(clause_id, [m for g in second["duplicate_groups"] if g["source"] == "store" for m in g["members"]])
+        risk = next(r for r in second["risk_scores"] if r["clause_id"] == clause_id)
+        before = next(r for r in first["risk_scores"] if r["clause_id"] == first["clauses"][-1]["clause_id"])
+        self.assertGreater(risk["risk_score"], before["risk_score"])
+        self.assertTrue(any("72-hour" in issue for issue in risk["issues"]))
+
+        diff = second["version_diff"]
+        self.assertEqual((diff["unchanged"], diff["changed"], diff["added"], diff["removed"]), (len(self.v1), 1, 0, 0))
+        self.assertEqual(diff["changes"][0]["risk_delta"], risk["risk_score"] - before["risk_score"])
+        self.assertGreater(diff["changes"][0]["risk_delta"], 0)
+
+    def test_api_previous_parameter(self) -> None:
+        first = self._run("v1.pdf", self.v1)
+        client = TestClient(app)
+        pdf = Path(_write(self.root / "v2.pdf", self.v2)).read_bytes()
+        response = client.post(
+            f"/analyze?wait=true&previous={first['document_hash']}", files={"file": ("v2.pdf", pdf, "application/pdf")}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["version_diff"]["previous_document"], first["document_hash"])
+        missing = client.post("/analyze?previous=" + "0" * 16, files={"file": ("v2.pdf", pdf, "application/pdf")})
+        self.assertEqual(missing.status_code, 404)
+        invalid = client.post("/analyze?previous=../x", files={"file": ("v2.pdf", pdf, "application/pdf")})
+        self.assertEqual(invalid.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
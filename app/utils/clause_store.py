@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from app.utils.minhash import MinHasher, similarity
+
+
+_KEYS_PER_QUERY = 500
+
+
+class ClauseStore:
+    # Analysed clauses per pipeline fingerprint: MinHash signature, LSH band keys and a JSON payload
+    # with the clause's results. Lookups return the most similar stored clause above a threshold.
+    # It also records which clause keys each analysed document contained, to find earlier versions.
+    def __init__(self, path: str | Path, hasher: MinHasher, max_entries: int = 200_000, max_documents: int = 10_000) -> None:
+        self.path = Path(path)
+        self.hasher = hasher
+        self.max_entries = max(1, max_entries)
+        self.max_documents = max(1, max_documents)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS clauses ("
+            "fingerprint TEXT NOT NULL, key TEXT NOT NULL, signature BLOB NOT NULL, payload TEXT NOT NULL, "
+            "last_used REAL NOT NULL, PRIMARY KEY (fingerprint, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS clauses_last_used ON clauses(last_used)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands (fingerprint TEXT NOT NULL, band TEXT NOT NULL, key TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_lookup ON bands(fingerprint, band)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands(fingerprint, key)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (document_hash TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS document_clauses ("
+            "key TEXT NOT NULL, document_hash TEXT NOT NULL, PRIMARY KEY (key, document_hash))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS document_clauses_document ON document_clauses(document_hash)")
+        self._conn.commit()
+
+    def get_many(self, fingerprint: str, keys: Sequence[str]) -> dict[str, dict]:
+        # Exact lookups by normalized clause key; cheaper than `lookup` for unchanged text.
+        found: dict[str, dict] = {}
+        now = time.time()
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), _KEYS_PER_QUERY):
+                chunk = unique[start : start + _KEYS_PER_QUERY]
+                rows = self._conn.execute(
+                    f"SELECT key, payload FROM clauses WHERE fingerprint = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [fingerprint, *chunk],
+                ).fetchall()
+                found.update((key, json.loads(payload)) for key, payload in rows)
+            self._conn.executemany(
+                "UPDATE clauses SET last_used = ? WHERE fingerprint = ? AND key = ?",
+                [(now, fingerprint, key) for key in found],
+            )
+            self._conn.commit()
+            self.hits += sum(1 for key in keys if key in found)
+        return found
+
+    def lookup(self, fingerprint: str, signatures: np.ndarray, threshold: float) -> dict[int, tuple[float, dict]]:
+        found: dict[int, tuple[float, dict]] = {}
+        with self._lock:
+            for i, signature in enumerate(signatures):
+                bands = self.hasher.band_keys(signature)
+                marks = ",".join("?" * len(bands))
+                rows = self._conn.execute(
+                    "SELECT c.key, c.signature, c.payload FROM clauses c WHERE c.fingerprint = ? AND c.key IN "
+                    f"(SELECT key FROM bands WHERE fingerprint = ? AND band IN ({marks}))",
+                    [fingerprint, fingerprint, *bands],
+                ).fetchall()
+                best: tuple[float, str, str] | None = None
+                for key, blob, payload in rows:
+                    score = similarity(signature, np.frombuffer(blob, dtype=np.uint64))
+                    if score >= threshold and (best is None or (score, key) > (best[0], best[1])):
+                        best = (score, key, payload)
+                if best is None:
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                found[i] = (best[0], json.loads(best[2]))
+                self._conn.execute(
+                    "UPDATE clauses SET last_used = ? WHERE fingerprint = ? AND key = ?", (time.time(), fingerprint, best[1])
+                )
+            self._conn.commit()
+        return found
+
+    def put_many(self, fingerprint: str, entries: Sequence[tuple[str, np.ndarray, dict]]) -> None:
+        now = time.time()
+        with self._lock:
+            for key, signature, payload in entries:
+                exists = self._conn.execute(
+                    "SELECT 1 FROM clauses WHERE fingerprint = ? AND key = ?", (fingerprint, key)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO clauses(fingerprint, key, signature, payload, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (fingerprint, key, np.ascontiguousarray(signature, dtype=np.uint64).tobytes(), json.dumps(payload), now),
+                )
+                if not exists:
+                    self._conn.executemany(
+                        "INSERT INTO bands(fingerprint, band, key) VALUES (?, ?, ?)",
+                        [(fingerprint, band, key) for band in self.hasher.band_keys(signature)],
+                    )
+            self._evict()
+            self._conn.commit()
+
+    def add_document(self, document_hash: str, keys: Sequence[str]) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM document_clauses WHERE document_hash = ?", (document_hash,))
+            self._conn.executemany(
+                "INSERT INTO document_clauses(key, document_hash) VALUES (?, ?)",
+                [(key, document_hash) for key in dict.fromkeys(keys)],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents(document_hash, last_seen) VALUES (?, ?)", (document_hash, time.time())
+            )
+            stale = self._conn.execute(
+                "SELECT document_hash FROM documents ORDER BY last_seen DESC LIMIT -1 OFFSET ?", (self.max_documents,)
+            ).fetchall()
+            self._conn.executemany("DELETE FROM documents WHERE document_hash = ?", stale)
+            self._conn.executemany("DELETE FROM document_clauses WHERE document_hash = ?", stale)
+            self._conn.commit()
+
+    def related_documents(self, keys: Sequence[str], exclude: str = "") -> list[tuple[str, int]]:
+        # Documents sharing clause keys with `keys`: most shared first, then most recently seen.
+        shared: dict[str, int] = {}
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            for start in range(0, len(unique), _KEYS_PER_QUERY):
+                chunk = unique[start : start + _KEYS_PER_QUERY]
+                rows = self._conn.execute(
+                    "SELECT document_hash, COUNT(*) FROM document_clauses "
+                    f"WHERE key IN ({','.join('?' * len(chunk))}) AND document_hash != ? GROUP BY document_hash",
+                    [*chunk, exclude],
+                ).fetchall()
+                for document_hash, count in rows:
+                    shared[document_hash] = shared.get(document_hash, 0) + int(count)
+            seen: dict[str, float] = {}
+            if shared:
+                marks = ",".join("?" * len(shared))
+                seen.update(
+                    self._conn.execute(
+                        f"SELECT document_hash, last_seen FROM documents WHERE document_hash IN ({marks})", list(shared)
+                    ).fetchall()
+                )
+        return sorted(shared.items(), key=lambda item: (-item[1], -seen.get(item[0], 0.0), item[0]))
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM clauses").fetchone()
+        if count <= self.max_entries:
+            return
+        stale = self._conn.execute(
+            "SELECT fingerprint, key FROM clauses ORDER BY last_used LIMIT ?", (count - self.max_entries,)
+        ).fetchall()
+        self._conn.executemany("DELETE FROM clauses WHERE fingerprint = ? AND key = ?", stale)
+        self._conn.executemany("DELETE FROM bands WHERE fingerprint = ? AND key = ?", stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM clauses").fetchone()
+        return int(count)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "path": str(self.path),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
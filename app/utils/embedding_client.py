@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Sequence
+
+from app.utils.metrics import EMBEDDING_REQUESTS
+
+
+RETRYABLE_STATUS = {408, 409, 429}
+
+
+class EmbeddingError(RuntimeError):
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly 4 characters per token for English prose; errs on the side of smaller batches.
+    return len(text) // 4 + 1
+
+
+def make_batches(texts: Sequence[str], max_batch_tokens: int, max_batch_size: int) -> list[tuple[int, int]]:
+    batches: list[tuple[int, int]] = []
+    start = 0
+    tokens = 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if i > start and (tokens + cost > max_batch_tokens or i - start >= max_batch_size):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += cost
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+def _is_retryable(exc: Exception) -> bool:
+    try:
+        import openai
+
+        if isinstance(exc, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True
+    except ImportError:
+        pass
+    status = getattr(exc, "status_code", None)
+    return status in RETRYABLE_STATUS or (isinstance(status, int) and status >= 500)
+
+
+class EmbeddingClient:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str | None = None,
+        dimensions: int = 0,
+        max_batch_tokens: int = 100_000,
+        max_batch_size: int = 256,
+        max_concurrency: int = 4,
+        max_retries: int = 5,
+        backoff_base_s: float = 0.5,
+        backoff_max_s: float = 20.0,
+        timeout_s: float = 30.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        from openai import OpenAI
+
+        self.model = model
+        self.dimensions = dimensions
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self._sleep = sleep
+        # One client means one httpx connection pool reused by every request; retries are ours.
+        self._client = OpenAI(api_key=api_key, base_url=base_url or None, timeout=timeout_s, max_retries=0)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="embed")
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=1000)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.texts_embedded = 0
+        self.busy_s = 0.0
+
+    def _request(self, batch: list[str]) -> list[list[float]]:
+        kwargs = {"dimensions": self.dimensions} if self.dimensions else {}
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self._client.embeddings.create(model=self.model, input=batch, **kwargs)
+                vectors = [row.embedding for row in sorted(response.data, key=lambda r: r.index)]
+                if len(vectors) != len(batch):
+                    raise EmbeddingError(f"Provider returned {len(vectors)} vectors for {len(batch)} inputs.")
+                with self._lock:
+                    self.requests += 1
+                    self._latencies.append(time.perf_counter() - started)
+                EMBEDDING_REQUESTS.inc(outcome="ok")
+                return vectors
+            except EmbeddingError:
+                raise
+            except Exception as exc:
+                with self._lock:
+                    self.requests += 1
+                    self._latencies.append(time.perf_counter() - started)
+                if attempt >= self.max_retries or not _is_retryable(exc):
+                    with self._lock:
+                        self.failures += 1
+                    EMBEDDING_REQUESTS.inc(outcome="error")
+                    raise EmbeddingError(f"Embedding request failed after {attempt + 1} attempt(s): {exc}") from exc
+                delay = min(self.backoff_max_s, self.backoff_base_s * (2**attempt))
+                with self._lock:
+                    self.retries += 1
+                EMBEDDING_REQUESTS.inc(outcome="retry")
+                self._sleep(delay * (0.5 + random.random() / 2))
+                attempt += 1
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        text_list = list(texts)
+        if not text_list:
+            return []
+        started = time.perf_counter()
+        batches = make_batches(text_list, self.max_batch_tokens, self.max_batch_size)
+        futures = [self._pool.submit(self._request, text_list[a:b]) for a, b in batches]
+        vectors: list[list[float]] = []
+        try:
+            for future in futures:
+                vectors.extend(future.result())
+        except Exception:
+            for future in futures:
+                future.cancel()
+            raise
+
+        dims = {len(v) for v in vectors}
+        if len(dims) > 1:
+            raise EmbeddingError(f"Provider returned mixed embedding dimensions {sorted(dims)}.")
+        with self._lock:
+            self.texts_embedded += len(text_list)
+            self.busy_s += time.perf_counter() - started
+        return vectors
+
+    def stats(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            busy = self.busy_s
+            texts = self.texts_embedded
+
+        def pct(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))], 4)
+
+        return {
+            "model": self.model,
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "texts_embedded": texts,
+            "texts_per_second": round(texts / busy, 2) if busy else 0.0,
+            "latency_p50_s": pct(0.5),
+            "latency_p95_s": pct(0.95),
+        }
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._client.close()
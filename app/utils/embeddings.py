@@ -1,42 +1,170 @@
 from __future__ import annotations
 
-import hashlib
+import os
+import threading
 from typing import Iterable
 
+import numpy as np
+
 from app.config import settings
+from app.utils.embedding_cache import EmbeddingCache
+from app.utils.embedding_client import EmbeddingClient
+from app.utils.hash_embed import HashEmbedder
+from app.utils.metrics import EMBEDDING_CACHE, EMBEDDING_TEXTS, FALLBACKS
 
 
-_EMBED_DIM = 128
+_hash_embedder: HashEmbedder | None = None
+_cache: EmbeddingCache | None = None
+_cache_lock = threading.Lock()
+_client: EmbeddingClient | None = None
+_client_key: tuple | None = None
+_client_lock = threading.Lock()
 
 
-def _hash_embedding(text: str, dim: int = _EMBED_DIM) -> list[float]:
-    vec = [0.0] * dim
-    for token in text.lower().split():
-        h = int(hashlib.sha256(token.encode("utf-8")).hexdigest(), 16)
-        idx = h % dim
-        sign = -1.0 if (h >> 8) % 2 else 1.0
-        vec[idx] += sign
-    norm = sum(v * v for v in vec) ** 0.5
-    if norm == 0:
-        return vec
-    return [v / norm for v in vec]
+def get_hash_embedder() -> HashEmbedder:
+    global _hash_embedder
+    embedder = _hash_embedder
+    if embedder is None or (embedder.dim, embedder.ngrams) != (settings.hash_embed_dim, settings.hash_embed_ngrams):
+        embedder = HashEmbedder(
+            dim=settings.hash_embed_dim,
+            ngrams=settings.hash_embed_ngrams,
+            cache_size=settings.hash_embed_cache_size,
+        )
+        _hash_embedder = embedder
+    return embedder
 
 
-def embed_texts(texts: Iterable[str]) -> list[list[float]]:
-    text_list = [t if isinstance(t, str) else str(t) for t in texts]
-    if not text_list:
-        return []
+def get_embedding_cache() -> EmbeddingCache | None:
+    global _cache
+    if not settings.embed_cache_path.strip():
+        return None
+    with _cache_lock:
+        if _cache is None or str(_cache.path) != settings.embed_cache_path:
+            _cache = EmbeddingCache(
+                settings.embed_cache_path,
+                max_entries=settings.embed_cache_max_entries,
+                memory_entries=settings.embed_cache_memory_entries,
+            )
+        return _cache
+
+
+def embedding_cache_stats() -> dict:
+    cache = get_embedding_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+
+def provider_enabled() -> bool:
+    return bool(settings.openai_api_key.strip())
+
+
+def embedding_backend_id() -> str:
+    if provider_enabled():
+        return f"openai:{settings.model_embed}:{settings.embed_dimensions}"
+    return get_hash_embedder().backend_id
+
+
+def get_embedding_client() -> EmbeddingClient:
+    global _client, _client_key
+    key = (
+        os.getpid(),
+        settings.openai_api_key,
+        settings.openai_base_url,
+        settings.model_embed,
+        settings.embed_dimensions,
+        settings.embed_max_concurrency,
+        settings.embed_batch_tokens,
+        settings.embed_batch_size,
+        settings.embed_max_retries,
+        settings.embed_timeout_s,
+    )
+    with _client_lock:
+        if _client is None or _client_key != key:
+            # A client inherited across fork() shares sockets with the parent; start fresh instead.
+            if _client is not None and _client_key and _client_key[0] == key[0]:
+                _client.close()
+            _client = EmbeddingClient(
+                api_key=settings.openai_api_key,
+                model=settings.model_embed,
+                base_url=settings.openai_base_url or None,
+                dimensions=settings.embed_dimensions,
+                max_batch_tokens=settings.embed_batch_tokens,
+                max_batch_size=settings.embed_batch_size,
+                max_concurrency=settings.embed_max_concurrency,
+                max_retries=settings.embed_max_retries,
+                timeout_s=settings.embed_timeout_s,
+            )
+            _client_key = key
+        return _client
+
+
+def embedding_client_stats() -> dict:
+    if _client is None:
+        return {"enabled": provider_enabled(), "requests": 0}
+    return _client.stats()
 
-    if settings.openai_api_key.strip():
-        try:
-            from openai import OpenAI
 
-            client = OpenAI(api_key=settings.openai_api_key)
-            response = client.embeddings.create(model=settings.model_embed, input=text_list)
-            vectors = [row.embedding for row in response.data]
-            if vectors and len(vectors) == len(text_list):
-                return vectors
-        except Exception:
-            pass
+def warm_embedding_backend() -> None:
+    # Builds the client (provider) or hash embedder up front without sending any text.
+    if provider_enabled():
+        get_embedding_client()
+    else:
+        get_hash_embedder()
 
-    return [_hash_embedding(t) for t in text_list]
+
+def _provider_embed_cached(text_list: list[str]) -> list[list[float]]:
+    cache = get_embedding_cache()
+    model, dim = settings.model_embed, settings.embed_dimensions
+    vectors: dict[int, list[float]] = cache.get_many(model, dim, text_list) if cache else {}
+    if cache:
+        EMBEDDING_CACHE.inc(len(vectors), result="hit")
+        EMBEDDING_CACHE.inc(len(text_list) - len(vectors), result="miss")
+
+    # Only misses go to the provider, deduplicated and in a single request.
+    missing: dict[str, list[int]] = {}
+    for i, text in enumerate(text_list):
+        if i not in vectors:
+            missing.setdefault(text, []).append(i)
+    if missing:
+        EMBEDDING_TEXTS.inc(len(missing), backend="openai")
+        fresh = get_embedding_client().embed(list(missing))
+        for (text, positions), vector in zip(missing.items(), fresh):
+            for i in positions:
+                vectors[i] = vector
+        if cache:
+            cache.put_many(model, dim, zip(missing, fresh))
+    return [vectors[i] for i in range(len(text_list))]
+
+
+def _as_text_list(texts: Iterable[str]) -> list[str]:
+    return [t if isinstance(t, str) else str(t) for t in texts]
+
+
+def _count_hash_embeddings(count: int) -> None:
+    # Without OPENAI_API_KEY every embedding comes from the offline hash backend.
+    if count:
+        EMBEDDING_TEXTS.inc(count, backend="hash")
+        FALLBACKS.inc(event="hash_embeddings")
+
+
+def embed_array(texts: Iterable[str]) -> np.ndarray:
+    text_list = _as_text_list(texts)
+    if provider_enabled():
+        # Provider failures raise EmbeddingError rather than degrading to hash vectors, which
+        # live in a different vector space from an index built with real embeddings.
+        if not text_list:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.asarray(_provider_embed_cached(text_list), dtype=np.float32)
+
+    # Hash vectors are deterministic and cheaper to recompute than to look up, so they are not cached.
+    _count_hash_embeddings(len(text_list))
+    return get_hash_embedder().embed(text_list)
+
+
+def embed_texts(texts: Iterable[str]) -> list[list[float]]:
+    text_list = _as_text_list(texts)
+    if not text_list:
+        return []
+    if provider_enabled():
+        return _provider_embed_cached(text_list)
+    _count_hash_embeddings(len(text_list))
+    return get_hash_embedder().embed(text_list, dtype=np.float64).tolist()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from itertools import islice
+from typing import Sequence
+
+import numpy as np
+
+
+class HashEmbedder:
+    def __init__(self, dim: int = 128, ngrams: int = 1, cache_size: int = 100_000) -> None:
+        if dim < 1:
+            raise ValueError("dim must be positive")
+        self.dim = dim
+        self.ngrams = max(1, ngrams)
+        self.cache_size = max(0, cache_size)
+        # Each feature maps to one code: bucket index in the high bits, sign in the lowest bit.
+        self._codes: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend_id(self) -> str:
+        suffix = f":ng{self.ngrams}" if self.ngrams > 1 else ""
+        return f"hash:{self.dim}{suffix}"
+
+    def _feature_code(self, feature: str) -> int:
+        h = int.from_bytes(hashlib.sha256(feature.encode("utf-8")).digest(), "big")
+        return (h % self.dim) << 1 | ((h >> 8) & 1)
+
+    def _features(self, text: str) -> list[str]:
+        tokens = text.lower().split()
+        features = list(tokens)
+        for n in range(2, self.ngrams + 1):
+            features.extend(" ".join(tokens[i : i + n]) for i in range(len(tokens) - n + 1))
+        return features
+
+    def _lookup(self, features: list[str]) -> np.ndarray:
+        with self._lock:
+            codes = self._codes_for(features)
+            return np.fromiter(map(codes.__getitem__, features), dtype=np.int64, count=len(features))
+
+    def _codes_for(self, features: list[str]) -> dict[str, int]:
+        # This batch's codes are resolved into a local dict first, so evicting cached entries
+        # (possibly ones this batch just hit) never leaves a feature without a code.
+        table = self._codes
+        codes = {f: table[f] for f in set(features) if f in table}
+        fresh = {f: self._feature_code(f) for f in set(features).difference(codes)}
+        self.misses += len(fresh)
+        self.hits += len(features) - len(fresh)
+        codes.update(fresh)
+        if not self.cache_size:
+            return codes
+        if len(fresh) >= self.cache_size:
+            table.clear()
+            table.update(islice(fresh.items(), self.cache_size))
+            return codes
+        overflow = len(table) + len(fresh) - self.cache_size
+        if overflow > 0:
+            # Drop the oldest entries (dicts keep insertion order) to stay within the bound.
+            for key in list(islice(table, overflow)):
+                del table[key]
+        table.update(fresh)
+        return codes
+
+    def embed(self, texts: Sequence[str], dtype: type = np.float32) -> np.ndarray:
+        n = len(texts)
+        per_text = [self._features(text) for text in texts]
+        features = [f for feats in per_text for f in feats]
+        code_arr = self._lookup(features)
+        row_arr = np.repeat(np.arange(n, dtype=np.int64), [len(feats) for feats in per_text])
+        signs = 1.0 - 2.0 * (code_arr & 1)
+        flat = np.bincount(row_arr * self.dim + (code_arr >> 1), weights=signs, minlength=n * self.dim)
+        vectors = flat.reshape(n, self.dim)
+
+        # Sums are exact integers in float64, so the normalized vectors match the old per-token loop.
+        norms = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))[:, None]
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(dtype, copy=False)
+
+    def cache_info(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._codes), "max_size": self.cache_size}
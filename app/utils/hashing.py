@@ -6,3 +6,28 @@ import hashlib
 def sha256_text(content: str) -> str:
     text = content if isinstance(content, str) else str(content)
     return hashlib.sha256(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class StrippedTextHash:
+    # sha256_text("".join(pieces).strip()) computed incrementally: leading whitespace is skipped
+    # and a trailing whitespace run is held back until more text follows it.
+    def __init__(self) -> None:
+        self._hash = hashlib.sha256()
+        self._started = False
+        self._pending = ""
+
+    def update(self, piece: str) -> None:
+        if not self._started:
+            piece = piece.lstrip()
+            if not piece:
+                return
+            self._started = True
+        body = piece.rstrip()
+        if body:
+            self._hash.update((self._pending + body).encode("utf-8", errors="ignore"))
+            self._pending = piece[len(body) :]
+        else:
+            self._pending += piece
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
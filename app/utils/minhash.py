@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import zlib
+from typing import Sequence
+
+import numpy as np
+
+
+NUM_PERM = 128
+LSH_BANDS = 16
+SHINGLE_WORDS = 3
+_PRIME = (1 << 61) - 1
+_WORD = re.compile(r"\w+")
+
+
+class MinHasher:
+    # Word-shingle MinHash. Seeds are fixed, so signatures are comparable across processes and runs.
+    def __init__(self, num_perm: int = NUM_PERM, bands: int = LSH_BANDS, shingle_words: int = SHINGLE_WORDS, seed: int = 1) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        # a, b < 2**32 and shingle hashes < 2**32, so a * x + b never overflows uint64.
+        self._a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_words = shingle_words
+
+    def shingles(self, text: str) -> np.ndarray:
+        words = _WORD.findall(text.lower())
+        k = self.shingle_words
+        grams = {" ".join(words[i : i + k]) for i in range(max(1, len(words) - k + 1))} if words else set()
+        return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+    def signature(self, text: str) -> np.ndarray:
+        x = self.shingles(text)
+        if not x.size:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        return ((np.outer(x, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint64)
+        for i, text in enumerate(texts):
+            out[i] = self.signature(text)
+        return out
+
+    def band_keys(self, signature: np.ndarray) -> list[str]:
+        # Near-duplicates share at least one band with high probability: 16 bands of 8 rows put the
+        # LSH threshold near a Jaccard similarity of 0.7, well under the grouping threshold.
+        rows = self.num_perm // self.bands
+        return [
+            f"{i}:{hashlib.blake2b(signature[i * rows : (i + 1) * rows].tobytes(), digest_size=8).hexdigest()}"
+            for i in range(self.bands)
+        ]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    # Fraction of agreeing minima estimates the Jaccard similarity of the shingle sets.
+    return float(np.mean(a == b))
@@ -1,32 +1,330 @@
 from __future__ import annotations
 
+import io
+import os
 import re
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator, Union
 
+from app.config import settings
+from app.utils.metrics import FALLBACKS, PAGES
 
-def extract_pdf_text(pdf_path: str | Path) -> str:
-    path = Path(pdf_path)
-    if not path.exists():
-        raise FileNotFoundError(f"PDF not found: {path}")
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
 
+
+_RAW_CHUNK_BYTES = 1 << 20
+_TRAILING_WS = re.compile(r"[ \t\r\n]+\Z")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_key: tuple[int, int] | None = None
+_pool_lock = threading.Lock()
+_worker_reader: tuple[tuple, object] | None = None
+
+# A path, raw PDF bytes, or a readable and seekable binary file object (e.g. a spooled upload).
+PdfSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+class _BufferReader(io.RawIOBase):
+    # Read-only seekable stream over bytes-like data, so pypdf parses it without a copy.
+    def __init__(self, data: bytes | bytearray | memoryview) -> None:
+        self._view = memoryview(data).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = max(0, min(len(buffer), len(self._view) - self._pos))
+        buffer[:n] = self._view[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _open_source(source: PdfSource) -> Path | BinaryIO:
+    if isinstance(source, (str, Path)):
+        path = Path(source)
+        if not path.exists():
+            raise FileNotFoundError(f"PDF not found: {path}")
+        return path
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _BufferReader(source)
+    source.seek(0)
+    return source
+
+
+class PageTimeout(BaseException):
+    # Not an Exception, so pypdf's own broad `except Exception` handlers cannot swallow it.
+    pass
+
+
+def _on_alarm(signum, frame):  # noqa: ARG001
+    raise PageTimeout()
+
+
+def _can_use_alarm() -> bool:
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _extract_page(page, timeout_s: float) -> str:
+    # pypdf is pure Python, so an interval timer can interrupt a pathological page.
+    use_alarm = timeout_s > 0 and _can_use_alarm()
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        deadline = time.monotonic() + timeout_s
+        signal.setitimer(signal.ITIMER_REAL, timeout_s)
+    try:
+        try:
+            text = page.extract_text() or ""
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        # A handler that catches everything may still have eaten the alarm; the page ran over anyway.
+        if use_alarm and time.monotonic() >= deadline:
+            raise PageTimeout()
+        return text
+    except PageTimeout:
+        FALLBACKS.inc(event="pdf_page_timeout")
+        return ""
+    except Exception:
+        return ""
+    finally:
+        if use_alarm:
+            signal.signal(signal.SIGALRM, previous)
+
+
+def _open_reader(source: Path | BinaryIO):
+    from pypdf import PdfReader
+
+    return PdfReader(str(source) if isinstance(source, Path) else source)
+
+
+def _read_shared(name: str, size: int) -> bytes:
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
     try:
-        from pypdf import PdfReader
+        with shm.buf[:size] as view:
+            return bytes(view)
+    finally:
+        shm.close()
+
+
+def _extract_range(source: str | tuple[str, int], start: int, end: int, timeout_s: float) -> list[str]:
+    # `source` is a PDF path, or the name and size of a shared-memory copy of an in-memory PDF.
+    global _worker_reader
+    if isinstance(source, str):
+        stat = os.stat(source)
+        key = (source, stat.st_mtime_ns, stat.st_size)
+    else:
+        key = tuple(source)
+    if _worker_reader is None or _worker_reader[0] != key:
+        opened = Path(source) if isinstance(source, str) else _BufferReader(_read_shared(*source))
+        _worker_reader = (key, _open_reader(opened))
+    reader = _worker_reader[1]
+    return [_extract_page(reader.pages[i], timeout_s) for i in range(start, end)]
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_key
+    # The process pool machinery is imported on first use; most documents never need it.
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
 
-        reader = PdfReader(str(path))
-        text_parts = []
-        for page in reader.pages:
-            text_parts.append(page.extract_text() or "")
-        text = "\n".join(text_parts).strip()
+    key = (os.getpid(), workers)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            # spawn, not fork: the API process is multi-threaded and forking it is unsafe.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_key = key
+        return _pool
+
+
+def _discard_pool() -> None:
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool, _pool_key = None, None
+
+
+def _iter_pages_parallel(
+    source: Path | BinaryIO, shared: str | tuple[str, int], page_count: int, workers: int, timeout_s: float
+) -> Iterator[tuple[int, str]]:
+    from concurrent.futures.process import BrokenProcessPool
+
+    done = 0
+    try:
+        for page_no, text in _iter_pages_pooled(shared, page_count, workers, timeout_s):
+            done = page_no
+            yield page_no, text
+    except BrokenProcessPool:
+        # A crashed worker (e.g. killed by the OOM killer) poisons the pool; finish in-process.
+        _discard_pool()
+        reader = _open_reader(source)
+        for i in range(done, page_count):
+            yield i + 1, _extract_page(reader.pages[i], timeout_s)
+
+
+def _iter_pages_pooled(shared: str | tuple[str, int], page_count: int, workers: int, timeout_s: float) -> Iterator[tuple[int, str]]:
+    from concurrent.futures.process import BrokenProcessPool
+
+    pool = _get_pool(workers)
+    step = max(1, settings.pdf_pages_per_task)
+    ranges = deque((start, min(start + step, page_count)) for start in range(0, page_count, step))
+    in_flight: deque[tuple[int, int, Future]] = deque()
+
+    def submit_next() -> None:
+        start, end = ranges.popleft()
+        in_flight.append((start, end, pool.submit(_extract_range, shared, start, end, timeout_s)))
+
+    # Bounded look-ahead keeps memory flat while pages are yielded strictly in order.
+    while ranges and len(in_flight) < workers * 2:
+        submit_next()
+    while in_flight:
+        start, end, future = in_flight.popleft()
+        try:
+            texts = future.result()
+        except BrokenProcessPool:
+            raise
+        except Exception:
+            texts = [""] * (end - start)
+        if ranges:
+            submit_next()
+        for offset, text in enumerate(texts):
+            yield start + offset + 1, text
+
+
+def _iter_shared_parallel(
+    stream: BinaryIO, page_count: int, workers: int, timeout_s: float
+) -> Iterator[tuple[int, str]]:
+    # Worker processes cannot read the caller's stream, so it is copied once into shared memory
+    # (never to disk), and only when a document is large enough to need them.
+    from multiprocessing import shared_memory
+
+    size = stream.seek(0, io.SEEK_END)
+    stream.seek(0)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+    try:
+        filled = 0
+        while filled < size and (chunk := stream.read(min(_RAW_CHUNK_BYTES, size - filled))):
+            shm.buf[filled : filled + len(chunk)] = chunk
+            filled += len(chunk)
+        yield from _iter_pages_parallel(stream, (shm.name, filled), page_count, workers, timeout_s)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def _read_chunks(source: Path | BinaryIO) -> Iterator[bytes]:
+    if isinstance(source, Path):
+        with source.open("rb") as fh:
+            yield from iter(lambda: fh.read(_RAW_CHUNK_BYTES), b"")
+        return
+    source.seek(0)
+    yield from iter(lambda: source.read(_RAW_CHUNK_BYTES), b"")
+
+
+def _iter_raw_text(source: Path | BinaryIO) -> Iterator[str]:
+    carry = ""
+    chunks = _read_chunks(source)
+    while True:
+        chunk = next(chunks, b"")
+        text = carry + chunk.decode("latin-1")
+        if chunk:
+            # Hold back a trailing whitespace run so replacements never straddle chunk edges.
+            tail = _TRAILING_WS.search(text)
+            cut = tail.start() if tail else len(text)
+            text, carry = text[:cut], text[cut:]
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        text = re.sub(r"[ \t]+", " ", text)
+        yield re.sub(r"\n{3,}", "\n\n", text)
+        if not chunk:
+            return
+
+
+def _iter_raw_fallback(source: Path | BinaryIO) -> Iterator[str]:
+    # Streams the stripped raw text. Every piece but the last ends in non-whitespace (trailing runs
+    # are carried into the next piece), so stripping each piece's end only ever trims the file's end.
+    started = False
+    for text in _iter_raw_text(source):
+        if not started:
+            text = text.lstrip()
+            started = bool(text)
+        text = text.rstrip()
         if text:
-            return text
+            yield text
+    if not started:
+        name = source if isinstance(source, Path) else getattr(source, "name", "upload")
+        raise ValueError(f"Could not extract text from {name}")
+
+
+def iter_pdf_pages(
+    pdf_path: PdfSource,
+    workers: int | None = None,
+    page_timeout_s: float | None = None,
+) -> Iterator[tuple[int, str]]:
+    source = _open_source(pdf_path)
+    workers = settings.pdf_workers if workers is None else workers
+    timeout_s = settings.pdf_page_timeout_s if page_timeout_s is None else page_timeout_s
+
+    try:
+        reader = _open_reader(source)
+        page_count = len(reader.pages)
     except Exception:
-        pass
-
-    # Fallback path for malformed or non-standard PDFs.
-    raw = path.read_bytes().decode("latin-1", errors="ignore")
-    raw = raw.replace("\r\n", "\n").replace("\r", "\n")
-    cleaned = re.sub(r"[ \t]+", " ", raw)
-    cleaned = re.sub(r"\n{3,}", "\n\n", cleaned).strip()
-    if not cleaned:
-        raise ValueError(f"Could not extract text from {path}")
-    return cleaned
+        reader = None
+        page_count = 0
+
+    found_text = False
+    if reader is not None:
+        parallel = workers > 1 and page_count >= settings.pdf_parallel_min_pages
+        if timeout_s > 0 and page_count and not _can_use_alarm():
+            # Off the main thread (API workers) only worker processes can enforce the page limit, so
+            # every document goes through them there, however short.
+            parallel = True
+        if parallel and isinstance(source, Path):
+            pages = _iter_pages_parallel(source, str(source), page_count, max(1, workers), timeout_s)
+        elif parallel:
+            pages = _iter_shared_parallel(source, page_count, max(1, workers), timeout_s)
+        else:
+            pages = ((i + 1, _extract_page(page, timeout_s)) for i, page in enumerate(reader.pages))
+        for page_no, text in pages:
+            found_text = found_text or bool(text.strip())
+            PAGES.inc()
+            yield page_no, text
+
+    if not found_text:
+        # Fallback path for malformed or non-standard PDFs: page 0 stands for the whole file and
+        # arrives in pieces that concatenate to its text.
+        FALLBACKS.inc(event="pdf_raw_text")
+        PAGES.inc()
+        for text in _iter_raw_fallback(source):
+            yield 0, text
+
+
+def iter_pdf_text(pdf_path: PdfSource) -> Iterator[str]:
+    # Pieces that concatenate to the newline-joined page texts, without building the whole string.
+    previous = None
+    for page_no, text in iter_pdf_pages(pdf_path):
+        yield text if previous is None or page_no == previous else "\n" + text
+        previous = page_no
+
+
+def extract_pdf_text(pdf_path: PdfSource) -> str:
+    return "".join(iter_pdf_text(pdf_path)).strip()
@@ -3,92 +3,158 @@ from __future__ import annotations
 import re
 
 
+_CRLF = re.compile(r"\r\n?")
+_SPACE_RUN = re.compile(r"[\t ]+")
+_DROP_LINE = re.compile(r"\d{1,2}/\d{1,2}/\d{2,4},\s+\d{1,2}:\d{2}\s+[AP]M\b|https?://\S+$|\d+/\d+\s*$")
+_DROP_EXACT = frozenset({"TRY GROK", "TRY GROK ON", "Web", "iOS", "Android"})
+_HEADING_LINE = re.compile(r"\d{1,2}(?:\.\d+)?[.)]\s+\S|\d{1,2}/\d{1,2}/\d{2,4},\s+\d{1,2}:\d{2}\s+[AP]M\b|https?://\S+$")
+_TITLE_LINE = re.compile(r"[A-Z][A-Za-z0-9,&/'()\- ]{2,70}:?$")
+_HEADING_EXACT = frozenset({"TRY GROK", "PRODUCTS", "COMPANY", "RESOURCES"})
+# Line boundaries str.splitlines() honours besides \n and \r (which normalization has already folded).
+_EXTRA_BREAKS = re.compile("([\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029])")
+
+
+class LineNormalizer:
+    # Incremental normalize_text: feed raw text in arbitrary pieces, get back (separator, line)
+    # pairs whose concatenation, stripped, is exactly normalize_text() of the whole input.
+    def __init__(self) -> None:
+        self._partial = ""
+        self._skip_lf = False
+        self._started = False
+        self._blank = False
+
+    def feed(self, piece: str) -> list[tuple[str, str]]:
+        if self._skip_lf and piece:
+            self._skip_lf = False
+            if piece.startswith("\n"):
+                piece = piece[1:]
+        if not piece:
+            return []
+        # A "\r" at a piece edge may be the first half of "\r\n".
+        self._skip_lf = piece.endswith("\r")
+        data = self._partial + _CRLF.sub("\n", piece.replace("\u00a0", " "))
+        cut = data.rfind("\n")
+        if cut < 0:
+            self._partial = data
+            return []
+        self._partial = data[cut + 1 :]
+        return self._clean(_SPACE_RUN.sub(" ", data[:cut]).split("\n"))
+
+    def close(self) -> list[tuple[str, str]]:
+        tail, self._partial = self._partial, ""
+        return self._clean([_SPACE_RUN.sub(" ", tail)])
+
+    def _clean(self, lines: list[str]) -> list[tuple[str, str]]:
+        out: list[tuple[str, str]] = []
+        for line in lines:
+            s = line.strip()
+            if not s:
+                self._blank = self._started
+                continue
+            if s in _DROP_EXACT or _DROP_LINE.match(s):
+                continue
+            # Any run of blank lines between two kept lines collapses to one paragraph break.
+            sep = ("\n\n" if self._blank else "\n") if self._started else ""
+            out.append((sep, line))
+            self._started = True
+            self._blank = False
+        return out
+
+
 def normalize_text(text: str) -> str:
-    text = text.replace("\u00a0", " ")
-    text = re.sub(r"\r\n?", "\n", text)
-    text = re.sub(r"[\t ]+", " ", text)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    cleaned_lines: list[str] = []
-    for line in text.split("\n"):
-        s = line.strip()
-        if not s:
-            cleaned_lines.append("")
-            continue
-        if re.match(r"^\d{1,2}/\d{1,2}/\d{2,4},\s+\d{1,2}:\d{2}\s+[AP]M\b", s):
-            continue
-        if re.match(r"^https?://\S+$", s):
-            continue
-        if re.match(r"^\d+/\d+\s*$", s):
-            continue
-        if s in {"TRY GROK", "TRY GROK ON", "Web", "iOS", "Android"}:
-            continue
-        cleaned_lines.append(line)
-    text = "\n".join(cleaned_lines)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip()
+    normalizer = LineNormalizer()
+    lines = normalizer.feed(text) + normalizer.close()
+    return "".join(sep + line for sep, line in lines).strip()
 
 
 def _is_heading_line(line: str) -> bool:
     s = line.strip()
     if not s:
         return False
-
-    if re.match(r"^\d{1,2}(?:\.\d+)?[.)]\s+\S", s):
+    if s in _HEADING_EXACT or _HEADING_LINE.match(s):
         return True
-
-    if re.match(r"^[A-Z][A-Za-z0-9,&/'()\- ]{2,70}:?$", s):
+    if _TITLE_LINE.match(s):
         words = s.replace(":", "").split()
         # "Title Case" section headers are common in legal docs and web exports.
         if 1 <= len(words) <= 10 and all(w[:1].isupper() or w.isupper() for w in words if w):
             return True
-
-    if re.match(r"^\d{1,2}/\d{1,2}/\d{2,4},\s+\d{1,2}:\d{2}\s+[AP]M\b", s):
-        return True
-
-    if re.match(r"^https?://\S+$", s):
-        return True
-
-    if s in {"TRY GROK", "PRODUCTS", "COMPANY", "RESOURCES"}:
-        return True
-
     return False
 
 
-def _merge_small_blocks(blocks: list[str], min_chars: int) -> list[str]:
-    if not blocks:
-        return blocks
-    merged: list[str] = []
-    for block in blocks:
-        if merged and len(block) < min_chars:
-            merged[-1] = (merged[-1].rstrip() + "\n" + block.lstrip()).strip()
-        else:
-            merged.append(block)
-    return merged
+class ClauseSegmenter:
+    # Single-pass equivalent of normalize_text() + split_into_clause_like_blocks(). Blocks that
+    # start at a heading line are returned as soon as the next heading closes them; paragraph
+    # blocks are only buffered until the first heading block proves they are not needed.
+    def __init__(self, min_chars: int = 60, whole_text_fallback: bool = False) -> None:
+        self.min_chars = min_chars
+        self._normalizer = LineNormalizer()
+        self._block: list[str] | None = None
+        self._heading_blocks = 0
+        self._paragraph: list[str] = []
+        self._paragraphs: list[str] | None = []
+        self._text: list[str] | None = [] if whole_text_fallback else None
+
+    def feed(self, piece: str) -> list[str]:
+        return self._consume(self._normalizer.feed(piece))
+
+    def close(self) -> list[str]:
+        blocks = self._consume(self._normalizer.close())
+        if self._block is not None:
+            blocks += self._finish_block()
+        if self._heading_blocks:
+            return blocks
+        self._finish_paragraph()
+        if self._paragraphs:
+            return self._paragraphs
+        if self._text is not None:
+            return ["".join(self._text).strip()]
+        return []
+
+    def _consume(self, lines: list[tuple[str, str]]) -> list[str]:
+        out: list[str] = []
+        for sep, line in lines:
+            if self._paragraphs is not None:
+                if sep == "\n\n":
+                    self._finish_paragraph()
+                self._paragraph.append(line)
+                if self._text is not None:
+                    self._text.append(sep + line)
+
+            parts = _EXTRA_BREAKS.split(line) if _EXTRA_BREAKS.search(line) else [line]
+            for i in range(0, len(parts), 2):
+                if i:
+                    sep = parts[i - 1]
+                part = parts[i]
+                if _is_heading_line(part):
+                    if self._block is not None:
+                        out += self._finish_block()
+                    self._block = [part]
+                elif self._block is not None:
+                    self._block.append(sep + part)
+        return out
+
+    def _finish_block(self) -> list[str]:
+        block = "".join(self._block or ()).strip()
+        self._block = None
+        if len(block) < self.min_chars:
+            return []
+        # Heading segmentation has produced a block, so the paragraph fallback can never apply.
+        self._heading_blocks += 1
+        self._paragraph, self._paragraphs, self._text = [], None, None
+        return [block]
+
+    def _finish_paragraph(self) -> None:
+        if self._paragraphs is None:
+            return
+        paragraph = "\n".join(self._paragraph).strip()
+        self._paragraph = []
+        if len(paragraph) >= self.min_chars:
+            self._paragraphs.append(paragraph)
+            self._text = None
 
 
 def split_into_clause_like_blocks(text: str, min_chars: int = 60) -> list[str]:
-    # First pass: split by heading-like lines (numbered sections, title lines, page markers).
-    lines = text.splitlines()
-    starts = []
-    pos = 0
-    for line in lines:
-        if _is_heading_line(line):
-            starts.append(pos)
-        pos += len(line) + 1
-
-    starts = sorted(set(starts))
-    if starts:
-        spans = starts + [len(text)]
-        blocks = []
-        for i in range(len(starts)):
-            chunk = text[spans[i] : spans[i + 1]].strip()
-            if len(chunk) >= min_chars:
-                blocks.append(chunk)
-        blocks = _merge_small_blocks(blocks, min_chars)
-        if blocks:
-            return blocks
-
-    # Fallback: paragraph blocks with soft merge.
-    para_split = [p.strip() for p in text.split("\n\n") if len(p.strip()) >= min_chars]
-    para_split = _merge_small_blocks(para_split, min_chars)
-    return para_split
+    # Heading-like lines (numbered sections, title lines, page markers) start blocks; documents
+    # without any block of min_chars fall back to paragraphs.
+    segmenter = ClauseSegmenter(min_chars=min_chars)
+    return segmenter.feed(text) + segmenter.close()